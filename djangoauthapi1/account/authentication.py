@@ -0,0 +1,98 @@
+"""JWT authentication that does not load ``account.User`` from the database on every request.
+
+``CachedJWTAuthentication`` keeps resolved users in a small per-process cache keyed by
+user id and token ``jti`` for ``JWT_USER_CACHE_TTL`` seconds. Saving or deleting a user
+drops their entries in the process that made the change (see account.signals); other
+processes pick the change up once the TTL runs out, so keep it short.
+
+``StatelessJWTAuthentication`` skips the user lookup entirely and hands views a
+``TokenUser`` carrying only the id from the token. Use it only on read-only views
+that need nothing beyond ``request.user.id``.
+"""
+import copy
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from rest_framework_simplejwt.authentication import JWTAuthentication, JWTStatelessUserAuthentication
+from rest_framework_simplejwt.settings import api_settings
+
+
+class UserCache:
+    def __init__(self, ttl, max_users):
+        self.ttl = ttl
+        self.max_users = max_users
+        self.lock = threading.Lock()
+        # user_id -> {jti: (expires, user)}, least recently used first
+        self.entries = OrderedDict()
+        self.hits = self.misses = self.invalidations = self.stateless = 0
+
+    def get(self, user_id, jti):
+        now = time.monotonic()
+        with self.lock:
+            tokens = self.entries.get(user_id)
+            entry = tokens.get(jti) if tokens else None
+            if entry is None or entry[0] <= now:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(user_id)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, user_id, jti, user):
+        with self.lock:
+            self.entries.setdefault(user_id, {})[jti] = (time.monotonic() + self.ttl, user)
+            self.entries.move_to_end(user_id)
+            while len(self.entries) > self.max_users:
+                self.entries.popitem(last=False)
+
+    def invalidate(self, user_id):
+        with self.lock:
+            if self.entries.pop(user_id, None) is not None:
+                self.invalidations += 1
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.hits = self.misses = self.invalidations = self.stateless = 0
+
+    def stats(self):
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                'cached_users': len(self.entries),
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else None,
+                'stateless': self.stateless,
+                'invalidations': self.invalidations,
+                # Every hit and every stateless request is a user SELECT not run
+                'queries_saved': self.hits + self.stateless,
+            }
+
+
+user_cache = UserCache(
+    ttl=getattr(settings, 'JWT_USER_CACHE_TTL', 30),
+    max_users=getattr(settings, 'JWT_USER_CACHE_SIZE', 10000),
+)
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    def get_user(self, validated_token):
+        user_id = validated_token.get(api_settings.USER_ID_CLAIM)
+        jti = validated_token.get(api_settings.JTI_CLAIM)
+        user = user_cache.get(user_id, jti)
+        if user is None:
+            user = super().get_user(validated_token)
+            user_cache.set(user_id, jti, user)
+        # Requests must not see each other's attribute changes on the shared instance
+        return copy.copy(user)
+
+
+class StatelessJWTAuthentication(JWTStatelessUserAuthentication):
+    def get_user(self, validated_token):
+        user = super().get_user(validated_token)
+        with user_cache.lock:
+            user_cache.stateless += 1
+        return user
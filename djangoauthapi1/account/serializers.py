@@ -4,6 +4,7 @@ from django.utils.encoding import smart_str, force_bytes, DjangoUnicodeDecodeErr
 from django.utils.http import urlsafe_base64_decode, urlsafe_base64_encode
 from django.contrib.auth.tokens import PasswordResetTokenGenerator
 from .utills import Utill
+from djangoauthapi1.middleware import TimedSerializerMixin
 
 class UserRegistrationSerializer(serializers.ModelSerializer):
     password2 = serializers.CharField(style={'input_type': 'password'}, write_only=True)
@@ -30,7 +31,7 @@ class UserLoginSerializer(serializers.ModelSerializer):
         model = User
         fields = ['email', 'password']
 
-class UserProfileSerializer(serializers.ModelSerializer):
+class UserProfileSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = User
         fields = ['id', 'email', 'name']
@@ -51,6 +52,13 @@ class UserChangePasswordSerializer(serializers.Serializer):
         user.save()
         return attrs
 
+def password_reset_email(user):
+    uid = urlsafe_base64_encode(force_bytes(user.id))
+    token = PasswordResetTokenGenerator().make_token(user)
+    link = f'http://localhost:3000/api/user/reset/{uid}/{token}'
+    body = f"Click the following link to reset your password: {link}"
+    return {"subject": "Reset your password", "body": body, 'to_email': user.email}
+
 class SendPasswordResetEmailSerializer(serializers.Serializer):
     email = serializers.EmailField(max_length=255)
 
@@ -59,13 +67,8 @@ class SendPasswordResetEmailSerializer(serializers.Serializer):
         if not User.objects.filter(email=email).exists():
             raise serializers.ValidationError("You are not registered.")
         user = User.objects.get(email=email)
-        uid = urlsafe_base64_encode(force_bytes(user.id))
-        token = PasswordResetTokenGenerator().make_token(user)
-        link = f'http://localhost:3000/api/user/reset/{uid}/{token}'
-        body = f"Click the following link to reset your password: {link}"
-        data = {"subject": "Reset your password", "body": body, 'to_email': user.email}
         try:
-            Utill.send_email(data)
+            Utill.send_email(password_reset_email(user))
         except Exception as e:
             print(f"Error sending email: {str(e)}")
             raise serializers.ValidationError("Error sending password reset email.")
@@ -1,3 +1,165 @@
-from django.test import TestCase
+from unittest import mock
 
-# Create your tests here.
+from django.conf import settings
+from django.core import mail
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from account.authentication import user_cache
+from account.models import User
+from account.throttling import DEFAULT_RATES, buckets, hash_limit, metrics
+from notification.models import Notification
+
+
+@override_settings(EMAIL_SEND_RATE=1000)
+class PasswordResetEmailTests(TestCase):
+    def setUp(self):
+        User.objects.create_user(email='a@example.com', name='A', tc=True, password='pw')
+
+    def test_reset_request_queues_email_for_the_worker(self):
+        response = self.client.post(reverse('resetPassword'), {'email': 'a@example.com'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(mail.outbox, [])
+        notification = Notification.objects.get(channel='email')
+        self.assertEqual((notification.recipient, notification.subject), ('a@example.com', 'Reset your password'))
+
+        call_command('send_notifications', '--once', '--channel', 'email', stdout=open('/dev/null', 'w'))
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertIn('/api/user/reset/', mail.outbox[0].body)
+        notification.refresh_from_db()
+        self.assertEqual(notification.status, Notification.STATUS_SENT)
+        self.assertEqual(notification.provider_id, mail.outbox[0].extra_headers['Message-ID'])
+
+    def test_unknown_email_queues_nothing(self):
+        self.assertEqual(self.client.post(reverse('resetPassword'), {'email': 'b@example.com'}).status_code, 400)
+        self.assertFalse(Notification.objects.exists())
+
+
+class CachedJWTAuthenticationTests(TestCase):
+    def setUp(self):
+        user_cache.clear()
+        self.user = User.objects.create_user(email='a@example.com', name='A', tc=True, password='pw')
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(self.user).access_token}')
+
+    def test_repeat_requests_skip_the_user_query(self):
+        self.assertEqual(self.client.get(reverse('profile')).status_code, 200)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get(reverse('profile')).json()['email'], 'a@example.com')
+        stats = user_cache.stats()
+        self.assertEqual((stats['hits'], stats['misses'], stats['queries_saved']), (1, 1, 1))
+
+    def test_deactivation_takes_effect_immediately(self):
+        self.client.get(reverse('profile'))
+        self.user.is_active = False
+        self.user.save()
+        self.assertEqual(self.client.get(reverse('profile')).status_code, 401)
+
+    def test_cart_summary_hit_runs_no_queries(self):
+        cache.clear()
+        self.client.get(reverse('cart-summary'))
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get(reverse('cart-summary')).json()['line_count'], 0)
+        self.assertEqual(user_cache.stats()['stateless'], 2)
+
+    def test_metrics_are_admin_only(self):
+        self.assertEqual(self.client.get(reverse('auth-metrics')).status_code, 403)
+        admin_user = User.objects.create_superuser(email='admin@example.com', name='Admin', tc=True, password='pw')
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(admin_user).access_token}')
+        self.assertIn('hit_rate', self.client.get(reverse('auth-metrics')).json()['jwt_user_cache'])
+
+
+@override_settings(LOGIN_THROTTLE_RATES={'ip': (4, 0.001), 'email': (2, 0.001)}, PASSWORD_HASH_QUEUE_TIMEOUT=0)
+class LoginThrottleTests(TestCase):
+    def setUp(self):
+        buckets.clear()
+        metrics.reset()
+        User.objects.create_user(email='a@example.com', name='A', tc=True, password='pw')
+
+    def login(self, email='a@example.com', password='wrong', ip='10.0.0.1'):
+        return self.client.post(reverse('login'), {'email': email, 'password': password}, REMOTE_ADDR=ip)
+
+    def test_email_bucket_limits_guesses_per_account(self):
+        self.assertEqual([self.login().status_code for _ in range(3)], [400, 400, 429])
+        self.assertIn('Retry-After', self.login(ip='10.0.0.2'))
+        self.assertEqual(self.login(email='A@example.com ', ip='10.0.0.3').status_code, 429)
+        self.assertEqual(self.login(email='b@example.com', ip='10.0.0.4').status_code, 400)
+
+    def test_ip_bucket_limits_spraying_across_accounts(self):
+        codes = [self.login(email=f'user{i}@example.com').status_code for i in range(5)]
+        self.assertEqual(codes, [400, 400, 400, 400, 429])
+        self.assertEqual(self.login(email='other@example.com', ip='10.0.0.9').status_code, 400)
+        self.assertEqual(metrics.stats()['rejected']['ip'], 1)
+
+    def test_rotating_x_forwarded_for_does_not_reset_the_ip_bucket(self):
+        codes = [
+            self.client.post(
+                reverse('login'), {'email': f'user{i}@example.com', 'password': 'x'},
+                REMOTE_ADDR='10.0.0.1', HTTP_X_FORWARDED_FOR=f'203.0.113.{i}',
+            ).status_code
+            for i in range(5)
+        ]
+        self.assertEqual(codes, [400, 400, 400, 400, 429])
+        # Behind one proxy, the address it appended is the client's.
+        buckets.clear()
+        with override_settings(REST_FRAMEWORK={**settings.REST_FRAMEWORK, 'NUM_PROXIES': 1}):
+            codes = [
+                self.client.post(
+                    reverse('login'), {'email': f'user{i}@example.com', 'password': 'x'},
+                    REMOTE_ADDR='10.0.0.1', HTTP_X_FORWARDED_FOR=f'203.0.113.{i}, 198.51.100.7',
+                ).status_code
+                for i in range(5)
+            ]
+        self.assertEqual(codes, [400, 400, 400, 400, 429])
+
+    def test_sheds_load_before_hashing_when_slots_are_busy(self):
+        for _ in range(hash_limit.size):
+            hash_limit.semaphore.acquire()
+        try:
+            with mock.patch('account.views.authenticate') as authenticate:
+                self.assertEqual(self.login(password='pw').status_code, 429)
+            authenticate.assert_not_called()
+        finally:
+            for _ in range(hash_limit.size):
+                hash_limit.semaphore.release()
+        self.assertEqual(self.login(password='pw').status_code, 200)
+        stats = metrics.stats()
+        self.assertEqual((stats['hashes'], stats['rejected']['concurrency'], stats['in_flight']), (1, 1, 0))
+
+
+class AsyncAuthViewTests(TestCase):
+    def setUp(self):
+        buckets.clear()
+        User.objects.create_user(email='a@example.com', name='A', tc=True, password='pw')
+
+    async def test_login(self):
+        url = reverse('login-async')
+        response = await self.async_client.post(url, {'email': 'a@example.com', 'password': 'pw'}, content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(set(response.json()['token']), {'refresh', 'access'})
+        response = await self.async_client.post(url, {'email': 'a@example.com', 'password': 'nope'}, content_type='application/json')
+        self.assertEqual(response.json(), {'errors': {'non_field_errors': ['Invalid email or password']}})
+        response = await self.async_client.post(url, {'email': 'not-an-email'}, content_type='application/json')
+        self.assertEqual(set(response.json()['errors']), {'email', 'password'})
+
+    @override_settings(LOGIN_THROTTLE_RATES=DEFAULT_RATES)
+    async def test_login_is_throttled_per_email(self):
+        codes = [
+            (await self.async_client.post(reverse('login-async'), {'email': 'a@example.com', 'password': 'x'}, content_type='application/json')).status_code
+            for _ in range(6)
+        ]
+        self.assertEqual(codes, [400] * 5 + [429])
+
+    async def test_reset_email_is_queued(self):
+        url = reverse('resetPassword-async')
+        response = await self.async_client.post(url, {'email': 'a@example.com'}, content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+        notification = await Notification.objects.aget(channel='email')
+        self.assertIn('/api/user/reset/', notification.body)
+        response = await self.async_client.post(url, {'email': 'b@example.com'}, content_type='application/json')
+        self.assertEqual(response.status_code, 400)
@@ -0,0 +1,159 @@
+"""Protection for the password-hashing endpoints (login, registration, password changes).
+
+Token buckets per client IP and per submitted email limit how often each can make
+the server hash a password, and a process-wide semaphore caps how many hashes run
+at once. Requests over either limit get a 429 before any hashing starts, so a
+flood of logins cannot pin every core and starve the rest of the API.
+
+Buckets live in process memory and are shared by the worker's threads; with several
+worker processes each one enforces the limits on its own.
+"""
+import os
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+
+from django.conf import settings
+from rest_framework.exceptions import Throttled
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle
+
+# (burst, sustained tokens per second)
+DEFAULT_RATES = {
+    'ip': (20, 20 / 60),
+    'email': (5, 5 / 300),
+}
+MAX_BUCKETS = 100000
+
+
+class TokenBucketStore:
+    def __init__(self, max_buckets=MAX_BUCKETS):
+        self.max_buckets = max_buckets
+        self.lock = threading.Lock()
+        self.buckets = OrderedDict()  # key -> (tokens, last refill), least recently used first
+
+    def consume(self, key, capacity, rate, now=None):
+        """Take one token from ``key``'s bucket. Returns 0 on success, otherwise the
+        seconds until a token is available."""
+        now = now if now is not None else time.monotonic()
+        with self.lock:
+            tokens, updated = self.buckets.pop(key, (capacity, now))
+            tokens = min(capacity, tokens + (now - updated) * rate)
+            wait = 0 if tokens >= 1 else (1 - tokens) / rate
+            self.buckets[key] = (tokens - 1 if not wait else tokens, now)
+            while len(self.buckets) > self.max_buckets:
+                self.buckets.popitem(last=False)
+            return wait
+
+    def clear(self):
+        with self.lock:
+            self.buckets.clear()
+
+
+class HashMetrics:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self.hashes = 0
+        self.hash_seconds = 0.0
+        self.max_hash_seconds = 0.0
+        self.rejected = {'ip': 0, 'email': 0, 'concurrency': 0}
+
+    def record_hash(self, seconds):
+        with self.lock:
+            self.hashes += 1
+            self.hash_seconds += seconds
+            self.max_hash_seconds = max(self.max_hash_seconds, seconds)
+
+    def record_rejection(self, reason):
+        with self.lock:
+            self.rejected[reason] += 1
+
+    def stats(self):
+        with self.lock:
+            return {
+                'hashes': self.hashes,
+                'avg_hash_ms': round(self.hash_seconds / self.hashes * 1000, 2) if self.hashes else None,
+                'max_hash_ms': round(self.max_hash_seconds * 1000, 2),
+                'in_flight': hash_limit.in_flight,
+                'max_concurrent': hash_limit.size,
+                'rejected': dict(self.rejected),
+            }
+
+
+class HashLimit:
+    def __init__(self, size):
+        self.size = size
+        self.semaphore = threading.BoundedSemaphore(size)
+        self.lock = threading.Lock()
+        self.in_flight = 0
+
+    def adjust(self, delta):
+        with self.lock:
+            self.in_flight += delta
+
+
+buckets = TokenBucketStore()
+metrics = HashMetrics()
+# By default hashing may use half the cores, leaving the rest for everything else.
+hash_limit = HashLimit(getattr(settings, 'PASSWORD_HASH_CONCURRENCY', None) or max(1, (os.cpu_count() or 2) // 2))
+
+
+class TokenBucketThrottle(BaseThrottle):
+    scope = None
+
+    def get_ident_key(self, request):
+        raise NotImplementedError
+
+    def allow_request(self, request, view):
+        key = self.get_ident_key(request)
+        if key is None:
+            return True
+        capacity, rate = getattr(settings, 'LOGIN_THROTTLE_RATES', DEFAULT_RATES)[self.scope]
+        self.retry_after = buckets.consume(f"{self.scope}:{key}", capacity, rate)
+        if self.retry_after:
+            metrics.record_rejection(self.scope)
+            return False
+        return True
+
+    def wait(self):
+        return self.retry_after
+
+
+class LoginIPThrottle(TokenBucketThrottle):
+    scope = 'ip'
+
+    def get_ident_key(self, request):
+        # With NUM_PROXIES unset DRF keys on the whole client-supplied X-Forwarded-For,
+        # so a client could rotate it to get a fresh bucket on every request.
+        if api_settings.NUM_PROXIES is None:
+            return request.META.get('REMOTE_ADDR')
+        return self.get_ident(request)
+
+
+class LoginEmailThrottle(TokenBucketThrottle):
+    scope = 'email'
+
+    def get_ident_key(self, request):
+        email = request.data.get('email') if hasattr(request.data, 'get') else None
+        return email.strip().lower() if isinstance(email, str) and email else None
+
+
+@contextmanager
+def hashing_slot():
+    """Run password hashing within the concurrency cap, or raise ``Throttled`` (429)
+    if no slot frees up within ``PASSWORD_HASH_QUEUE_TIMEOUT`` seconds."""
+    if not hash_limit.semaphore.acquire(timeout=getattr(settings, 'PASSWORD_HASH_QUEUE_TIMEOUT', 0.5)):
+        metrics.record_rejection('concurrency')
+        raise Throttled(wait=1, detail="Server is busy, please retry shortly.")
+    hash_limit.adjust(1)
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        metrics.record_hash(time.perf_counter() - started)
+        hash_limit.adjust(-1)
+        hash_limit.semaphore.release()
@@ -1,15 +1,18 @@
 
 from django.urls import path,include
-from account.views import UserRegistration,UserLoginView,UserProfileView,UserChangePassword,SendPasswordResetEmailView,UserPasswordResetView
+from account.views import UserRegistration,UserLoginView,UserProfileView,UserChangePassword,SendPasswordResetEmailView,UserPasswordResetView,AuthMetricsView,AsyncUserLoginView,AsyncSendPasswordResetEmailView
 
 
 urlpatterns = [
     path("register/",UserRegistration.as_view(),name="register"),
     path("login/",UserLoginView.as_view(),name="login"),
+    path("login/async/",AsyncUserLoginView.as_view(),name="login-async"),
     path("profile/",UserProfileView.as_view(),name="profile"),
     path("changePassword/",UserChangePassword.as_view(),name="changePassword"),
     path("resetPassword/",SendPasswordResetEmailView.as_view(),name='resetPassword'),
-    path('resetPassword/<uid>/<token>/',UserPasswordResetView.as_view(),name='resetPassword')
+    path("resetPassword/async/",AsyncSendPasswordResetEmailView.as_view(),name='resetPassword-async'),
+    path('resetPassword/<uid>/<token>/',UserPasswordResetView.as_view(),name='resetPassword'),
+    path("metrics/",AuthMetricsView.as_view(),name="auth-metrics"),
 
 
 ]
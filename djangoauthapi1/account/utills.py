@@ -1,13 +1,10 @@
-from django.core.mail import EmailMessage
-import os
+from notification.utils import aenqueue, enqueue
 class Utill:
     @staticmethod
     def send_email(data):
-        email=EmailMessage(
-            subject=data['subject'],
-            body=data['body'],
-            from_email=os.environ.get("EMAIL_FROM"),
-            to=[data['to_email']]
+        # Queued for the send_notifications worker rather than sent inside the request
+        return enqueue('email', data['to_email'], data['body'], subject=data['subject'])
 
-        )
-        email.send()
+    @staticmethod
+    async def asend_email(data):
+        return await aenqueue('email', data['to_email'], data['body'], subject=data['subject'])
@@ -7,13 +7,22 @@ from .serializers import (
     UserProfileSerializer, 
     UserChangePasswordSerializer, 
     SendPasswordResetEmailSerializer, 
-    UserPasswordResetSerializer
+    UserPasswordResetSerializer,
+    password_reset_email,
 )
 from django.contrib.auth import authenticate
+from django.contrib.auth.hashers import check_password, make_password
+from django.http import JsonResponse
+from rest_framework import serializers
+from rest_framework.exceptions import Throttled
+from djangoauthapi1.asyncviews import AsyncAPIView, cpu_pool
 from .renderers import UserRenderer
 from rest_framework_simplejwt.tokens import RefreshToken
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.permissions import IsAdminUser, IsAuthenticated
 from account.models import User
+from .authentication import user_cache
+from .utills import Utill
+from .throttling import LoginEmailThrottle, LoginIPThrottle, hashing_slot, metrics as hash_metrics
 
 def get_tokens_for_user(user):
     refresh = RefreshToken.for_user(user)
@@ -24,22 +33,26 @@ def get_tokens_for_user(user):
 
 class UserRegistration(APIView):
     renderer_classes = [UserRenderer]
+    throttle_classes = [LoginIPThrottle]
     def post(self, request, format=None):
         serializer = UserRegistrationSerializer(data=request.data)
         if serializer.is_valid():
-            user = serializer.save()
+            with hashing_slot():
+                user = serializer.save()
             token = get_tokens_for_user(user)
             return Response({"token": token, 'msg': 'User created successfully'}, status=status.HTTP_201_CREATED)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 class UserLoginView(APIView):
     renderer_classes = [UserRenderer]
+    throttle_classes = [LoginIPThrottle, LoginEmailThrottle]
     def post(self, request, format=None):
         serializer = UserLoginSerializer(data=request.data)
         if serializer.is_valid():
             email = serializer.validated_data.get('email')
             password = serializer.validated_data.get('password')
-            user = authenticate(email=email, password=password)
+            with hashing_slot():
+                user = authenticate(email=email, password=password)
             if user:
                 token = get_tokens_for_user(user)
                 return Response({"token": token, 'msg': 'Login successful'}, status=status.HTTP_200_OK)
@@ -56,9 +69,13 @@ class UserProfileView(APIView):
 class UserChangePassword(APIView):
     renderer_classes = [UserRenderer]
     permission_classes = [IsAuthenticated]
+    throttle_classes = [LoginIPThrottle]
     def post(self, request, format=None):
         serializer = UserChangePasswordSerializer(data=request.data, context={'user': request.user})
-        if serializer.is_valid():
+        # validate() sets the new password
+        with hashing_slot():
+            valid = serializer.is_valid()
+        if valid:
             return Response({'msg': 'Password changed successfully'}, status=status.HTTP_200_OK)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
@@ -72,8 +89,59 @@ class SendPasswordResetEmailView(APIView):
 
 class UserPasswordResetView(APIView):
     renderer_classes = [UserRenderer]
+    throttle_classes = [LoginIPThrottle]
     def post(self, request, uid, token, format=None):
         serializer = UserPasswordResetSerializer(data=request.data, context={'uid': uid, 'token': token})
-        if serializer.is_valid():
+        with hashing_slot():
+            valid = serializer.is_valid()
+        if valid:
             return Response({'msg': 'Password reset successful'}, status=status.HTTP_200_OK)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+
+class AuthMetricsView(APIView):
+    """Per-process counters for JWT user resolution and password hashing."""
+    permission_classes = [IsAdminUser]
+    def get(self, request, format=None):
+        return Response({'jwt_user_cache': user_cache.stats(), 'password_hashing': hash_metrics.stats()}, status=status.HTTP_200_OK)
+
+
+def check_credentials(user, password):
+    """Blocking: verify ``password`` within the hashing cap. An unknown email still
+    pays for one hash, as ModelBackend does, so it cannot be told apart by timing."""
+    with hashing_slot():
+        if user is None:
+            make_password(password)
+            return False
+        return check_password(password, user.password) and user.is_active
+
+
+class AsyncUserLoginView(AsyncAPIView):
+    """ASGI variant of UserLoginView: the user is fetched with the async ORM and the
+    password hash runs on the CPU pool."""
+    async def post(self, request, format=None):
+        for throttle in (LoginIPThrottle(), LoginEmailThrottle()):
+            if not throttle.allow_request(request, self):
+                raise Throttled(wait=throttle.wait())
+        serializer = UserLoginSerializer(data=request.data)
+        if not serializer.is_valid():
+            return JsonResponse({'errors': serializer.errors}, status=status.HTTP_400_BAD_REQUEST)
+        email = serializer.validated_data.get('email')
+        user = await User.objects.filter(email=email).afirst()
+        if await cpu_pool.run(check_credentials, user, serializer.validated_data.get('password')):
+            return JsonResponse({"token": get_tokens_for_user(user), 'msg': 'Login successful'}, status=status.HTTP_200_OK)
+        return JsonResponse({'errors': {'non_field_errors': ['Invalid email or password']}}, status=status.HTTP_400_BAD_REQUEST)
+
+
+class AsyncSendPasswordResetEmailView(AsyncAPIView):
+    """ASGI variant of SendPasswordResetEmailView; the lookup and the outbox insert use the async ORM."""
+    async def post(self, request, format=None):
+        try:
+            email = serializers.EmailField(max_length=255).run_validation(request.data.get('email'))
+        except serializers.ValidationError as e:
+            return JsonResponse({'errors': {'email': e.detail}}, status=status.HTTP_400_BAD_REQUEST)
+        user = await User.objects.filter(email=email).afirst()
+        if user is None:
+            return JsonResponse({'errors': {'non_field_errors': ['You are not registered.']}}, status=status.HTTP_400_BAD_REQUEST)
+        await Utill.asend_email(password_reset_email(user))
+        return JsonResponse({'msg': 'Password reset link sent. Check your email.'}, status=status.HTTP_200_OK)
@@ -0,0 +1,40 @@
+from django.contrib import admin
+from .models import DailyCategorySales, DailyProductSales, DailySales, SalesWatermark
+
+
+class SalesRollupAdmin(admin.ModelAdmin):
+    """Read-only dashboards over the pre-aggregated rows."""
+    date_hierarchy = 'day'
+    ordering = ('-day',)
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(DailySales)
+class DailySalesAdmin(SalesRollupAdmin):
+    list_display = ('day', 'orders', 'units', 'revenue')
+
+
+@admin.register(DailyProductSales)
+class DailyProductSalesAdmin(SalesRollupAdmin):
+    list_display = ('day', 'product', 'orders', 'units', 'revenue')
+    list_filter = ('product__category',)
+    search_fields = ('product__name',)
+    list_select_related = ('product',)
+    ordering = ('-day', '-revenue')
+
+
+@admin.register(DailyCategorySales)
+class DailyCategorySalesAdmin(SalesRollupAdmin):
+    list_display = ('day', 'category', 'orders', 'units', 'revenue')
+    list_filter = ('category',)
+    ordering = ('-day', '-revenue')
+
+
+@admin.register(SalesWatermark)
+class SalesWatermarkAdmin(admin.ModelAdmin):
+    list_display = ('source', 'value', 'updated_at')
@@ -0,0 +1,19 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+
+from analytics.utils import rebuild, rollup_sales
+
+
+class Command(BaseCommand):
+    help = "Fold new orders into the daily sales rollups. Run it periodically (e.g. every 15 minutes from cron)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--lag-seconds', type=int, default=300, help="Ignore orders newer than this, so in-flight transactions are not skipped.")
+        parser.add_argument('--batch-size', type=int, default=1000, help="Orders folded per transaction.")
+        parser.add_argument('--rebuild', action='store_true', help="Recompute every rollup from scratch.")
+
+    def handle(self, *args, **options):
+        run = rebuild if options['rebuild'] else rollup_sales
+        folded = run(lag=timedelta(seconds=options['lag_seconds']), batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"Rolled up {folded} order(s)."))
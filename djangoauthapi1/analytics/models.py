@@ -0,0 +1,64 @@
+from django.db import models
+from product.models import Product
+
+
+class SalesRollup(models.Model):
+    """Sales for one day, summed from ``OrderItem.price * quantity``. Reports read these
+    rows instead of scanning orders (see analytics.utils.rollup_sales)."""
+    day = models.DateField()
+    units = models.PositiveIntegerField(default=0)
+    revenue = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    orders = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        abstract = True
+
+
+class DailySales(SalesRollup):
+    day = models.DateField(unique=True)
+
+    class Meta:
+        verbose_name_plural = 'daily sales'
+
+    def __str__(self):
+        return f"{self.day}: {self.revenue}"
+
+
+class DailyProductSales(SalesRollup):
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='daily_sales')
+
+    class Meta:
+        verbose_name_plural = 'daily product sales'
+        constraints = [
+            models.UniqueConstraint(fields=['day', 'product'], name='unique_daily_product_sales'),
+        ]
+        indexes = [
+            models.Index(fields=['product', 'day'], name='product_sales_product_day_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.day} {self.product_id}: {self.revenue}"
+
+
+class DailyCategorySales(SalesRollup):
+    # Products without a category roll up under ''.
+    category = models.CharField(max_length=50, blank=True)
+
+    class Meta:
+        verbose_name_plural = 'daily category sales'
+        constraints = [
+            models.UniqueConstraint(fields=['day', 'category'], name='unique_daily_category_sales'),
+        ]
+
+    def __str__(self):
+        return f"{self.day} {self.category or '-'}: {self.revenue}"
+
+
+class SalesWatermark(models.Model):
+    """Highest order id folded into the rollups."""
+    source = models.CharField(max_length=50, unique=True)
+    value = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.source} @ {self.value}"
@@ -0,0 +1,91 @@
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from account.models import User
+from order.models import Order, OrderItem
+from product.models import Product
+from .models import DailyCategorySales, DailyProductSales, DailySales
+from .utils import rebuild, rollup_sales
+
+DAY1 = datetime(2024, 3, 1, 10, tzinfo=dt_timezone.utc)
+DAY2 = DAY1 + timedelta(days=1)
+
+
+class SalesRollupTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(email='a@example.com', name='A', tc=True, password='pw')
+        self.boot = Product.objects.create(name='Boot', price=50, stock=10, category='BOAT')
+        self.clog = Product.objects.create(name='Clog', price=20, stock=10, category='CLOG')
+        self.plain = Product.objects.create(name='Plain', price=5, stock=10)
+
+    def order(self, when, *lines):
+        order = Order.objects.create(user=self.user, shipping_address='x', city='x', postal_code='1', country='PK')
+        Order.objects.filter(id=order.id).update(created_at=when)
+        OrderItem.objects.bulk_create([
+            OrderItem(order=order, product=product, quantity=quantity, price=price) for product, quantity, price in lines
+        ])
+
+    def test_incremental_rollup_matches_raw_orders(self):
+        self.order(DAY1, (self.boot, 2, 45), (self.clog, 1, 20))
+        self.order(DAY1, (self.boot, 1, 50), (self.plain, 3, None))
+        self.assertEqual(rollup_sales(), 2)
+
+        self.order(DAY1 + timedelta(hours=5), (self.clog, 4, 20))
+        self.order(DAY2, (self.boot, 1, 50))
+        # Too recent for this run; picked up by the next one.
+        self.order(timezone.now(), (self.boot, 1, 50))
+        self.assertEqual(rollup_sales(batch_size=1), 2)
+        self.assertEqual(rollup_sales(), 0)
+
+        self.assertEqual(
+            list(DailySales.objects.order_by('day').values_list('day', 'units', 'revenue', 'orders')),
+            [(DAY1.date(), 11, 240, 3), (DAY2.date(), 1, 50, 1)],
+        )
+        boot = DailyProductSales.objects.get(day=DAY1.date(), product=self.boot)
+        self.assertEqual((boot.units, boot.revenue, boot.orders), (3, 140, 2))
+        self.assertEqual(
+            dict(DailyCategorySales.objects.filter(day=DAY1.date()).values_list('category', 'revenue')),
+            {'BOAT': 140, 'CLOG': 100, '': 0},
+        )
+
+        snapshot = list(DailyProductSales.objects.order_by('day', 'product_id').values_list('day', 'product_id', 'units', 'revenue', 'orders'))
+        rebuild()
+        self.assertEqual(snapshot, list(DailyProductSales.objects.order_by('day', 'product_id').values_list('day', 'product_id', 'units', 'revenue', 'orders')))
+
+    def test_fold_locks_only_the_rollup_rows_the_batch_touches(self):
+        DailyProductSales.objects.bulk_create(
+            [DailyProductSales(day=DAY1.date(), product=Product.objects.create(name=f'Other {i}', price=1)) for i in range(20)]
+        )
+        self.order(DAY1, (self.boot, 1, 50))
+        with CaptureQueriesContext(connection) as queries:
+            rollup_sales()
+        table = DailyProductSales._meta.db_table
+        select = next(q['sql'] for q in queries if q['sql'].startswith('SELECT') and f'FROM "{table}"' in q['sql'])
+        self.assertIn('"product_id" IN', select)
+        self.assertEqual(DailyProductSales.objects.get(day=DAY1.date(), product=self.boot).units, 1)
+
+    def test_report_api_is_admin_only_and_reads_rollups(self):
+        self.order(DAY1, (self.boot, 2, 45), (self.clog, 1, 20))
+        self.order(DAY2, (self.clog, 1, 20))
+        rollup_sales()
+
+        client = APIClient()
+        client.force_authenticate(self.user)
+        url = reverse('sales-report')
+        self.assertEqual(client.get(url).status_code, 403)
+
+        client.force_authenticate(User.objects.create_superuser(email='admin@example.com', name='Admin', tc=True, password='pw'))
+        params = {'start': '2024-03-01', 'end': '2024-03-02'}
+        with self.assertNumQueries(1):
+            products = client.get(url, {**params, 'group': 'product'}).json()['results']
+        self.assertEqual(products[0], {'product_id': self.boot.id, 'name': 'Boot', 'units': 2, 'revenue': '90.00', 'orders': 1})
+        self.assertEqual(products[1]['orders'], 2)
+        days = client.get(url, params).json()['results']
+        self.assertEqual([day['revenue'] for day in days], ['110.00', '20.00'])
+        self.assertEqual(client.get(url, {**params, 'group': 'week'}).status_code, 400)
@@ -0,0 +1,104 @@
+from collections import defaultdict
+from datetime import timedelta
+from functools import reduce
+from operator import or_
+
+from django.db import transaction
+from django.db.models import Count, DecimalField, F, Q, Sum, Value
+from django.db.models.functions import Coalesce, TruncDate
+from django.utils import timezone
+
+from order.models import Order, OrderItem
+from .models import DailyCategorySales, DailyProductSales, DailySales, SalesWatermark
+
+ORDERS = 'order'
+MONEY = DecimalField(max_digits=14, decimal_places=2)
+
+
+def _totals(items, *keys):
+    """Per (day, *keys) units, revenue and distinct orders, aggregated in the database."""
+    return (
+        items
+        .annotate(day=TruncDate('order__created_at'))
+        .values('day', *keys)
+        .annotate(
+            units=Sum('quantity'),
+            revenue=Sum(Coalesce(F('price'), Value(0), output_field=MONEY) * F('quantity'), output_field=MONEY),
+            orders=Count('order_id', distinct=True),
+        )
+        .order_by()
+    )
+
+
+def _fold(model, rows, key_fields):
+    """Add ``rows`` of deltas into ``model``, creating missing rows first. ``key_fields``
+    is ``day`` plus at most one other field."""
+    if not rows:
+        return
+    model.objects.bulk_create(
+        [model(**{field: row[field] for field in key_fields}) for row in rows],
+        ignore_conflicts=True,
+    )
+    wanted = {tuple(row[field] for field in key_fields): row for row in rows}
+    # Lock only the rows this batch adds to, not every rollup of the days it touches:
+    # one "day = d AND key IN (...)" term per day.
+    keys_by_day = defaultdict(list)
+    for day, *key in wanted:
+        keys_by_day[day].extend(key)
+    lookups = [
+        Q(day=day, **{f'{field}__in': keys for field in key_fields[1:]})
+        for day, keys in keys_by_day.items()
+    ]
+    updated = []
+    for rollup in model.objects.select_for_update().filter(reduce(or_, lookups)):
+        row = wanted.get(tuple(getattr(rollup, field) for field in key_fields))
+        if row is None:
+            continue
+        rollup.units += row['units']
+        rollup.revenue += row['revenue']
+        rollup.orders += row['orders']
+        updated.append(rollup)
+    model.objects.bulk_update(updated, ['units', 'revenue', 'orders'])
+
+
+def rollup_sales(lag=timedelta(minutes=5), batch_size=1000, now=None):
+    """Fold orders placed since the watermark into the daily rollups.
+
+    An order's items are written in the same transaction as the order, so working in
+    whole orders keeps the distinct-order counts exact. Orders newer than ``lag`` are
+    left for the next run so transactions committing out of id order are not skipped.
+    Returns the number of orders folded in.
+    """
+    now = now or timezone.now()
+    cutoff = now - lag
+    SalesWatermark.objects.get_or_create(source=ORDERS)
+    folded = 0
+    while True:
+        with transaction.atomic():
+            mark = SalesWatermark.objects.select_for_update().get(source=ORDERS)
+            batch = list(
+                Order.objects.filter(id__gt=mark.value, created_at__lt=cutoff)
+                .order_by('id').values_list('id', flat=True)[:batch_size]
+            )
+            if not batch:
+                return folded
+            items = OrderItem.objects.filter(order_id__gt=mark.value, order_id__lte=batch[-1])
+            product_rows = list(_totals(items, 'product_id'))
+            category_rows = list(_totals(items, 'product__category'))
+            for row in category_rows:
+                row['category'] = row.pop('product__category') or ''
+            _fold(DailyProductSales, product_rows, ['day', 'product_id'])
+            _fold(DailyCategorySales, category_rows, ['day', 'category'])
+            _fold(DailySales, list(_totals(items)), ['day'])
+            mark.value = batch[-1]
+            mark.save(update_fields=['value', 'updated_at'])
+            folded += len(batch)
+
+
+def rebuild(**kwargs):
+    """Drop every rollup and recompute from the first order."""
+    with transaction.atomic():
+        for model in (DailySales, DailyProductSales, DailyCategorySales):
+            model.objects.all().delete()
+        SalesWatermark.objects.filter(source=ORDERS).update(value=0)
+    return rollup_sales(**kwargs)
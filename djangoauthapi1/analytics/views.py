@@ -0,0 +1,49 @@
+from datetime import date, timedelta
+
+from django.db.models import Sum
+from rest_framework import permissions
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from .models import DailyCategorySales, DailyProductSales, DailySales
+
+DEFAULT_DAYS = 30
+MAX_LIMIT = 500
+
+
+class SalesReportView(APIView):
+    """Sales between ``start`` and ``end`` (inclusive ISO dates, default the last 30 days),
+    grouped by ``day``, ``product`` or ``category``. Reads only the rollup tables."""
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request):
+        try:
+            end = date.fromisoformat(request.query_params['end']) if 'end' in request.query_params else date.today()
+            start = date.fromisoformat(request.query_params['start']) if 'start' in request.query_params else end - timedelta(days=DEFAULT_DAYS - 1)
+            limit = min(int(request.query_params.get('limit', 50)), MAX_LIMIT)
+        except ValueError:
+            return Response({"error": "start/end must be YYYY-MM-DD and limit an integer"}, status=400)
+        group = request.query_params.get('group', 'day')
+
+        totals = {'units': Sum('units'), 'revenue': Sum('revenue'), 'orders': Sum('orders')}
+        if group == 'day':
+            rows = DailySales.objects.filter(day__range=(start, end)).order_by('day').values('day', 'units', 'revenue', 'orders')
+        elif group == 'product':
+            rows = (
+                DailyProductSales.objects.filter(day__range=(start, end))
+                .values('product_id', 'product__name').annotate(**totals).order_by('-revenue')[:limit]
+            )
+        elif group == 'category':
+            rows = (
+                DailyCategorySales.objects.filter(day__range=(start, end))
+                .values('category').annotate(**totals).order_by('-revenue')
+            )
+        else:
+            return Response({"error": "group must be one of day, product, category"}, status=400)
+
+        rows = list(rows)
+        for row in rows:
+            row['revenue'] = f"{row['revenue']:.2f}"
+            if 'product__name' in row:
+                row['name'] = row.pop('product__name')
+        return Response({'start': start, 'end': end, 'group': group, 'results': rows})
@@ -0,0 +1,21 @@
+from django.apps import AppConfig
+from django.db.backends.signals import connection_created
+
+
+def _sqlite_concurrency(sender, connection, **kwargs):
+    """Let SQLite take concurrent client threads: WAL so readers never block the writer,
+    and BEGIN IMMEDIATE so a transaction takes the write lock up front and waits on the
+    busy timeout, instead of failing with "database is locked" when it upgrades from a
+    read lock held by another writer."""
+    if connection.vendor != 'sqlite':
+        return
+    connection.connection.execute('PRAGMA journal_mode=WAL')
+    connection._start_transaction_under_autocommit = lambda: connection.cursor().execute('BEGIN IMMEDIATE')
+
+
+class BenchmarksConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'benchmarks'
+
+    def ready(self):
+        connection_created.connect(_sqlite_concurrency)
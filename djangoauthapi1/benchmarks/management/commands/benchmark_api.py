@@ -0,0 +1,70 @@
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+
+from benchmarks.runner import compare, load_baseline, make_workers, project_routes, run_scenario, save_baseline, summarize
+from benchmarks.scenarios import SCENARIOS, seed
+from benchmarks.stubs import install_recognizer_stub
+
+
+class Command(BaseCommand):
+    help = "Seed a throwaway database and load-test every API route; report p50/p95/p99 and throughput against a stored baseline."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=200, help="Requests per scenario.")
+        parser.add_argument('--concurrency', type=int, default=4, help="Client threads, each with its own user.")
+        parser.add_argument('--products', type=int, default=500)
+        parser.add_argument('--orders-per-user', type=int, default=20)
+        parser.add_argument('--only', action='append', help="Run only scenarios whose name contains this (repeatable).")
+        parser.add_argument('--baseline', default='benchmarks/baseline.json')
+        parser.add_argument('--save-baseline', action='store_true', help="Store this run as the new baseline.")
+        parser.add_argument('--tolerance', type=float, default=0.2, help="Allowed p95 growth over the baseline (0.2 = 20%%).")
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        if not getattr(settings, 'BENCHMARK_SUITE', False):
+            raise CommandError("Run with DJANGO_SETTINGS_MODULE=benchmarks.settings; the database is flushed.")
+        install_recognizer_stub()
+
+        self.stdout.write(f"Preparing {settings.DATABASES['default']['ENGINE'].rsplit('.', 1)[-1]} database...")
+        call_command('migrate', verbosity=0)
+        call_command('flush', interactive=False, verbosity=0)
+        users, product_ids = seed(options['products'], options['concurrency'], options['orders_per_user'], options['seed'])
+        workers = make_workers(users, product_ids, options['seed'])
+
+        scenarios = [
+            scenario for scenario in SCENARIOS
+            if not options['only'] or any(part in scenario.name for part in options['only'])
+        ]
+        missing = project_routes() - {scenario.route for scenario in SCENARIOS}
+        if missing:
+            self.stdout.write(self.style.WARNING(f"Routes without a scenario: {', '.join(sorted(missing))}"))
+
+        results = {}
+        self.stdout.write(f"{'scenario':<26}{'reqs':>6}{'errs':>6}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'req/s':>9}")
+        for scenario in scenarios:
+            latencies, errors, wall = run_scenario(scenario, workers, options['requests'])
+            result = results[scenario.name] = summarize(latencies, errors, wall)
+            self.stdout.write(
+                f"{scenario.name:<26}{result['requests']:>6}{result['errors']:>6}"
+                f"{_fmt(result['p50_ms']):>10}{_fmt(result['p95_ms']):>10}{_fmt(result['p99_ms']):>10}{_fmt(result['throughput_rps']):>9}"
+            )
+            if errors:
+                self.stdout.write(self.style.WARNING(f"  first error: {errors[0]}"))
+
+        if options['save_baseline']:
+            save_baseline(options['baseline'], results)
+            self.stdout.write(self.style.SUCCESS(f"Saved baseline to {options['baseline']}"))
+            return
+        baseline = load_baseline(options['baseline'])
+        if baseline is None:
+            self.stdout.write(f"No baseline at {options['baseline']}; run with --save-baseline to create one.")
+            return
+        regressions = compare(results, baseline, options['tolerance'])
+        if regressions:
+            raise CommandError("Regressions against baseline:\n  " + "\n  ".join(regressions))
+        self.stdout.write(self.style.SUCCESS("No regressions against baseline."))
+
+
+def _fmt(value):
+    return '-' if value is None else f"{value:.1f}"
@@ -0,0 +1,125 @@
+import asyncio
+import threading
+import time
+
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.test import AsyncClient, Client
+
+from benchmarks.runner import summarize
+from benchmarks.scenarios import PASSWORD, jpeg, seed, upload, wav
+from benchmarks.stubs import install_recognizer_stub
+
+# endpoint -> (sync path, async path, request kwargs for a given user email)
+ENDPOINTS = {
+    'voice': ('/api/voice-search/', '/api/voice-search/async/', lambda email: {'data': {'audio': upload('.wav', wav())}}),
+    'predict': ('/api/predict/', '/api/predict/async/', lambda email: {'data': {'image': upload('.jpg', jpeg())}}),
+    'login': ('/api/user/login/', '/api/user/login/async/',
+              lambda email: {'data': {'email': email, 'password': PASSWORD}, 'content_type': 'application/json'}),
+    'reset': ('/api/user/resetPassword/', '/api/user/resetPassword/async/',
+              lambda email: {'data': {'email': email}, 'content_type': 'application/json'}),
+}
+
+
+def run_wsgi(path, make_kwargs, clients, rounds, threads):
+    """``clients`` concurrent users against a WSGI process with ``threads`` request
+    threads (gunicorn's gthread worker): a request waits for a free thread first."""
+    slots = threading.BoundedSemaphore(threads)
+    start = threading.Barrier(clients)
+    latencies, errors = [], []
+    lock = threading.Lock()
+
+    def user():
+        client = Client()
+        mine, failed = [], []
+        start.wait()
+        try:
+            for _ in range(rounds):
+                kwargs = make_kwargs()
+                started = time.perf_counter()
+                with slots:
+                    response = client.post(path, **kwargs)
+                (mine if response.status_code == 200 else failed).append((time.perf_counter() - started) * 1000)
+        finally:
+            connections.close_all()
+        with lock:
+            latencies.extend(mine)
+            errors.extend(failed)
+
+    workers = [threading.Thread(target=user) for _ in range(clients)]
+    started = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    return latencies, errors, time.perf_counter() - started
+
+
+def run_asgi(path, make_kwargs, clients, rounds):
+    """``clients`` concurrent users against the ASGI application on one event loop."""
+    latencies, errors = [], []
+
+    async def user():
+        client = AsyncClient()
+        for _ in range(rounds):
+            kwargs = make_kwargs()
+            started = time.perf_counter()
+            response = await client.post(path, **kwargs)
+            (latencies if response.status_code == 200 else errors).append((time.perf_counter() - started) * 1000)
+
+    async def main():
+        await asyncio.gather(*(user() for _ in range(clients)))
+
+    started = time.perf_counter()
+    asyncio.run(main())
+    return latencies, errors, time.perf_counter() - started
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare the sync endpoints on a thread-limited WSGI process with their async variants "
+        "on one ASGI event loop, at increasing numbers of concurrent clients."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--endpoint', choices=sorted(ENDPOINTS), default='voice')
+        parser.add_argument('--concurrency', type=int, nargs='+', default=[8, 32, 128])
+        parser.add_argument('--rounds', type=int, default=4, help="Requests per client.")
+        parser.add_argument('--threads', type=int, default=8, help="Request threads of the simulated WSGI process.")
+        parser.add_argument('--upstream-ms', type=float, default=200, help="Simulated speech API round trip.")
+        parser.add_argument('--slo-ms', type=float, default=1000, help="p99 a concurrency level must meet to count as sustained.")
+
+    def handle(self, *args, **options):
+        if not getattr(settings, 'BENCHMARK_SUITE', False):
+            raise CommandError("Run with DJANGO_SETTINGS_MODULE=benchmarks.settings; the database is flushed.")
+        install_recognizer_stub(latency=options['upstream_ms'] / 1000)
+        call_command('migrate', verbosity=0)
+        call_command('flush', interactive=False, verbosity=0)
+        accounts, _ = seed(products=200, users=1, orders_per_user=0)
+        sync_path, async_path, request = ENDPOINTS[options['endpoint']]
+        make_kwargs = lambda: request(accounts[0].email)  # noqa: E731
+
+        self.stdout.write(
+            f"{options['endpoint']}: WSGI with {options['threads']} threads vs ASGI with one event loop "
+            f"(io pool {settings.ASYNC_IO_WORKERS}, cpu pool {settings.ASYNC_CPU_WORKERS or 'cores'})"
+        )
+        self.stdout.write(f"{'mode':<6}{'clients':>8}{'reqs':>6}{'errs':>6}{'p50 ms':>10}{'p99 ms':>10}{'req/s':>9}")
+        sustained = {'wsgi': 0, 'asgi': 0}
+        for clients in options['concurrency']:
+            for mode in ('wsgi', 'asgi'):
+                if mode == 'wsgi':
+                    result = summarize(*run_wsgi(sync_path, make_kwargs, clients, options['rounds'], options['threads']))
+                else:
+                    result = summarize(*run_asgi(async_path, make_kwargs, clients, options['rounds']))
+                if not result['errors'] and result['p99_ms'] is not None and result['p99_ms'] <= options['slo_ms']:
+                    sustained[mode] = max(sustained[mode], clients)
+                self.stdout.write(
+                    f"{mode:<6}{clients:>8}{result['requests']:>6}{result['errors']:>6}"
+                    f"{result['p50_ms'] or 0:>10.1f}{result['p99_ms'] or 0:>10.1f}{result['throughput_rps'] or 0:>9.1f}"
+                )
+        self.stdout.write(self.style.SUCCESS(
+            f"Highest tested concurrency within p99 {options['slo_ms']:.0f} ms and no errors: "
+            f"WSGI {sustained['wsgi']}, ASGI {sustained['asgi']}"
+        ))
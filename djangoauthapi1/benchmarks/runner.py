@@ -0,0 +1,118 @@
+"""Drive scenarios through Django's test client from worker threads and summarize latency."""
+import json
+import random
+import statistics
+import threading
+import time
+
+from django.db import connections
+from django.test import Client
+from django.urls import URLPattern, URLResolver, get_resolver
+
+from .scenarios import Worker
+
+
+def run_scenario(scenario, workers, requests):
+    """Issue ``requests`` requests spread over one thread per worker. Returns the
+    latencies (ms) of successful requests, the error count and the wall time."""
+    latencies, errors = [], []
+    lock = threading.Lock()
+    shares = [requests // len(workers) + (i < requests % len(workers)) for i in range(len(workers))]
+
+    def loop(worker, count):
+        client = Client()
+        headers = {'HTTP_AUTHORIZATION': f'Bearer {worker.access}'} if scenario.auth else {}
+        mine, failed = [], []
+        try:
+            for _ in range(count):
+                if scenario.prepare:
+                    scenario.prepare(worker)
+                method, path, kwargs = scenario.request(worker)
+                started = time.perf_counter()
+                response = getattr(client, method)(path, **kwargs, **headers)
+                elapsed = (time.perf_counter() - started) * 1000
+                if response.status_code in scenario.ok:
+                    mine.append(elapsed)
+                else:
+                    failed.append(f"{response.status_code} {response.content[:200]!r}")
+        finally:
+            connections.close_all()
+        with lock:
+            latencies.extend(mine)
+            errors.extend(failed)
+
+    threads = [threading.Thread(target=loop, args=(worker, count)) for worker, count in zip(workers, shares) if count]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return latencies, errors, time.perf_counter() - started
+
+
+def summarize(latencies, errors, wall):
+    if len(latencies) >= 2:
+        cuts = statistics.quantiles(latencies, n=100, method='inclusive')
+        p50, p95, p99 = cuts[49], cuts[94], cuts[98]
+    else:
+        p50 = p95 = p99 = latencies[0] if latencies else None
+    return {
+        'requests': len(latencies) + len(errors),
+        'errors': len(errors),
+        'p50_ms': _round(p50),
+        'p95_ms': _round(p95),
+        'p99_ms': _round(p99),
+        'throughput_rps': round((len(latencies) + len(errors)) / wall, 1) if wall else None,
+    }
+
+
+def _round(value):
+    return round(value, 2) if value is not None else None
+
+
+def compare(results, baseline, tolerance=0.2, min_delta_ms=2.0):
+    """Scenarios whose p95 grew by more than ``tolerance`` (and ``min_delta_ms``, so
+    sub-millisecond noise is not flagged) against the baseline, or that now fail."""
+    regressions = []
+    for name, result in results.items():
+        before = baseline.get(name)
+        if not before:
+            continue
+        if result['errors'] and not before.get('errors'):
+            regressions.append(f"{name}: {result['errors']} errors (baseline had none)")
+        if result['p95_ms'] is None or before.get('p95_ms') is None:
+            continue
+        delta = result['p95_ms'] - before['p95_ms']
+        if delta > min_delta_ms and result['p95_ms'] > before['p95_ms'] * (1 + tolerance):
+            regressions.append(f"{name}: p95 {before['p95_ms']} -> {result['p95_ms']} ms (+{delta / before['p95_ms']:.0%})")
+    return regressions
+
+
+def project_routes():
+    """Every API route pattern in the URLconf, admin and media excluded."""
+    def walk(patterns, prefix=''):
+        for pattern in patterns:
+            route = prefix + str(pattern.pattern)
+            if isinstance(pattern, URLResolver):
+                if not route.startswith('admin/'):
+                    yield from walk(pattern.url_patterns, route)
+            elif isinstance(pattern, URLPattern) and route.startswith('api/'):
+                yield route
+    return set(walk(get_resolver().url_patterns))
+
+
+def load_baseline(path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def save_baseline(path, results):
+    with open(path, 'w') as f:
+        json.dump(results, f, indent=2, sort_keys=True)
+
+
+def make_workers(users, product_ids, seed):
+    return [Worker(user, product_ids, random.Random(seed + i)) for i, user in enumerate(users)]
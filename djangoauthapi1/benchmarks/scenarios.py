@@ -0,0 +1,190 @@
+"""Seed data and one scenario per API route for the benchmark suite."""
+import io
+import itertools
+import random
+import uuid
+import wave
+from datetime import timedelta
+from functools import lru_cache
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.tokens import PasswordResetTokenGenerator
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.utils import timezone
+from django.utils.encoding import force_bytes
+from django.utils.http import urlsafe_base64_encode
+from PIL import Image
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from account.models import User
+from analytics.utils import rollup_sales
+from cart.models import CartItem
+from favourite.models import Favourite
+from order.models import Order, OrderItem
+from popularity.utils import update_scores
+from product.models import Product
+from recommendation.utils import rebuild as rebuild_recommendations
+
+PASSWORD = 'bench-password'
+ADJECTIVES = ['black', 'white', 'tan', 'navy', 'classic', 'suede', 'leather', 'canvas', 'chunky', 'vintage']
+NOUNS = ['sneakers', 'loafers', 'boots', 'brogues', 'clogs', 'ballet flats', 'boat shoes', 'trainers']
+COLORS = ['black', 'white', 'brown']
+SIZES = ['40', '41', '42', '43']
+ORDER_FIELDS = {'shipping_address': '1 Mall Road', 'city': 'Lahore', 'postal_code': '54000', 'country': 'PK', 'phone': '+923001234567'}
+
+
+def seed(products=500, users=4, orders_per_user=20, seed=42):
+    """Create a catalog with skewed popularity, one admin user per benchmark worker
+    with favourites, a cart and an order history, then build the derived tables."""
+    rng = random.Random(seed)
+    categories = [value for value, _ in Product.CATEGORY_CHOICES]
+    Product.objects.bulk_create([
+        Product(
+            name=f"{rng.choice(ADJECTIVES)} {rng.choice(NOUNS)} {i}",
+            description="Synthetic benchmark product.",
+            price=rng.randint(20, 300),
+            stock=10 ** 6,
+            category=rng.choice(categories),
+        )
+        for i in range(products)
+    ], batch_size=1000)
+    product_ids = list(Product.objects.values_list('id', flat=True))
+    weights = [1 / (rank + 1) for rank in range(len(product_ids))]
+
+    password = make_password(PASSWORD)
+    accounts = User.objects.bulk_create([
+        User(email=f'bench{i}@example.com', name=f'Bench {i}', tc=True, is_admin=True, password=password)
+        for i in range(users)
+    ])
+    accounts = list(User.objects.filter(email__in=[user.email for user in accounts]).order_by('id'))
+    for user in accounts:
+        favourites = set(rng.choices(product_ids, weights, k=15))
+        Favourite.objects.bulk_create([Favourite(user=user, product_id=product_id) for product_id in favourites])
+        CartItem.objects.bulk_create([
+            CartItem(user=user, product_id=product_id, quantity=1, color=rng.choice(COLORS), size=rng.choice(SIZES))
+            for product_id in set(rng.choices(product_ids, weights, k=3))
+        ])
+        for _ in range(orders_per_user):
+            order = Order.objects.create(user=user, **{k: v for k, v in ORDER_FIELDS.items() if k != 'phone'})
+            Order.objects.filter(id=order.id).update(created_at=timezone.now() - timedelta(days=rng.randint(1, 60)))
+            OrderItem.objects.bulk_create([
+                OrderItem(order=order, product_id=product_id, quantity=rng.randint(1, 3), price=rng.randint(20, 300))
+                for product_id in set(rng.choices(product_ids, weights, k=rng.randint(1, 4)))
+            ])
+    rebuild_recommendations()
+    update_scores(lag=timedelta(0))
+    rollup_sales(lag=timedelta(0))
+    return accounts, product_ids
+
+
+@lru_cache(maxsize=None)
+def jpeg():
+    buffer = io.BytesIO()
+    Image.new('RGB', (320, 320), (120, 90, 60)).save(buffer, 'JPEG')
+    return buffer.getvalue()
+
+
+@lru_cache(maxsize=None)
+def wav():
+    buffer = io.BytesIO()
+    with wave.open(buffer, 'wb') as audio:
+        audio.setnchannels(1)
+        audio.setsampwidth(2)
+        audio.setframerate(16000)
+        audio.writeframes(b'\0\0' * 16000)
+    return buffer.getvalue()
+
+
+class Worker:
+    """State for one benchmark thread: its own user, tokens and a rotating product pick."""
+    def __init__(self, user, product_ids, rng):
+        self.user = user
+        self.product_ids = product_ids
+        self.rng = rng
+        refresh = RefreshToken.for_user(user)
+        self.refresh = str(refresh)
+        self.access = str(refresh.access_token)
+        self.counter = itertools.count()
+
+    def product(self):
+        return self.rng.choice(self.product_ids)
+
+    def cart_line(self):
+        line = CartItem.objects.filter(user=self.user).first()
+        if line is None:
+            line = CartItem.objects.create(user=self.user, product_id=self.product(), quantity=1, color='black', size='42')
+        return line.id
+
+    def fill_cart(self):
+        CartItem.objects.get_or_create(user=self.user, product_id=self.product(), color='black', size='42', defaults={'quantity': 1})
+
+
+class Scenario:
+    """One timed request. ``request`` returns ``(method, path, kwargs)`` for the test
+    client; ``prepare`` runs untimed before each request."""
+    def __init__(self, name, route, request, ok=(200,), auth=True, prepare=None):
+        self.name = name
+        self.route = route
+        self.request = request
+        self.ok = ok
+        self.auth = auth
+        self.prepare = prepare
+
+
+def reset_link(worker):
+    uid = urlsafe_base64_encode(force_bytes(worker.user.id))
+    token = PasswordResetTokenGenerator().make_token(User.objects.get(id=worker.user.id))
+    return f'/api/user/resetPassword/{uid}/{token}/'
+
+
+def upload(suffix, content):
+    # Unique names: the voice search view writes uploads to a temp file named after them
+    return SimpleUploadedFile(f'{uuid.uuid4().hex}{suffix}', content)
+
+
+def json_body(data):
+    return {'data': data, 'content_type': 'application/json'}
+
+
+SCENARIOS = [
+    Scenario('token', 'api/token/', lambda w: ('post', '/api/token/', json_body({'email': w.user.email, 'password': PASSWORD})), auth=False),
+    Scenario('token refresh', 'api/token/refresh/', lambda w: ('post', '/api/token/refresh/', json_body({'refresh': w.refresh})), auth=False),
+    Scenario('register', 'api/user/register/', lambda w: ('post', '/api/user/register/', json_body({
+        'email': f'new-{w.user.id}-{next(w.counter)}-{w.rng.random()}@example.com', 'name': 'New', 'password': PASSWORD, 'password2': PASSWORD, 'tc': True,
+    })), ok=(201,), auth=False),
+    Scenario('login', 'api/user/login/', lambda w: ('post', '/api/user/login/', json_body({'email': w.user.email, 'password': PASSWORD})), auth=False),
+    Scenario('login async', 'api/user/login/async/', lambda w: ('post', '/api/user/login/async/', json_body({'email': w.user.email, 'password': PASSWORD})), auth=False),
+    Scenario('profile', 'api/user/profile/', lambda w: ('get', '/api/user/profile/', {})),
+    Scenario('change password', 'api/user/changePassword/', lambda w: ('post', '/api/user/changePassword/', json_body({'password': PASSWORD, 'password2': PASSWORD}))),
+    Scenario('password reset email', 'api/user/resetPassword/', lambda w: ('post', '/api/user/resetPassword/', json_body({'email': w.user.email})), auth=False),
+    Scenario('password reset email async', 'api/user/resetPassword/async/', lambda w: ('post', '/api/user/resetPassword/async/', json_body({'email': w.user.email})), auth=False),
+    Scenario('password reset confirm', 'api/user/resetPassword/<uid>/<token>/', lambda w: ('post', reset_link(w), json_body({'password': PASSWORD, 'password2': PASSWORD})), auth=False),
+    Scenario('auth metrics', 'api/user/metrics/', lambda w: ('get', '/api/user/metrics/', {})),
+    Scenario('product list', 'api/products/', lambda w: ('get', '/api/products/', {}), auth=False),
+    Scenario('product list popular', 'api/products/', lambda w: ('get', '/api/products/?ordering=popular&category=sneaker', {})),
+    Scenario('product suggest', 'api/products/suggest/', lambda w: ('get', f'/api/products/suggest/?prefix={w.rng.choice(ADJECTIVES)[:3]}', {}), auth=False),
+    Scenario('product detail', 'api/products/<int:id>/', lambda w: ('get', f'/api/products/{w.product()}/', {})),
+    Scenario('cart list', 'api/cart/', lambda w: ('get', '/api/cart/', {})),
+    Scenario('cart add', 'api/cart/', lambda w: ('post', '/api/cart/', json_body({'product': w.product(), 'quantity': 1, 'color': 'black', 'size': '42'})), ok=(200, 201)),
+    Scenario('cart update', 'api/cart/<int:pk>/', lambda w: ('patch', f'/api/cart/{w.cart_line()}/', json_body({'quantity': 2}))),
+    Scenario('cart batch', 'api/cart/batch/', lambda w: ('post', '/api/cart/batch/', json_body({'operations': [
+        {'op': 'add', 'product': w.product(), 'quantity': 1, 'color': 'white', 'size': '41'},
+        {'op': 'update', 'id': w.cart_line(), 'quantity': 1},
+    ]}))),
+    Scenario('cart summary', 'api/cart/summary/', lambda w: ('get', '/api/cart/summary/', {})),
+    Scenario('reservation hold', 'api/reservations/', lambda w: ('post', '/api/reservations/', {}), ok=(200, 201), prepare=Worker.fill_cart),
+    Scenario('reservation list', 'api/reservations/', lambda w: ('get', '/api/reservations/', {})),
+    Scenario('reservation release', 'api/reservations/', lambda w: ('delete', '/api/reservations/', {}), ok=(200, 204)),
+    Scenario('order create', 'api/orders/', lambda w: ('post', '/api/orders/', json_body(ORDER_FIELDS)), ok=(201,), prepare=Worker.fill_cart),
+    Scenario('order history', 'api/orders/history/', lambda w: ('get', '/api/orders/history/', {})),
+    Scenario('favourite toggle', 'api/favourite/toggle/<int:product_id>/', lambda w: ('post', f'/api/favourite/toggle/{w.product()}/', {}), ok=(200, 201)),
+    Scenario('favourite list', 'api/favourite/', lambda w: ('get', '/api/favourite/', {})),
+    Scenario('product recommendations', 'api/recommendations/products/<int:product_id>/', lambda w: ('get', f'/api/recommendations/products/{w.product()}/', {})),
+    Scenario('cart recommendations', 'api/recommendations/cart/', lambda w: ('get', '/api/recommendations/cart/', {})),
+    Scenario('sales report', 'api/analytics/sales/', lambda w: ('get', '/api/analytics/sales/?group=product', {})),
+    Scenario('route metrics', 'api/metrics/routes/', lambda w: ('get', '/api/metrics/routes/', {})),
+    Scenario('predict', 'api/predict/', lambda w: ('post', '/api/predict/', {'data': {'image': upload('.jpg', jpeg())}}), auth=False),
+    Scenario('predict async', 'api/predict/async/', lambda w: ('post', '/api/predict/async/', {'data': {'image': upload('.jpg', jpeg())}}), auth=False),
+    Scenario('voice search', 'api/voice-search/', lambda w: ('post', '/api/voice-search/', {'data': {'audio': upload('.wav', wav())}}), auth=False),
+    Scenario('voice search async', 'api/voice-search/async/', lambda w: ('post', '/api/voice-search/async/', {'data': {'audio': upload('.wav', wav())}}), auth=False),
+]
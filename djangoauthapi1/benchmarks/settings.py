@@ -0,0 +1,49 @@
+"""Settings for the API benchmark suite: the project's settings on a throwaway local
+database, with the Keras model replaced by a stub.
+
+    DJANGO_SETTINGS_MODULE=benchmarks.settings python manage.py benchmark_api
+
+SQLite is used unless BENCHMARK_DATABASE=mysql, which runs against the local MySQL
+server configured in djangoauthapi1.settings, in its own BENCHMARK_DB_NAME database.
+The database is flushed and reseeded on every run.
+"""
+import os
+
+from benchmarks.stubs import install_tensorflow_stub
+
+install_tensorflow_stub()
+
+from djangoauthapi1.settings import *  # noqa: E402,F401,F403
+
+BENCHMARK_SUITE = True
+
+INSTALLED_APPS = INSTALLED_APPS + ['benchmarks']
+
+# The replica alias points at the same benchmark database (replica reads stay off
+# here), but gets its own test database so the routing tests also run under these
+# settings.
+if os.environ.get('BENCHMARK_DATABASE', 'sqlite') == 'mysql':
+    _name = os.environ.get('BENCHMARK_DB_NAME', 'buyzi_bench')
+    DATABASES = {
+        'default': {**DATABASES['default'], 'NAME': _name},
+        'replica': {**DATABASES['replica'], 'NAME': _name, 'TEST': {'NAME': f'test_{_name}_replica'}},
+    }
+else:
+    _path = str(os.environ.get('BENCHMARK_SQLITE_PATH', BASE_DIR / 'benchmarks' / 'bench.sqlite3'))
+    # Test databases go in files: threaded tests hit table locks on in-memory shared-cache ones.
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': _path,
+            'OPTIONS': {'timeout': 30},
+            'TEST': {'NAME': f'{_path}.test'},
+        }
+    }
+    DATABASES['replica'] = {**DATABASES['default'], 'TEST': {'NAME': f'{_path}.test-replica'}}
+
+# No query log growing in memory, and no throttling of the synthetic clients.
+DEBUG = False
+LOGIN_THROTTLE_RATES = {'ip': (10 ** 9, 10 ** 9), 'email': (10 ** 9, 10 ** 9)}
+EMAIL_BACKEND = 'django.core.mail.backends.locmem.EmailBackend'
+# Measure queueing for a hashing slot rather than shedding it as 429s.
+PASSWORD_HASH_QUEUE_TIMEOUT = 60
@@ -0,0 +1,43 @@
+"""Stand-ins for the ML dependencies, so the benchmark measures the web stack rather
+than TensorFlow inference or Google's speech API (and runs where neither is set up)."""
+import sys
+import time
+import types
+
+import numpy as np
+
+TRANSCRIPT = 'black leather sneakers'
+
+
+class StubModel:
+    """Answers like the shoe classifier: a confident softmax over the five classes,
+    picked from the image's brightness so different images get different classes."""
+    classes = 5
+
+    def predict(self, image_array, verbose=0):
+        index = int(image_array.mean() * 1000) % self.classes
+        probabilities = np.full((len(image_array), self.classes), 0.02)
+        probabilities[:, index] = 0.92
+        return probabilities
+
+
+def install_tensorflow_stub():
+    """Register a ``tensorflow`` module whose Keras loader returns ``StubModel``. Must run
+    before modelapi.views is imported."""
+    keras = types.SimpleNamespace(models=types.SimpleNamespace(load_model=lambda *args, **kwargs: StubModel()))
+    module = types.ModuleType('tensorflow')
+    module.keras = keras
+    sys.modules['tensorflow'] = module
+
+
+def install_recognizer_stub(latency=0.0):
+    """Answer every recognition with ``TRANSCRIPT`` after ``latency`` seconds, which
+    stands in for the round trip to Google's API."""
+    import speech_recognition as sr
+
+    def recognize_google(self, audio_data, **kwargs):
+        if latency:
+            time.sleep(latency)
+        return TRANSCRIPT
+
+    sr.Recognizer.recognize_google = recognize_google
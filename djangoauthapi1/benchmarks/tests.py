@@ -0,0 +1,25 @@
+from django.test import SimpleTestCase
+
+from .runner import compare, project_routes, summarize
+from .scenarios import SCENARIOS
+
+
+class SummaryTests(SimpleTestCase):
+    def test_percentiles_and_throughput(self):
+        result = summarize([float(ms) for ms in range(1, 101)], ['500'], wall=2.0)
+        self.assertEqual(result['requests'], 101)
+        self.assertEqual(result['errors'], 1)
+        self.assertEqual(result['p50_ms'], 50.5)
+        self.assertEqual(result['p99_ms'], 99.01)
+        self.assertEqual(result['throughput_rps'], 50.5)
+
+    def test_compare_ignores_noise_and_flags_regressions(self):
+        baseline = {'a': {'p95_ms': 1.0, 'errors': 0}, 'b': {'p95_ms': 10.0, 'errors': 0}, 'c': {'p95_ms': 10.0, 'errors': 0}}
+        results = {'a': {'p95_ms': 2.5, 'errors': 0}, 'b': {'p95_ms': 20.0, 'errors': 0}, 'c': {'p95_ms': 10.0, 'errors': 3}}
+        regressions = compare(results, baseline)
+        self.assertEqual(len(regressions), 2)
+        self.assertTrue(regressions[0].startswith('b: p95 10.0 -> 20.0'))
+        self.assertTrue(regressions[1].startswith('c: 3 errors'))
+
+    def test_every_api_route_has_a_scenario(self):
+        self.assertEqual(project_routes() - {scenario.route for scenario in SCENARIOS}, set())
@@ -1,5 +1,6 @@
 from django.contrib import admin
 from .models import CartItem
+from .utils import invalidate_cart_summary
 
 @admin.register(CartItem)
 class CartItemAdmin(admin.ModelAdmin):
@@ -10,3 +11,18 @@ class CartItemAdmin(admin.ModelAdmin):
     def get_product_name(self, obj):
         return obj.product.name
     get_product_name.short_description = 'Product Name'
+
+
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        invalidate_cart_summary(obj.user_id)
+
+    def delete_model(self, request, obj):
+        super().delete_model(request, obj)
+        invalidate_cart_summary(obj.user_id)
+
+    def delete_queryset(self, request, queryset):
+        user_ids = set(queryset.values_list('user_id', flat=True))
+        super().delete_queryset(request, queryset)
+        for user_id in user_ids:
+            invalidate_cart_summary(user_id)
@@ -1,8 +1,9 @@
 from rest_framework import serializers
 from .models import CartItem
 from product.models import Product
+from djangoauthapi1.middleware import TimedSerializerMixin
 
-class CartItemSerializer(serializers.ModelSerializer):
+class CartItemSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     product_name = serializers.CharField(source='product.name', read_only=True)
     product_price = serializers.DecimalField(source='product.price', max_digits=10, decimal_places=2, read_only=True)
     image = serializers.ImageField(source='product.image', use_url=True, read_only=True)
@@ -27,4 +28,40 @@ class CartItemSerializer(serializers.ModelSerializer):
             if 'size' in data and not data.get('size'):
                 raise serializers.ValidationError({"size": "Size cannot be empty."})
 
-        return data
\ No newline at end of file
+        return data
+
+class CartSummaryItemSerializer(CartItemSerializer):
+    available_stock = serializers.IntegerField(source='product.stock', read_only=True)
+    in_stock = serializers.SerializerMethodField()
+
+    class Meta(CartItemSerializer.Meta):
+        fields = CartItemSerializer.Meta.fields + ['available_stock', 'in_stock']
+
+    def get_in_stock(self, obj):
+        return (obj.product.stock or 0) >= obj.quantity
+
+
+class CartBatchOperationSerializer(serializers.Serializer):
+    OPS = ('add', 'update', 'remove')
+
+    op = serializers.ChoiceField(choices=OPS)
+    id = serializers.IntegerField(required=False)
+    product = serializers.IntegerField(required=False)
+    quantity = serializers.IntegerField(required=False, min_value=1)
+    color = serializers.CharField(max_length=50, required=False)
+    size = serializers.CharField(max_length=10, required=False)
+
+    def validate(self, data):
+        required = {
+            'add': ('product', 'quantity', 'color', 'size'),
+            'update': ('id', 'quantity'),
+            'remove': ('id',),
+        }[data['op']]
+        missing = {field: f"Required for '{data['op']}'." for field in required if not data.get(field)}
+        if missing:
+            raise serializers.ValidationError(missing)
+        return data
+
+
+class CartBatchSerializer(serializers.Serializer):
+    operations = CartBatchOperationSerializer(many=True, allow_empty=False)
@@ -1,3 +1,176 @@
-from django.test import TestCase
+import threading
+from unittest import mock
 
-# Create your tests here.
+from django.core.cache import cache
+from django.db import IntegrityError, connection
+from django.test import TestCase, TransactionTestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from account.models import User
+from product.models import Product
+from .models import CartItem
+from .views import CartBatchView
+
+
+class CartAddTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(email='a@example.com', name='A', tc=True, password='pw')
+        self.product = Product.objects.create(name='Sneaker', price=10, stock=5)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def add(self, quantity):
+        return self.client.post(
+            reverse('cart-list-create'),
+            {'product': self.product.id, 'quantity': quantity, 'color': 'black', 'size': '42'},
+            format='json',
+        )
+
+    def test_add_then_grow_existing_line(self):
+        self.assertEqual(self.add(2).status_code, 201)
+        response = self.add(3)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['quantity'], 5)
+        self.assertEqual(CartItem.objects.get().quantity, 5)
+
+    def test_rejects_quantity_beyond_stock(self):
+        self.add(4)
+        response = self.add(2)
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(CartItem.objects.get().quantity, 4)
+
+    def test_update_checks_stock(self):
+        item_id = self.add(1).json()['id']
+        url = reverse('cart-update-delete', args=[item_id])
+        self.assertEqual(self.client.patch(url, {'quantity': 6}, format='json').status_code, 400)
+        self.assertEqual(self.client.patch(url, {'quantity': 5}, format='json').json()['quantity'], 5)
+
+
+class CartBatchTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(email='a@example.com', name='A', tc=True, password='pw')
+        self.shoe = Product.objects.create(name='Shoe', price=10, stock=5)
+        self.boot = Product.objects.create(name='Boot', price=20, stock=2)
+        self.line = CartItem.objects.create(user=self.user, product=self.shoe, quantity=1, color='black', size='42')
+        self.gone = CartItem.objects.create(user=self.user, product=self.boot, quantity=1, color='tan', size='41')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def batch(self, *operations):
+        return self.client.post(reverse('cart-batch'), {'operations': list(operations)}, format='json')
+
+    def test_applies_all_operations_at_once(self):
+        # Includes the one UPDATE raising Product.cart_adds for both added products.
+        with self.assertNumQueries(9):
+            response = self.batch(
+                {'op': 'update', 'id': self.line.id, 'quantity': 3},
+                {'op': 'remove', 'id': self.gone.id},
+                {'op': 'add', 'product': self.boot.id, 'quantity': 2, 'color': 'brown', 'size': '40'},
+                {'op': 'add', 'product': self.shoe.id, 'quantity': 1, 'color': 'black', 'size': '42'},
+            )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            sorted((item['product'], item['color'], item['quantity']) for item in response.json()),
+            [(self.shoe.id, 'black', 4), (self.boot.id, 'brown', 2)],
+        )
+        self.assertEqual(
+            dict(Product.objects.filter(id__in=[self.shoe.id, self.boot.id]).values_list('id', 'cart_adds')),
+            {self.shoe.id: 1, self.boot.id: 2},
+        )
+
+    def test_line_added_concurrently_is_merged_on_retry(self):
+        apply = CartBatchView.apply
+        calls = []
+
+        def concurrent_add_then_apply(view, *args):
+            calls.append(args)
+            if len(calls) == 1:
+                # A single add commits the same line while the batch runs; its insert clashes.
+                CartItem.objects.create(user=self.user, product=self.boot, quantity=1, color='brown', size='40')
+                raise IntegrityError
+            return apply(view, *args)
+
+        with mock.patch.object(CartBatchView, 'apply', concurrent_add_then_apply):
+            response = self.batch({'op': 'add', 'product': self.boot.id, 'quantity': 1, 'color': 'brown', 'size': '40'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(calls), 2)
+        self.assertEqual(CartItem.objects.get(product=self.boot, color='brown').quantity, 2)
+
+    def test_repeated_conflict_is_a_409(self):
+        with mock.patch.object(CartItem.objects, 'bulk_create', side_effect=IntegrityError):
+            response = self.batch({'op': 'add', 'product': self.boot.id, 'quantity': 1, 'color': 'brown', 'size': '40'})
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(CartItem.objects.count(), 2)
+
+    def test_rejects_whole_batch_on_any_error(self):
+        response = self.batch(
+            {'op': 'remove', 'id': self.gone.id},
+            {'op': 'update', 'id': self.line.id, 'quantity': 6},
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(list(response.json()['errors']), ['1'])
+        self.assertEqual(CartItem.objects.count(), 2)
+
+
+class CartConcurrencyTests(TransactionTestCase):
+    THREADS = 20
+
+    def test_concurrent_adds_never_oversell(self):
+        user = User.objects.create_user(email='a@example.com', name='A', tc=True, password='pw')
+        product = Product.objects.create(name='Sneaker', price=10, stock=10)
+        statuses = []
+        barrier = threading.Barrier(self.THREADS)
+
+        def add():
+            client = APIClient()
+            client.force_authenticate(user)
+            barrier.wait()
+            try:
+                response = client.post(
+                    reverse('cart-list-create'),
+                    {'product': product.id, 'quantity': 1, 'color': 'black', 'size': '42'},
+                    format='json',
+                )
+                statuses.append(response.status_code)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=add) for _ in range(self.THREADS)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(CartItem.objects.count(), 1)
+        self.assertEqual(CartItem.objects.get().quantity, 10)
+        self.assertEqual(sorted(statuses), [200] * 9 + [201] + [400] * 10)
+
+
+class CartSummaryTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(email='a@example.com', name='A', tc=True, password='pw')
+        self.shoe = Product.objects.create(name='Shoe', price='10.50', stock=5)
+        self.boot = Product.objects.create(name='Boot', price='20.00', stock=1)
+        CartItem.objects.create(user=self.user, product=self.shoe, quantity=2, color='black', size='42')
+        CartItem.objects.create(user=self.user, product=self.boot, quantity=2, color='tan', size='41')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_totals_availability_and_invalidation(self):
+        with self.assertNumQueries(2):
+            summary = self.client.get(reverse('cart-summary')).json()
+        self.assertEqual(summary['subtotal'], '61.00')
+        self.assertEqual(summary['item_count'], 4)
+        self.assertEqual([item['in_stock'] for item in summary['items']], [True, False])
+
+        with self.assertNumQueries(0):
+            self.client.get(reverse('cart-summary'))
+
+        self.client.post(
+            reverse('cart-list-create'),
+            {'product': self.shoe.id, 'quantity': 1, 'color': 'black', 'size': '42'},
+            format='json',
+        )
+        self.assertEqual(self.client.get(reverse('cart-summary')).json()['subtotal'], '71.50')
@@ -1,8 +1,10 @@
 # cart/urls.py
 from django.urls import path
-from .views import CartItemListCreateView, CartItemUpdateDeleteView
+from .views import CartItemListCreateView, CartItemUpdateDeleteView, CartBatchView, CartSummaryView
 
 urlpatterns = [
     path('', CartItemListCreateView.as_view(), name='cart-list-create'),  # GET all cart items, POST new item
+    path('summary/', CartSummaryView.as_view(), name='cart-summary'),  # GET items with totals and stock availability
+    path('batch/', CartBatchView.as_view(), name='cart-batch'),  # POST a list of add/update/remove operations
     path('<int:pk>/', CartItemUpdateDeleteView.as_view(), name='cart-update-delete'),  # GET, PUT, PATCH, DELETE specific item
 ]
\ No newline at end of file
@@ -0,0 +1,119 @@
+from django.core.cache import cache
+from django.db import OperationalError, connection
+from django.db.models import Case, DecimalField, Exists, F, IntegerField, Sum, Value, When
+from django.utils import timezone
+
+from product.models import Product
+from .models import CartItem
+
+# MySQL deadlock / lock wait timeout. Two concurrent upserts of the same cart line can
+# deadlock on InnoDB's shared-then-exclusive row locks; the loser simply runs again.
+RETRYABLE_ERROR_CODES = {1213, 1205}
+MAX_ATTEMPTS = 3
+
+
+# Cart writes invalidate the summary immediately; price and stock edits made in the
+# admin show up once it expires.
+CART_SUMMARY_TIMEOUT = 300
+
+
+class InsufficientStock(Exception):
+    pass
+
+
+def cart_summary_key(user_id):
+    return f"cart-summary:{user_id}"
+
+
+def invalidate_cart_summary(user_id):
+    cache.delete(cart_summary_key(user_id))
+
+
+def cart_totals(user_id):
+    """Subtotal and unit count of the user's cart, computed in one aggregate query."""
+    return CartItem.objects.filter(user_id=user_id).aggregate(
+        subtotal=Sum(F('quantity') * F('product__price'), output_field=DecimalField(max_digits=12, decimal_places=2)),
+        item_count=Sum('quantity'),
+    )
+
+
+def _upsert_sql():
+    quote = connection.ops.quote_name
+    cart = quote(CartItem._meta.db_table)
+    product = quote(Product._meta.db_table)
+    insert = (
+        f"INSERT INTO {cart} (user_id, product_id, quantity, color, size, added_at) "
+        f"SELECT %s, p.id, %s, %s, %s, %s FROM {product} p "
+    )
+    if connection.vendor == 'mysql':
+        # The guard reads the current line quantity inside the same statement.
+        return insert + (
+            f"WHERE p.id = %s AND p.stock >= %s + COALESCE(("
+            f"SELECT c.quantity FROM {cart} c "
+            f"WHERE c.user_id = %s AND c.product_id = %s AND c.color = %s AND c.size = %s), 0) "
+            f"ON DUPLICATE KEY UPDATE quantity = quantity + VALUES(quantity)"
+        ), True
+    return insert + (
+        f"WHERE p.id = %s AND p.stock >= %s "
+        f"ON CONFLICT (user_id, product_id, color, size) DO UPDATE "
+        f"SET quantity = {cart}.quantity + excluded.quantity "
+        f"WHERE {cart}.quantity + excluded.quantity <= "
+        f"(SELECT stock FROM {product} WHERE id = excluded.product_id)"
+    ), False
+
+
+def count_cart_adds(quantities):
+    """Raise ``Product.cart_adds`` by ``{product_id: units}`` in one UPDATE."""
+    quantities = {product_id: units for product_id, units in quantities.items() if units}
+    if quantities:
+        Product.objects.filter(id__in=quantities).update(cart_adds=F('cart_adds') + Case(
+            *[When(id=product_id, then=Value(units)) for product_id, units in quantities.items()],
+            output_field=IntegerField(),
+        ), counters_changed_at=timezone.now())
+
+
+def add_to_cart(user, product, quantity, color, size):
+    """Insert a cart line or grow an existing one, in a single statement that only
+    succeeds while ``product.stock`` covers the resulting quantity.
+
+    Returns ``(item, created)``; raises ``InsufficientStock`` if the guard rejected it.
+    """
+    now = timezone.now()
+    sql, mysql = _upsert_sql()
+    params = [user.id, quantity, color, size, connection.ops.adapt_datetimefield_value(now), product.id, quantity]
+    if mysql:
+        params += [user.id, product.id, color, size]
+
+    for attempt in range(1, MAX_ATTEMPTS + 1):
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute(sql, params)
+                affected = cursor.rowcount
+            break
+        except OperationalError as e:
+            retryable = (e.args and e.args[0] in RETRYABLE_ERROR_CODES) or 'locked' in str(e)
+            if not retryable or attempt == MAX_ATTEMPTS:
+                raise
+
+    if not affected:
+        raise InsufficientStock()
+    # A popularity signal only; not worth a transaction around the upsert.
+    count_cart_adds({product.id: quantity})
+    invalidate_cart_summary(user.id)
+    item = CartItem.objects.select_related('product').get(user=user, product=product, color=color, size=size)
+    # An inserted row carries our timestamp; an existing line keeps its original one.
+    return item, item.added_at == now
+
+
+def set_quantity(item, quantity, **fields):
+    """Update a cart line only if stock covers ``quantity``, checked in the same UPDATE."""
+    product_id = fields['product'].pk if 'product' in fields else item.product_id
+    in_stock = Product.objects.filter(pk=product_id, stock__gte=quantity)
+    updated = CartItem.objects.filter(pk=item.pk).filter(Exists(in_stock)).update(quantity=quantity, **fields)
+    if not updated:
+        raise InsufficientStock()
+    invalidate_cart_summary(item.user_id)
+    item.quantity = quantity
+    for name, value in fields.items():
+        setattr(item, name, value)
+    return item
@@ -1,47 +1,38 @@
 # cart/views.py
+from collections import defaultdict
+
 from rest_framework import generics, permissions, status
 from rest_framework.response import Response
 from rest_framework.exceptions import ValidationError
+from rest_framework.views import APIView
 from .models import CartItem
-from .serializers import CartItemSerializer
+from .serializers import CartItemSerializer, CartBatchSerializer, CartSummaryItemSerializer
+from .utils import (
+    CART_SUMMARY_TIMEOUT, InsufficientStock, add_to_cart, cart_summary_key, cart_totals,
+    count_cart_adds, invalidate_cart_summary, set_quantity,
+)
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from account.authentication import StatelessJWTAuthentication
+from product.models import Product
 
 class CartItemListCreateView(generics.ListCreateAPIView):
     serializer_class = CartItemSerializer
     permission_classes = [permissions.IsAuthenticated]
 
     def get_queryset(self):
-        return CartItem.objects.filter(user=self.request.user)
+        return CartItem.objects.filter(user=self.request.user).select_related('product')
 
     def perform_create(self, serializer):
-        product = serializer.validated_data['product']
-        quantity = serializer.validated_data['quantity']
-        color = serializer.validated_data['color']
-        size = serializer.validated_data['size']
-
-        # Check stock availability
-        if product.stock < quantity:
+        data = serializer.validated_data
+        try:
+            item, created = add_to_cart(
+                self.request.user, data['product'], data['quantity'], data['color'], data['size']
+            )
+        except InsufficientStock:
             raise ValidationError({"error": "Insufficient stock"})
-
-        # Check for existing cart item with same product, color, and size
-        existing_item = CartItem.objects.filter(
-            user=self.request.user,
-            product=product,
-            color=color,
-            size=size
-        ).first()
-
-        if existing_item:
-            new_quantity = existing_item.quantity + quantity
-            if product.stock < new_quantity:
-                raise ValidationError({"error": "Insufficient stock"})
-            existing_item.quantity = new_quantity
-            existing_item.save()
-            self._updated_instance = existing_item
-            self._response_status = status.HTTP_200_OK
-        else:
-            serializer.save(user=self.request.user)
-            self._updated_instance = serializer.instance
-            self._response_status = status.HTTP_201_CREATED
+        self._updated_instance = item
+        self._response_status = status.HTTP_201_CREATED if created else status.HTTP_200_OK
 
     def create(self, request, *args, **kwargs):
         serializer = self.get_serializer(data=request.data)
@@ -66,7 +57,122 @@ class CartItemUpdateDeleteView(generics.RetrieveUpdateDestroyAPIView):
 
     def perform_update(self, serializer):
         instance = serializer.instance
-        quantity = serializer.validated_data.get('quantity', instance.quantity)
-        if instance.product.stock < quantity:
+        fields = dict(serializer.validated_data)
+        quantity = fields.pop('quantity', instance.quantity)
+        try:
+            set_quantity(instance, quantity, **fields)
+        except InsufficientStock:
             raise ValidationError({"error": "Insufficient stock"})
-        serializer.save()
\ No newline at end of file
+        except IntegrityError:
+            raise ValidationError({"error": "This item is already in your cart"})
+
+    def perform_destroy(self, instance):
+        instance.delete()
+        invalidate_cart_summary(instance.user_id)
+
+class CartBatchView(APIView):
+    """Apply a list of add/update/remove operations to the cart in one transaction."""
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request, format=None):
+        serializer = CartBatchSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        operations = serializer.validated_data['operations']
+        user = request.user
+
+        for attempt in range(2):
+            try:
+                errors = self.apply(user, operations)
+                break
+            except IntegrityError:
+                # A concurrent single add created one of the lines this batch was about
+                # to insert. Running it again merges into that line; a second clash is
+                # left to the client.
+                if attempt:
+                    return Response(
+                        {"error": "The cart changed while the batch was applied, please retry."},
+                        status=status.HTTP_409_CONFLICT,
+                    )
+        if errors:
+            return Response({"errors": errors}, status=status.HTTP_400_BAD_REQUEST)
+
+        items = CartItem.objects.filter(user=user).select_related('product')
+        return Response(CartItemSerializer(items, many=True, context={'request': request}).data, status=status.HTTP_200_OK)
+
+    def apply(self, user, operations):
+        """Apply the operations, or nothing if any fails; returns the errors by operation index."""
+        with transaction.atomic():
+            lines = {item.id: item for item in CartItem.objects.select_for_update().filter(user=user)}
+            product_ids = {op['product'] for op in operations if op['op'] == 'add'}
+            product_ids |= {item.product_id for item in lines.values()}
+            products = Product.objects.in_bulk(product_ids)
+
+            variants = {(item.product_id, item.color, item.size): item for item in lines.values()}
+            created, removed = [], set()
+            added = defaultdict(int)  # product id -> units added
+            touched = {}  # id(item) -> (index of the last operation on it, item)
+            errors = {}
+            for index, op in enumerate(operations):
+                if op['op'] == 'add':
+                    product = products.get(op['product'])
+                    if product is None:
+                        errors[index] = {"product": "Product not found."}
+                        continue
+                    key = (product.id, op['color'], op['size'])
+                    item = variants.get(key)
+                    if item is None:
+                        item = CartItem(user=user, product=product, quantity=0, color=op['color'], size=op['size'])
+                        variants[key] = item
+                        created.append(item)
+                    item.quantity += op['quantity']
+                    added[product.id] += op['quantity']
+                else:
+                    item = lines.get(op['id'])
+                    if item is None or item.id in removed:
+                        errors[index] = {"id": "Cart item not found."}
+                        continue
+                    if op['op'] == 'remove':
+                        removed.add(item.id)
+                        del variants[(item.product_id, item.color, item.size)]
+                        touched.pop(id(item), None)
+                        continue
+                    item.quantity = op['quantity']
+                touched[id(item)] = (index, item)
+
+            for index, item in touched.values():
+                if (products[item.product_id].stock or 0) < item.quantity:
+                    errors.setdefault(index, {"error": "Insufficient stock"})
+            if errors:
+                return errors
+
+            CartItem.objects.filter(id__in=removed).delete()
+            CartItem.objects.bulk_update([item for _, item in touched.values() if item.pk], ['quantity'])
+            CartItem.objects.bulk_create(created)
+            count_cart_adds(added)
+            transaction.on_commit(lambda: invalidate_cart_summary(user.id))
+        return {}
+
+
+class CartSummaryView(APIView):
+    """Cart lines with stock availability plus DB-computed totals, cached per user.
+
+    Only the user id is needed, so the token is trusted without loading the user:
+    a cached summary is served without touching the database."""
+    authentication_classes = [StatelessJWTAuthentication]
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request, format=None):
+        key = cart_summary_key(request.user.id)
+        summary = cache.get(key)
+        if summary is None:
+            items = CartItem.objects.filter(user_id=request.user.id).select_related('product').order_by('added_at')
+            totals = cart_totals(request.user.id)
+            summary = {
+                'items': CartSummaryItemSerializer(items, many=True, context={'request': request}).data,
+                'subtotal': f"{totals['subtotal'] or 0:.2f}",
+                'item_count': totals['item_count'] or 0,
+            }
+            summary['line_count'] = len(summary['items'])
+            summary['all_in_stock'] = all(item['in_stock'] for item in summary['items'])
+            cache.set(key, summary, CART_SUMMARY_TIMEOUT)
+        return Response(summary, status=status.HTTP_200_OK)
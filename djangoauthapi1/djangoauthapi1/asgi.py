@@ -12,5 +12,11 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'djangoauthapi1.settings')
+# Read by settings: no persistent DB connections under ASGI (see DATABASES there).
+os.environ.setdefault('DJANGO_SERVER', 'asgi')
 
 application = get_asgi_application()
+
+from product.suggest import warm_up  # noqa: E402
+
+warm_up()
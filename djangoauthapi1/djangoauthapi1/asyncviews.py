@@ -0,0 +1,121 @@
+"""Support for the async (ASGI) variants of the I/O-bound endpoints.
+
+Under ASGI an ``async def`` view waits on the database, upstream APIs and the outbox
+without holding a thread. Whatever still blocks is handed to one of two bounded
+pools: ``cpu_pool`` for image decoding, model inference and password hashing, sized
+to the cores, and ``io_pool`` for blocking client libraries such as
+speech_recognition, sized for waiting. Each pool also caps its backlog; a request
+that cannot get in within ``ASYNC_QUEUE_TIMEOUT`` is answered with a 503 instead of
+queueing work that would time out anyway.
+
+The async views also work under WSGI (Django runs them through ``async_to_sync``),
+but only ASGI gets the concurrency.
+"""
+import asyncio
+import contextvars
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.http import JsonResponse
+from django.views import View
+from rest_framework.exceptions import Throttled
+
+
+# The slots are a threading semaphore so one pool can serve any event loop; waiting
+# for one is a short poll rather than a blocking acquire that would stall the loop.
+QUEUE_POLL_SECONDS = 0.005
+
+
+class Overloaded(Exception):
+    pass
+
+
+class BoundedExecutor:
+    """A thread pool that admits at most ``workers * (1 + backlog)`` tasks at once."""
+
+    def __init__(self, name, workers, backlog, queue_timeout):
+        self.name = name
+        self.workers = workers
+        self.queue_timeout = queue_timeout
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix=f'async-{name}')
+        self.slots = threading.BoundedSemaphore(workers * (1 + backlog))
+        self.lock = threading.Lock()
+        self.in_flight = 0
+        self.rejected = 0
+
+    def _adjust(self, delta):
+        with self.lock:
+            self.in_flight += delta
+
+    async def run(self, fn, *args, **kwargs):
+        """Run ``fn`` on the pool and await its result. While the backlog is full the
+        request waits on the event loop for up to ``queue_timeout`` seconds, then
+        ``Overloaded`` is raised."""
+        deadline = time.monotonic() + self.queue_timeout
+        while not self.slots.acquire(blocking=False):
+            if time.monotonic() >= deadline:
+                with self.lock:
+                    self.rejected += 1
+                raise Overloaded(self.name)
+            await asyncio.sleep(QUEUE_POLL_SECONDS)
+        self._adjust(1)
+        future = self.executor.submit(contextvars.copy_context().run, fn, *args, **kwargs)
+        # Freed when the work finishes, even if the request was cancelled meanwhile.
+        future.add_done_callback(self._done)
+        return await asyncio.wrap_future(future)
+
+    def _done(self, future):
+        self._adjust(-1)
+        self.slots.release()
+
+    def stats(self):
+        with self.lock:
+            return {'workers': self.workers, 'in_flight': self.in_flight, 'rejected': self.rejected}
+
+
+cpu_pool = BoundedExecutor(
+    'cpu', getattr(settings, 'ASYNC_CPU_WORKERS', None) or os.cpu_count() or 2,
+    getattr(settings, 'ASYNC_EXECUTOR_BACKLOG', 8), getattr(settings, 'ASYNC_QUEUE_TIMEOUT', 1.0),
+)
+io_pool = BoundedExecutor(
+    'io', getattr(settings, 'ASYNC_IO_WORKERS', None) or 32,
+    getattr(settings, 'ASYNC_EXECUTOR_BACKLOG', 8), getattr(settings, 'ASYNC_QUEUE_TIMEOUT', 1.0),
+)
+
+
+class AsyncAPIView(View):
+    """Base for async JSON endpoints: CSRF-exempt like DRF's ``APIView``, with the
+    pool and throttle errors turned into 503 and 429 responses."""
+    http_method_names = ['post', 'options']
+
+    @classmethod
+    def as_view(cls, **initkwargs):
+        view = super().as_view(**initkwargs)
+        view.csrf_exempt = True
+        return view
+
+    async def dispatch(self, request, *args, **kwargs):
+        # JSON bodies are parsed up front as ``request.data``, as DRF does. Multipart
+        # uploads are left to the view, which parses them on the I/O pool since large
+        # files are spooled to disk.
+        request.data = self.json(request) if request.content_type == 'application/json' else {}
+        try:
+            return await super().dispatch(request, *args, **kwargs)
+        except Overloaded:
+            return JsonResponse({'error': 'Server is busy, please retry shortly.'}, status=503, headers={'Retry-After': '1'})
+        except Throttled as e:
+            return JsonResponse(
+                {'errors': {'detail': str(e.detail)}}, status=429, headers={'Retry-After': str(int(e.wait or 1))},
+            )
+
+    @staticmethod
+    def json(request):
+        try:
+            data = json.loads(request.body or b'{}')
+        except ValueError:
+            data = None
+        return data if isinstance(data, dict) else {}
@@ -0,0 +1,174 @@
+"""Serving uploaded media without tying up workers on the bytes.
+
+``HashedMediaStorage`` stores each upload under a name that carries a hash of its
+content (``product_images/loafers.3f2a9c1b7d4e.jpg``). A given URL then always
+means the same bytes, so ``serve_media`` can let browsers and CDNs keep hashed
+files for a year without revalidating. Files stored under other names are cached
+for ``MEDIA_MAX_AGE`` and then revalidated with ``ETag``/``Last-Modified``.
+
+``serve_media`` answers conditional requests with 304 and single byte ranges with
+206. With ``MEDIA_OFFLOAD`` set it only checks the request and sets the headers;
+the front proxy is told where the file is and sends it itself: ``x-accel-redirect``
+for nginx, which needs an ``internal`` location at ``MEDIA_ACCEL_PREFIX`` aliased
+to ``MEDIA_ROOT``, or ``x-sendfile`` for Apache (mod_xsendfile) and lighttpd.
+"""
+import hashlib
+import mimetypes
+import os
+import re
+import stat
+from urllib.parse import quote
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.core.files import File
+from django.core.files.storage import FileSystemStorage
+from django.http import FileResponse, Http404, HttpResponse, StreamingHttpResponse
+from django.utils._os import safe_join
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from django.views.decorators.http import require_safe
+
+HASH_LENGTH = 12
+HASHED_NAME = re.compile(rf'\.([0-9a-f]{{{HASH_LENGTH}}})(\.[^./]+)?$')
+IMMUTABLE = 'public, max-age=31536000, immutable'
+CHUNK_SIZE = 64 * 1024
+_RANGE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+def content_hash(content):
+    hasher = hashlib.sha256()
+    content.seek(0)
+    for chunk in content.chunks():
+        hasher.update(chunk)
+    content.seek(0)
+    return hasher.hexdigest()[:HASH_LENGTH]
+
+
+class HashedMediaStorage(FileSystemStorage):
+    """File system storage that puts a content hash in every saved name. Saving bytes
+    that are already stored returns the existing name instead of a second copy."""
+
+    def hashed_name(self, name, content, max_length=None):
+        directory, filename = os.path.split(name)
+        stem, ext = os.path.splitext(filename)
+        match = HASHED_NAME.search(filename)
+        if match:
+            # Re-saving a hashed file (e.g. copying between storages) keeps one hash.
+            stem = filename[:match.start()]
+        suffix = f'.{content_hash(content)}{ext}'
+        if max_length:
+            # Trim the stem ourselves; get_available_name would cut into the hash.
+            stem = stem[:max(1, max_length - len(directory) - 1 - len(suffix))]
+        return os.path.join(directory, stem + suffix)
+
+    def save(self, name, content, max_length=None):
+        if name is None:
+            name = content.name
+        if not hasattr(content, 'chunks'):
+            content = File(content, name)
+        name = self.hashed_name(name, content, max_length)
+        if self.exists(name):
+            return name
+        return super().save(name, content, max_length=max_length)
+
+
+product_image_storage = HashedMediaStorage()
+
+
+class RangeNotSatisfiable(Exception):
+    pass
+
+
+def parse_range(header, size):
+    """``(first, last)`` byte offsets (inclusive) for a single-range ``Range`` header,
+    or None to send the whole file. Multiple or malformed ranges are ignored, which
+    HTTP allows; a range starting past the end raises ``RangeNotSatisfiable``."""
+    match = _RANGE.match(header.strip())
+    if not match or match.groups() == ('', ''):
+        return None
+    first, last = match.groups()
+    if not first:
+        # "bytes=-500": the last 500 bytes.
+        if int(last) == 0 or size == 0:
+            raise RangeNotSatisfiable
+        return max(size - int(last), 0), size - 1
+    first = int(first)
+    if last and int(last) < first:
+        return None
+    if first >= size:
+        raise RangeNotSatisfiable
+    return first, min(int(last), size - 1) if last else size - 1
+
+
+def _read(path, first, length):
+    with open(path, 'rb') as f:
+        f.seek(first)
+        while length > 0:
+            chunk = f.read(min(CHUNK_SIZE, length))
+            if not chunk:
+                return
+            length -= len(chunk)
+            yield chunk
+
+
+def _validators(path, st):
+    match = HASHED_NAME.search(path)
+    etag = f'"{match.group(1)}"' if match else f'"{st.st_mtime_ns:x}-{st.st_size:x}"'
+    return etag, int(st.st_mtime), IMMUTABLE if match else f'public, max-age={settings.MEDIA_MAX_AGE}'
+
+
+def _offload(path, fullpath, content_type):
+    response = HttpResponse(content_type=content_type)
+    if settings.MEDIA_OFFLOAD == 'x-accel-redirect':
+        response['X-Accel-Redirect'] = settings.MEDIA_ACCEL_PREFIX + quote(path)
+    else:
+        response['X-Sendfile'] = fullpath
+    return response
+
+
+@require_safe
+def serve_media(request, path):
+    try:
+        fullpath = safe_join(settings.MEDIA_ROOT, path)
+        st = os.stat(fullpath)
+    except (SuspiciousFileOperation, OSError, ValueError):
+        raise Http404("Not found")
+    if not stat.S_ISREG(st.st_mode):
+        raise Http404("Not found")
+
+    etag, modified, cache_control = _validators(path, st)
+    headers = {'ETag': etag, 'Last-Modified': http_date(modified), 'Cache-Control': cache_control}
+    response = get_conditional_response(request, etag=etag, last_modified=modified)
+    if response is None:
+        response = _respond(request, path, fullpath, st.st_size, etag, headers['Last-Modified'])
+    for name, value in headers.items():
+        response[name] = value
+    return response
+
+
+def _respond(request, path, fullpath, size, etag, last_modified):
+    content_type = mimetypes.guess_type(fullpath)[0] or 'application/octet-stream'
+    if settings.MEDIA_OFFLOAD:
+        # Ranges are left to the proxy, which applies them to the file it sends.
+        return _offload(path, fullpath, content_type)
+
+    byte_range = None
+    if_range = request.headers.get('If-Range')
+    if 'Range' in request.headers and if_range in (None, etag, last_modified):
+        try:
+            byte_range = parse_range(request.headers['Range'], size)
+        except RangeNotSatisfiable:
+            response = HttpResponse(status=416)
+            response['Content-Range'] = f'bytes */{size}'
+            return response
+
+    if byte_range is None:
+        response = FileResponse(open(fullpath, 'rb'), content_type=content_type)
+    else:
+        first, last = byte_range
+        response = StreamingHttpResponse(_read(fullpath, first, last - first + 1), status=206, content_type=content_type)
+        response['Content-Range'] = f'bytes {first}-{last}/{size}'
+        response['Content-Length'] = str(last - first + 1)
+    response['Accept-Ranges'] = 'bytes'
+    return response
@@ -0,0 +1,268 @@
+"""Request profiling that is cheap enough to leave on in production.
+
+``ProfilingMiddleware`` times every request, counts its SQL queries and their total
+time through a connection execute wrapper, times serialization (serializers using
+``TimedSerializerMixin``) and response rendering separately, and reports all of it
+in a ``Server-Timing`` header. Each request also lands in a
+per-route latency histogram kept in process memory, which ``RouteMetricsView``
+serves to admins. A sampled fraction of requests runs under cProfile, and the ones
+slower than ``PROFILING_SLOW_MS`` are written to ``PROFILING_DIR`` for inspection
+with ``python -m pstats`` or snakeviz.
+"""
+import contextvars
+import cProfile
+import os
+import random
+import threading
+import time
+from bisect import bisect_left
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+from rest_framework import permissions
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+# Upper bounds (ms) of the latency histogram buckets; the last bucket is open-ended.
+BUCKETS_MS = [5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000]
+
+
+class RouteHistogram:
+    __slots__ = ('counts', 'requests', 'total_ms', 'max_ms', 'queries', 'db_ms', 'serialize_ms')
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS_MS) + 1)
+        self.requests = 0
+        self.total_ms = self.max_ms = self.db_ms = self.serialize_ms = 0.0
+        self.queries = 0
+
+    def add(self, total_ms, queries, db_ms, serialize_ms):
+        self.counts[bisect_left(BUCKETS_MS, total_ms)] += 1
+        self.requests += 1
+        self.total_ms += total_ms
+        self.max_ms = max(self.max_ms, total_ms)
+        self.queries += queries
+        self.db_ms += db_ms
+        self.serialize_ms += serialize_ms
+
+    def percentile(self, fraction):
+        """Upper bound of the bucket holding the ``fraction`` quantile."""
+        rank = fraction * self.requests
+        seen = 0
+        for bound, count in zip(BUCKETS_MS + [None], self.counts):
+            seen += count
+            if seen >= rank and count:
+                return bound if bound is not None else round(self.max_ms, 1)
+        return None
+
+    def summary(self):
+        return {
+            'requests': self.requests,
+            'avg_ms': round(self.total_ms / self.requests, 1),
+            'p50_ms': self.percentile(0.5),
+            'p95_ms': self.percentile(0.95),
+            'p99_ms': self.percentile(0.99),
+            'max_ms': round(self.max_ms, 1),
+            'avg_queries': round(self.queries / self.requests, 1),
+            'avg_db_ms': round(self.db_ms / self.requests, 1),
+            'avg_serialize_ms': round(self.serialize_ms / self.requests, 1),
+            'histogram': dict(zip([f'le_{bound}' for bound in BUCKETS_MS] + ['inf'], self.counts)),
+        }
+
+
+class RouteStats:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.routes = {}
+
+    def record(self, route, total_ms, queries, db_ms, serialize_ms):
+        with self.lock:
+            histogram = self.routes.get(route)
+            if histogram is None:
+                histogram = self.routes[route] = RouteHistogram()
+            histogram.add(total_ms, queries, db_ms, serialize_ms)
+
+    def snapshot(self):
+        with self.lock:
+            return {route: histogram.summary() for route, histogram in sorted(self.routes.items())}
+
+    def clear(self):
+        with self.lock:
+            self.routes.clear()
+
+
+route_stats = RouteStats()
+
+
+class QueryTimer:
+    """``execute_wrapper`` hook counting queries and their time."""
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.seconds += time.perf_counter() - started
+            self.count += 1
+
+
+# The request's QueryTimer. Under ASGI the view runs in a worker thread with its own
+# database connection, so the timer is found through the (propagated) context rather
+# than installed on the connection of the thread handling the request.
+current_timer = contextvars.ContextVar('query_timer', default=None)
+
+
+def timed_execute(execute, sql, params, many, context):
+    timer = current_timer.get()
+    if timer is None:
+        return execute(sql, params, many, context)
+    return timer(execute, sql, params, many, context)
+
+
+def install_query_timing(connection, **kwargs):
+    if timed_execute not in connection.execute_wrappers:
+        connection.execute_wrappers.append(timed_execute)
+
+
+connection_created.connect(install_query_timing)
+
+
+class SerializerTimer:
+    """Time spent in ``TimedSerializerMixin.to_representation``, less the SQL it ran,
+    which the QueryTimer already counts."""
+    def __init__(self):
+        self.seconds = 0.0
+        self.depth = 0
+
+
+current_serializer_timer = contextvars.ContextVar('serializer_timer', default=None)
+
+
+class TimedSerializerMixin:
+    """For serializers producing response bodies: ``serializer.data`` is reported as
+    the ``serialize`` phase. Nested timed serializers are counted once, by the outermost."""
+
+    def to_representation(self, instance):
+        timer = current_serializer_timer.get()
+        if timer is None or timer.depth:
+            return super().to_representation(instance)
+        query_timer = current_timer.get()
+        db_seconds = query_timer.seconds if query_timer is not None else 0.0
+        started = time.perf_counter()
+        timer.depth += 1
+        try:
+            return super().to_representation(instance)
+        finally:
+            timer.depth -= 1
+            if query_timer is not None:
+                db_seconds = query_timer.seconds - db_seconds
+            timer.seconds += time.perf_counter() - started - db_seconds
+
+
+def route_name(request):
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return f"{request.method} <unresolved>"
+    return f"{request.method} /{match.route}"
+
+
+class ProfilingMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.sample_rate = getattr(settings, 'PROFILING_SAMPLE_RATE', 0.0)
+        self.slow_ms = getattr(settings, 'PROFILING_SLOW_MS', 1000)
+        self.profile_dir = getattr(settings, 'PROFILING_DIR', None)
+        self.server_timing = getattr(settings, 'SERVER_TIMING_HEADER', True)
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        started = time.perf_counter()
+        timer = QueryTimer()
+        serializer_timer = SerializerTimer()
+        request._render_ms = 0.0
+        profiler = cProfile.Profile() if self.profile_dir and random.random() < self.sample_rate else None
+
+        for alias in connections:
+            install_query_timing(connections[alias])
+        token = current_timer.set(timer)
+        serializer_token = current_serializer_timer.set(serializer_timer)
+        if profiler is not None:
+            profiler.enable()
+        try:
+            response = self.get_response(request)
+        finally:
+            if profiler is not None:
+                profiler.disable()
+            current_serializer_timer.reset(serializer_token)
+            current_timer.reset(token)
+        return self.finish(request, response, started, timer, serializer_timer, profiler)
+
+    async def __acall__(self, request):
+        # Under ASGI the event loop interleaves requests, so cProfile would mix them
+        # up; only the timings are collected.
+        started = time.perf_counter()
+        timer = QueryTimer()
+        serializer_timer = SerializerTimer()
+        request._render_ms = 0.0
+        token = current_timer.set(timer)
+        serializer_token = current_serializer_timer.set(serializer_timer)
+        try:
+            response = await self.get_response(request)
+        finally:
+            current_serializer_timer.reset(serializer_token)
+            current_timer.reset(token)
+        return self.finish(request, response, started, timer, serializer_timer, None)
+
+    def finish(self, request, response, started, timer, serializer_timer, profiler):
+        total_ms = (time.perf_counter() - started) * 1000
+        db_ms = timer.seconds * 1000
+        serialize_ms = serializer_timer.seconds * 1000
+        route = route_name(request)
+        route_stats.record(route, total_ms, timer.count, db_ms, serialize_ms)
+        if profiler is not None and total_ms >= self.slow_ms:
+            self.dump(profiler, route, total_ms)
+        if self.server_timing:
+            response['Server-Timing'] = (
+                f'db;dur={db_ms:.1f};desc="{timer.count} queries", '
+                f'app;dur={max(total_ms - db_ms - serialize_ms - request._render_ms, 0):.1f}, '
+                f'serialize;dur={serialize_ms:.1f}, '
+                f'render;dur={request._render_ms:.1f}, '
+                f'total;dur={total_ms:.1f}'
+            )
+        return response
+
+    def process_template_response(self, request, response):
+        # DRF responses are rendered (serialized to JSON) after this hook returns
+        render_started = time.perf_counter()
+
+        def rendered(response):
+            request._render_ms += (time.perf_counter() - render_started) * 1000
+
+        response.add_post_render_callback(rendered)
+        return response
+
+    def dump(self, profiler, route, total_ms):
+        os.makedirs(self.profile_dir, exist_ok=True)
+        slug = ''.join(c if c.isalnum() else '_' for c in route).strip('_')
+        path = os.path.join(self.profile_dir, f"{time.strftime('%Y%m%d-%H%M%S')}-{slug}-{total_ms:.0f}ms.prof")
+        profiler.dump_stats(path)
+
+
+class RouteMetricsView(APIView):
+    """Per-route latency histograms for this process."""
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request, format=None):
+        return Response({'pid': os.getpid(), 'routes': route_stats.snapshot()})
@@ -0,0 +1,175 @@
+"""Query-count and query-shape assertions for endpoint tests.
+
+``QueryBudgetMixin.assertQueryBudget`` runs an endpoint at several data sizes and
+fails if it issues more statements than its budget or if the count changes with the
+number of rows (an N+1). ``assertNoFullScans`` EXPLAINs the captured SELECTs on the
+test database and fails on plans that read a whole table. Failures print every
+statement, normalised so that repeated shapes collapse, and a diff between the
+smallest and largest run.
+"""
+import difflib
+import re
+from collections import Counter
+
+from django.core.cache import caches
+from django.db import connections
+from django.test.utils import CaptureQueriesContext
+
+DEFAULT_SIZES = (1, 10, 100)
+
+# Statements the transaction machinery issues around atomic blocks; not part of an
+# endpoint's query shape.
+_BOOKKEEPING = re.compile(r'^\s*(SAVEPOINT|RELEASE SAVEPOINT|ROLLBACK TO SAVEPOINT|BEGIN|COMMIT)\b', re.I)
+_LITERALS = [
+    (re.compile(r"'(?:[^']|'')*'"), '?'),
+    (re.compile(r'\b\d+(?:\.\d+)?\b'), '?'),
+    (re.compile(r'\((?:\s*\?\s*,)+\s*\?\s*\)'), '(...)'),
+]
+
+
+def normalize(sql):
+    """The statement with literals replaced, so the same query with different ids
+    compares equal."""
+    for pattern, replacement in _LITERALS:
+        sql = pattern.sub(replacement, sql)
+    return sql
+
+
+def statements(captured):
+    return [query['sql'] for query in captured if not _BOOKKEEPING.match(query['sql'])]
+
+
+def capture(call, using='default'):
+    """Run ``call()`` and return ``(result, statements)``."""
+    with CaptureQueriesContext(connections[using]) as captured:
+        result = call()
+    return result, statements(captured.captured_queries)
+
+
+def shape_report(sqls):
+    """One line per distinct statement shape, most repeated first."""
+    counts = Counter(normalize(sql) for sql in sqls)
+    return '\n'.join(f"  {count:>4} x {shape}" for shape, count in counts.most_common())
+
+
+def shape_diff(before, after, before_label, after_label):
+    return '\n'.join(difflib.unified_diff(
+        [normalize(sql) for sql in before], [normalize(sql) for sql in after],
+        fromfile=before_label, tofile=after_label, lineterm='',
+    ))
+
+
+def _sqlite_scans(cursor, sql):
+    cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+    plan = [row[-1] for row in cursor.fetchall()]
+    # A scan that reads in index order under a LIMIT stops early; only a scan that
+    # has to visit every row (or sort them all first) is flagged.
+    sorted_all = any('USE TEMP B-TREE' in step for step in plan)
+    limited = re.search(r'\bLIMIT\b', sql, re.I) and not sorted_all
+    if limited:
+        return []
+    # SEARCH is an index lookup; SCAN visits every row, through an index or not.
+    return [
+        (match.group(1), step) for step in plan
+        if (match := re.match(r'SCAN (?:TABLE )?(\w+)', step)) and match.group(1) != 'CONSTANT'
+    ]
+
+
+def _mysql_scans(cursor, sql):
+    cursor.execute(f'EXPLAIN {sql}')
+    columns = [column[0] for column in cursor.description]
+    limited = re.search(r'\bLIMIT\b', sql, re.I)
+    scans = []
+    for row in cursor.fetchall():
+        step = dict(zip(columns, row))
+        if step.get('type') == 'ALL' and not (limited and 'filesort' not in (step.get('Extra') or '')):
+            scans.append((step['table'], f"type=ALL rows={step.get('rows')} {step.get('Extra') or ''}".strip()))
+    return scans
+
+
+def _postgresql_scans(cursor, sql):
+    cursor.execute(f'EXPLAIN {sql}')
+    scans = []
+    for (step,) in cursor.fetchall():
+        match = re.search(r'Seq Scan on (\w+)', step)
+        if match:
+            scans.append((match.group(1), step.strip()))
+    return scans
+
+
+_EXPLAINERS = {'sqlite': _sqlite_scans, 'mysql': _mysql_scans, 'postgresql': _postgresql_scans}
+
+
+def full_scans(sqls, using='default', allow=()):
+    """``[(table, plan step, sql)]`` for each SELECT whose plan reads a whole table
+    not listed in ``allow``. Planners pick scans for tiny tables, so run this
+    against enough rows that an index would win."""
+    connection = connections[using]
+    explain = _EXPLAINERS.get(connection.vendor)
+    if explain is None:
+        return []
+    found = []
+    with connection.cursor() as cursor:
+        for sql in dict.fromkeys(sqls):
+            if not sql.lstrip().upper().startswith('SELECT'):
+                continue
+            for table, step in explain(cursor, sql):
+                if table not in allow:
+                    found.append((table, step, sql))
+    return found
+
+
+class QueryBudgetMixin:
+    """Assertions for ``django.test.TestCase`` subclasses."""
+
+    def assertQueryBudget(self, call, budget, grow, sizes=DEFAULT_SIZES, using='default', scans=True, allow_scans=(), cold=True):
+        """Run ``call()`` after ``grow(n)`` for each ``n`` in ``sizes``.
+
+        ``grow(n)`` must make the data the endpoint reads ``n`` rows large (it is called
+        with increasing sizes, so it only has to add the difference). ``call`` returns
+        the response; a 4xx/5xx fails the test since its count means nothing. Each run
+        must stay within ``budget`` statements and issue the same number as the others.
+        With ``cold`` the caches are cleared before each run, so cached sets and summaries
+        are measured on a miss. With ``scans``, the largest run's SELECTs are EXPLAINed.
+        """
+        runs = []
+        for size in sizes:
+            grow(size)
+            if cold:
+                for cache in caches.all():
+                    cache.clear()
+            response, sqls = capture(call, using)
+            status = getattr(response, 'status_code', 200)
+            if status >= 400:
+                self.fail(f"Request at {size} rows failed with {status}: {getattr(response, 'content', b'')[:300]!r}")
+            runs.append((size, sqls))
+
+        counts = {size: len(sqls) for size, sqls in runs}
+        (small, small_sqls), (large, large_sqls) = runs[0], runs[-1]
+        problems = []
+        if max(counts.values()) > budget:
+            problems.append(f"exceeded the budget of {budget} queries")
+        if len(set(counts.values())) > 1:
+            problems.append("query count grows with the number of rows")
+        if problems:
+            worst = max(runs, key=lambda run: len(run[1]))
+            message = [
+                f"{' and '.join(problems)}: " + ', '.join(f"{count} at {size} rows" for size, count in counts.items()),
+                f"Statements at {worst[0]} rows:",
+                shape_report(worst[1]),
+            ]
+            diff = shape_diff(small_sqls, large_sqls, f'{small} rows', f'{large} rows')
+            if diff:
+                message += ['Diff:', diff]
+            self.fail('\n'.join(message))
+
+        if scans:
+            self.assertNoFullScans(large_sqls, using, allow_scans)
+        return large_sqls
+
+    def assertNoFullScans(self, sqls, using='default', allow=()):
+        found = full_scans(sqls, using, allow)
+        if found:
+            self.fail('Full table scans:\n' + '\n'.join(
+                f"  {table}: {step}\n    {normalize(sql)}" for table, step, sql in found
+            ))
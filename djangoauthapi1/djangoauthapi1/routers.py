@@ -0,0 +1,133 @@
+"""Read-replica routing with read-your-writes.
+
+Views that opt in with ``ReplicaReadMixin`` serve their safe (GET/HEAD) requests
+from the ``replica`` alias; everything else reads and writes the primary. A user
+whose request changed data is pinned to the primary for ``REPLICA_PIN_SECONDS``,
+long enough for the replica to catch up, so they never see their own change
+missing. Within a single request, the first write pins the rest of it as well.
+
+The per-request state lives in a context variable set by
+``ReplicaPinningMiddleware``; code running outside a request (commands, workers)
+always uses the primary. The pins live in the cache, so settings only turn
+``REPLICA_READS`` on when it is shared by all worker processes.
+"""
+import contextvars
+import logging
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework.permissions import SAFE_METHODS
+
+logger = logging.getLogger(__name__)
+
+PRIMARY = 'default'
+REPLICA = 'replica'
+
+_state = contextvars.ContextVar('db_routing', default=None)
+
+
+class RoutingState:
+    __slots__ = ('replica', 'wrote')
+
+    def __init__(self):
+        self.replica = False
+        self.wrote = False
+
+
+def replica_enabled():
+    return getattr(settings, 'REPLICA_READS', False) and REPLICA in settings.DATABASES
+
+
+def pin_key(user_id):
+    return f"db-pin:{user_id}"
+
+
+def is_pinned(user):
+    return bool(user and user.is_authenticated and cache.get(pin_key(user.id)))
+
+
+def pin(user):
+    cache.set(pin_key(user.id), True, getattr(settings, 'REPLICA_PIN_SECONDS', 5))
+
+
+def use_replica():
+    """Let the rest of the current request read from the replica."""
+    state = _state.get()
+    if state is not None and not state.wrote:
+        state.replica = True
+
+
+class PrimaryReplicaRouter:
+    def db_for_read(self, model, **hints):
+        state = _state.get()
+        if state is not None and state.replica and not state.wrote and replica_enabled():
+            return REPLICA
+        return PRIMARY
+
+    def db_for_write(self, model, **hints):
+        state = _state.get()
+        if state is not None:
+            state.wrote = True
+        return PRIMARY
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Both aliases hold the same data.
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return True
+
+
+class ReplicaReadMixin:
+    """For DRF views whose GETs may be a little stale: read them from the replica
+    unless the requesting user is pinned to the primary."""
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if request.method in SAFE_METHODS and not is_pinned(request.user):
+            use_replica()
+
+
+class ReplicaPinningMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+        if getattr(settings, 'REPLICA_CONFIGURED', False) and not replica_enabled():
+            logger.warning(
+                "A read replica is configured but replica reads are off: the read-your-writes "
+                "pins need a cache shared by all worker processes (set CACHE_BACKEND)."
+            )
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        token = _state.set(RoutingState())
+        try:
+            response = self.get_response(request)
+        finally:
+            _state.reset(token)
+        self.pin_after_write(request, response)
+        return response
+
+    async def __acall__(self, request):
+        token = _state.set(RoutingState())
+        try:
+            response = await self.get_response(request)
+        finally:
+            _state.reset(token)
+        self.pin_after_write(request, response)
+        return response
+
+    def pin_after_write(self, request, response):
+        # DRF authenticates inside the view and copies the user onto the Django request.
+        # Some writes are raw SQL that never reaches the router, so any successful
+        # unsafe request counts as a write.
+        user = getattr(request, 'user', None)
+        if request.method not in SAFE_METHODS and response.status_code < 400 and user is not None and user.is_authenticated:
+            pin(user)
@@ -22,6 +22,12 @@ TWILIO_ACCOUNT_SID = os.getenv("TWILIO_ACCOUNT_SID")
 TWILIO_AUTH_TOKEN = os.getenv("TWILIO_AUTH_TOKEN")
 TWILIO_WHATSAPP_NUMBER = os.getenv("TWILIO_WHATSAPP_NUMBER")
 
+# Outbox delivery backends per channel (see notification.transports)
+NOTIFICATION_TRANSPORTS = {
+    'whatsapp': 'notification.transports.TwilioWhatsAppTransport',
+    'email': 'notification.transports.EmailTransport',
+}
+
 # Quick-start development settings - unsuitable for production
 # See https://docs.djangoproject.com/en/5.1/howto/deployment/checklist/
 
@@ -52,9 +58,16 @@ INSTALLED_APPS = [
  'order',
  'modelapi',
  'voicesearch',
+ 'recommendation',
+ 'popularity',
+ 'reservation',
+ 'notification',
+ 'analytics',
 ]
 
 MIDDLEWARE = [
+    'djangoauthapi1.middleware.ProfilingMiddleware',
+    'djangoauthapi1.routers.ReplicaPinningMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -65,6 +78,22 @@ MIDDLEWARE = [
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
+# Request profiling (djangoauthapi1.middleware): Server-Timing header, per-route
+# histograms at /api/metrics/routes/, and cProfile dumps of sampled slow requests.
+SERVER_TIMING_HEADER = True
+PROFILING_SAMPLE_RATE = float(os.environ.get("PROFILING_SAMPLE_RATE", 0))
+PROFILING_SLOW_MS = 1000
+PROFILING_DIR = os.environ.get("PROFILING_DIR", BASE_DIR / 'profiles')
+
+# Thread pools behind the async (ASGI) views (djangoauthapi1.asyncviews): CPU-bound
+# work (images, inference, hashing) and blocking client libraries. Each pool queues
+# BACKLOG tasks per worker; requests beyond that wait up to QUEUE_TIMEOUT seconds
+# for room, then get a 503. None = number of cores.
+ASYNC_CPU_WORKERS = None
+ASYNC_IO_WORKERS = int(os.environ.get("ASYNC_IO_WORKERS", 32))
+ASYNC_EXECUTOR_BACKLOG = 8
+ASYNC_QUEUE_TIMEOUT = 1.0
+
 ROOT_URLCONF = 'djangoauthapi1.urls'
 
 TEMPLATES = [
@@ -89,6 +118,13 @@ WSGI_APPLICATION = 'djangoauthapi1.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.1/ref/settings/#databases
 
+# Connections are kept open per worker thread for CONN_MAX_AGE seconds and checked
+# with a ping before reuse after an error, instead of reconnecting on every request.
+# Not under ASGI: Django 4.2 runs each request's sync and ORM work on a new thread
+# there, so a persistent per-thread connection would never be reused or closed and
+# would leak until MySQL's wait_timeout. asgi.py sets DJANGO_SERVER=asgi to turn
+# persistence off; use a pooling proxy (e.g. ProxySQL) in front of MySQL instead.
+SERVING_ASGI = os.environ.get('DJANGO_SERVER') == 'asgi'
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.mysql',
@@ -97,8 +133,43 @@ DATABASES = {
         'PASSWORD': '',
         'HOST': '127.0.0.1',
         'PORT':'3306',
+        'CONN_MAX_AGE': 0 if SERVING_ASGI else int(os.environ.get('DB_CONN_MAX_AGE', 60)),
+        'CONN_HEALTH_CHECKS': True,
+}
+}
+# Read replica for the views using djangoauthapi1.routers.ReplicaReadMixin. Until
+# DB_REPLICA_HOST is set the alias points at the primary and nothing is routed to it
+# (REPLICA_READS is set below, once the cache is known).
+DATABASES['replica'] = {
+    **DATABASES['default'],
+    'HOST': os.environ.get('DB_REPLICA_HOST', DATABASES['default']['HOST']),
+    'PORT': os.environ.get('DB_REPLICA_PORT', DATABASES['default']['PORT']),
+    'TEST': {'NAME': 'test_buyzi_replica'},
+}
+REPLICA_CONFIGURED = bool(os.environ.get('DB_REPLICA_HOST'))
+# How long a user who changed something keeps reading from the primary.
+REPLICA_PIN_SECONDS = int(os.environ.get('DB_REPLICA_PIN_SECONDS', 5))
+DATABASE_ROUTERS = ['djangoauthapi1.routers.PrimaryReplicaRouter']
+
+
+# Cache
+# Per-user caches (cart summary, ...) are invalidated on write, so any deployment
+# running more than one worker process must point this at a shared backend
+# (e.g. CACHE_BACKEND=django.core.cache.backends.redis.RedisCache).
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv('CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.getenv('CACHE_LOCATION', ''),
+    }
 }
+# The read-your-writes pins for replica reads live in this cache. With a per-process
+# backend another worker would not see a user's pin and could serve them stale data,
+# so replica reads stay off (with a warning at startup) until the cache is shared.
+PER_PROCESS_CACHE_BACKENDS = {
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
 }
+REPLICA_READS = REPLICA_CONFIGURED and CACHES['default']['BACKEND'] not in PER_PROCESS_CACHE_BACKENDS
 
 
 # Password validation
@@ -145,9 +216,12 @@ REST_FRAMEWORK = {
     
     'DEFAULT_AUTHENTICATION_CLASSES': (
         
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
-    ) 
-   
+        'account.authentication.CachedJWTAuthentication',
+    ),
+    # Reverse proxies in front of the app. Client IPs (used by the login throttles)
+    # are taken from that many hops back in X-Forwarded-For; with 0 the header is
+    # ignored and REMOTE_ADDR is used, so clients cannot pick their own IP.
+    'NUM_PROXIES': int(os.environ.get('NUM_PROXIES', 0)),
 }
 AUTH_USER_MODEL = 'account.User'
 
@@ -160,8 +234,24 @@ EMAIL_PORT=587
 EMAIL_HOST_USER=os.environ.get('EMAIL_USER')
 EMAIL_HOST_PASSWORD=os.environ.get("EMAIL_PASSWORD")
 EMAIL_USE_TLS=True
+# Messages per second the email worker sends over its SMTP session
+EMAIL_SEND_RATE=float(os.environ.get("EMAIL_SEND_RATE", 5))
 
 # JWT setting
+# Per-process cache of users resolved from access tokens (account.authentication)
+JWT_USER_CACHE_TTL = 30
+JWT_USER_CACHE_SIZE = 10000
+
+# Password-hashing endpoints (account.throttling): token buckets of (burst, tokens per
+# second) per client IP and per submitted email, and a cap on concurrent hashes
+# (None = half the CPU cores); excess requests get 429 before any hashing.
+LOGIN_THROTTLE_RATES = {
+    'ip': (20, 20 / 60),
+    'email': (5, 5 / 300),
+}
+PASSWORD_HASH_CONCURRENCY = None
+PASSWORD_HASH_QUEUE_TIMEOUT = 0.5
+
 SIMPLE_JWT = {
     "ACCESS_TOKEN_LIFETIME": timedelta(days=7),
     "REFRESH_TOKEN_LIFETIME": timedelta(days=1),
@@ -208,4 +298,11 @@ CORS_ALLOW_CREDENTIALS = True
 
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
+# Media is served by djangoauthapi1.media.serve_media. Set MEDIA_OFFLOAD to
+# 'x-accel-redirect' (nginx: an internal location at MEDIA_ACCEL_PREFIX aliased to
+# MEDIA_ROOT) or 'x-sendfile' (Apache/lighttpd) to have the proxy send the bytes.
+MEDIA_OFFLOAD = os.environ.get('MEDIA_OFFLOAD', '')
+MEDIA_ACCEL_PREFIX = '/protected-media/'
+# Cache lifetime of media without a content hash in its name; hashed files are immutable.
+MEDIA_MAX_AGE = 3600
 
@@ -0,0 +1,314 @@
+import io
+import os
+import re
+import tempfile
+import time
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from PIL import Image
+from rest_framework.renderers import JSONRenderer
+from rest_framework.serializers import Serializer
+from rest_framework.test import APIClient
+
+from account.models import User
+from benchmarks.stubs import StubModel
+from cart.models import CartItem
+from favourite.models import Favourite
+from order.models import Order, OrderItem
+from product.models import Product
+from .middleware import route_stats
+from .media import HashedMediaStorage, IMMUTABLE
+from .querycount import QueryBudgetMixin, capture, normalize
+from .routers import ReplicaPinningMiddleware, pin_key
+
+
+class ProfilingMiddlewareTests(TestCase):
+    def setUp(self):
+        route_stats.clear()
+        for i in range(3):
+            Product.objects.create(name=f'Shoe {i}', price=10, stock=5)
+
+    def test_server_timing_reports_queries_and_phases(self):
+        render = JSONRenderer.render
+        to_representation = Serializer.to_representation
+
+        def slow_render(*args, **kwargs):
+            time.sleep(0.02)
+            return render(*args, **kwargs)
+
+        def slow_to_representation(*args, **kwargs):
+            time.sleep(0.01)
+            return to_representation(*args, **kwargs)
+
+        with mock.patch.object(JSONRenderer, 'render', slow_render), \
+                mock.patch.object(Serializer, 'to_representation', slow_to_representation):
+            response = self.client.get(reverse('product-list-create'))
+        timing = response['Server-Timing']
+        self.assertRegex(timing, r'db;dur=[\d.]+;desc="1 queries"')
+        phases = {name: float(value) for name, value in re.findall(r'(\w+);dur=([\d.]+)', timing)}
+        self.assertEqual(set(phases), {'db', 'app', 'serialize', 'render', 'total'})
+        self.assertGreaterEqual(phases['render'], 20)
+        self.assertGreaterEqual(phases['serialize'], 30)
+        self.assertLess(phases['app'], phases['serialize'])
+        self.assertGreaterEqual(phases['total'] + 0.2, phases['render'] + phases['serialize'] + phases['db'])  # rounding
+        self.assertGreaterEqual(route_stats.snapshot()['GET /api/products/']['avg_serialize_ms'], 30)
+
+    def test_routes_are_aggregated_by_pattern(self):
+        for product in Product.objects.all():
+            self.client.get(reverse('product-detail', args=[product.id]))
+        self.client.get('/no/such/page/')
+        routes = route_stats.snapshot()
+        detail = routes['GET /api/products/<int:id>/']
+        self.assertEqual((detail['requests'], detail['avg_queries']), (3, 1.0))
+        self.assertEqual(sum(detail['histogram'].values()), 3)
+        self.assertIsNotNone(detail['p99_ms'])
+        self.assertIn('GET <unresolved>', routes)
+
+        client = APIClient()
+        self.assertEqual(client.get(reverse('route-metrics')).status_code, 401)
+        client.force_authenticate(User.objects.create_superuser(email='admin@example.com', name='Admin', tc=True, password='pw'))
+        self.assertIn('GET /api/products/<int:id>/', client.get(reverse('route-metrics')).json()['routes'])
+
+    async def test_async_requests_are_timed(self):
+        response = await self.async_client.get(reverse('product-list-create'))
+        self.assertRegex(response['Server-Timing'], r'db;dur=[\d.]+;desc="1 queries"')
+        self.assertEqual(route_stats.snapshot()['GET /api/products/']['requests'], 1)
+
+    def test_sampled_slow_requests_are_profiled_to_disk(self):
+        with tempfile.TemporaryDirectory() as directory:
+            with override_settings(PROFILING_SAMPLE_RATE=1.0, PROFILING_SLOW_MS=0, PROFILING_DIR=directory):
+                self.client.get(reverse('product-list-create'))
+            dumps = os.listdir(directory)
+        self.assertEqual(len(dumps), 1)
+        self.assertTrue(dumps[0].endswith('ms.prof'))
+        self.assertIn('api_products', dumps[0])
+
+
+@override_settings(REPLICA_READS=True)
+class ReplicaRoutingTests(TestCase):
+    # The test "replica" is a separate database that is never replicated to, so
+    # where a row shows up tells which alias served the read.
+    databases = {'default', 'replica'}
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(email='reader@example.com', name='Reader', tc=True, password='pw')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def names(self, response):
+        self.assertEqual(response.status_code, 200)
+        return [product['name'] for product in response.json()]
+
+    def test_safe_reads_of_routed_views_use_the_replica(self):
+        Product.objects.create(name='Primary', price=10, stock=5)
+        replica_only = Product.objects.using('replica').create(name='Replica', price=10, stock=5)
+        self.assertEqual(self.names(self.client.get(reverse('product-list-create'))), ['Replica'])
+        self.assertEqual(self.client.get(reverse('product-detail', args=[replica_only.id])).json()['name'], 'Replica')
+        with override_settings(REPLICA_READS=False):
+            self.assertEqual(self.names(self.client.get(reverse('product-list-create'))), ['Primary'])
+
+    def test_user_who_wrote_reads_their_writes_from_the_primary(self):
+        product = Product.objects.create(name='Loafers', price=10, stock=5)
+        Product.objects.using('replica').create(id=product.id, name='Loafers', price=10, stock=5)
+        self.assertEqual(self.client.post(reverse('toggle-favourite', args=[product.id])).status_code, 201)
+        self.assertTrue(cache.get(pin_key(self.user.id)))
+        self.assertEqual(self.names(self.client.get(reverse('list-favourites'))), ['Loafers'])
+
+        # Other users, and this one once the pin lapses, read the lagging replica.
+        other = User.objects.create_user(email='other@example.com', name='Other', tc=True, password='pw')
+        Favourite.objects.create(user=other, product=product)
+        self.client.force_authenticate(other)
+        self.assertEqual(self.names(self.client.get(reverse('list-favourites'))), [])
+        cache.delete(pin_key(self.user.id))
+        self.client.force_authenticate(self.user)
+        self.assertEqual(self.names(self.client.get(reverse('list-favourites'))), [])
+
+    def test_warns_at_startup_when_a_replica_cannot_be_used(self):
+        with override_settings(REPLICA_CONFIGURED=True, REPLICA_READS=False):
+            with self.assertLogs('djangoauthapi1.routers', 'WARNING'):
+                ReplicaPinningMiddleware(lambda request: None)
+
+    def test_failed_writes_do_not_pin(self):
+        self.assertEqual(self.client.post(reverse('toggle-favourite', args=[999])).status_code, 404)
+        self.assertIsNone(cache.get(pin_key(self.user.id)))
+
+
+class MediaServingTests(TestCase):
+    def setUp(self):
+        self.media = tempfile.TemporaryDirectory()
+        self.addCleanup(self.media.cleanup)
+        media_settings = override_settings(MEDIA_ROOT=self.media.name, MEDIA_OFFLOAD='')
+        media_settings.enable()
+        self.addCleanup(media_settings.disable)
+        self.storage = HashedMediaStorage()
+        self.body = bytes(range(256)) * 8
+        self.name = self.storage.save('product_images/loafers.jpg', ContentFile(self.body))
+
+    def get(self, name=None, **headers):
+        return self.client.get(f'/media/{name or self.name}', headers={k.replace('_', '-'): v for k, v in headers.items()})
+
+    def test_names_carry_the_content_hash(self):
+        self.assertRegex(self.name, r'^product_images/loafers\.[0-9a-f]{12}\.jpg$')
+        self.assertEqual(self.storage.save('product_images/loafers.jpg', ContentFile(self.body)), self.name)
+        self.assertNotEqual(self.storage.save('product_images/loafers.jpg', ContentFile(b'other')), self.name)
+
+    def test_hashed_files_are_immutable_and_revalidate_with_304(self):
+        response = self.get()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b''.join(response.streaming_content), self.body)
+        self.assertEqual((response['Cache-Control'], response['Accept-Ranges']), (IMMUTABLE, 'bytes'))
+        self.assertEqual(response['Content-Type'], 'image/jpeg')
+        self.assertEqual(self.get(If_None_Match=response['ETag']).status_code, 304)
+        self.assertEqual(self.get(If_Modified_Since=response['Last-Modified']).status_code, 304)
+
+        with open(os.path.join(self.media.name, 'legacy.jpg'), 'wb') as f:
+            f.write(b'unhashed')
+        self.assertEqual(self.get('legacy.jpg')['Cache-Control'], 'public, max-age=3600')
+
+    def test_byte_ranges(self):
+        response = self.get(Range='bytes=10-19')
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(b''.join(response.streaming_content), self.body[10:20])
+        self.assertEqual(response['Content-Range'], f'bytes 10-19/{len(self.body)}')
+        self.assertEqual(response['Content-Length'], '10')
+        self.assertEqual(b''.join(self.get(Range='bytes=-5').streaming_content), self.body[-5:])
+        self.assertEqual(self.get(Range='bytes=5000-').status_code, 416)
+        # A stale If-Range gets the whole (changed) file instead of a piece of it.
+        self.assertEqual(self.get(Range='bytes=0-1', If_Range='"stale"').status_code, 200)
+        self.assertEqual(self.get(Range='bytes=0-1', If_Range=self.get()['ETag']).status_code, 206)
+
+    def test_offload_to_the_front_proxy(self):
+        with override_settings(MEDIA_OFFLOAD='x-accel-redirect'):
+            response = self.get()
+        self.assertEqual(response['X-Accel-Redirect'], f'/protected-media/{self.name}')
+        self.assertEqual((response.content, response['Cache-Control']), (b'', IMMUTABLE))
+        with override_settings(MEDIA_OFFLOAD='x-sendfile'):
+            self.assertEqual(self.get()['X-Sendfile'], os.path.join(self.media.name, self.name))
+
+    def test_rejects_paths_outside_media_root_and_unsafe_methods(self):
+        self.assertEqual(self.get('../settings.py').status_code, 404)
+        self.assertEqual(self.get('product_images').status_code, 404)
+        self.assertEqual(self.client.post(f'/media/{self.name}').status_code, 405)
+
+
+class QueryBudgetTests(QueryBudgetMixin, TestCase):
+    """Endpoints whose query count must not depend on how many rows they return."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(email='a@example.com', name='A', tc=True, password='pw')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def products(self, n, category='SNEAKER'):
+        existing = Product.objects.filter(category=category).count()
+        Product.objects.bulk_create([
+            Product(name=f'{category} {i}', price=10 + i, stock=100, category=category) for i in range(existing, n)
+        ])
+        return list(Product.objects.filter(category=category).order_by('id')[:n])
+
+    def test_normalize_collapses_literals(self):
+        self.assertEqual(
+            normalize("SELECT * FROM t WHERE id IN (1, 2, 3) AND name = 'it''s' LIMIT 21"),
+            normalize("SELECT * FROM t WHERE id IN (4, 5) AND name = 'x' LIMIT 21"),
+        )
+
+    def test_failure_lists_repeated_statements(self):
+        def grow(n):
+            self.products(n)
+
+        def per_row():
+            for product in Product.objects.all():
+                list(Favourite.objects.filter(product=product))
+            return None
+
+        with self.assertRaises(AssertionError) as failure:
+            self.assertQueryBudget(per_row, budget=5, grow=grow, scans=False)
+        message = str(failure.exception)
+        self.assertIn('query count grows with the number of rows: 2 at 1 rows, 11 at 10 rows, 101 at 100 rows', message)
+        self.assertIn(' 100 x SELECT', message)
+        self.assertIn('+SELECT', message)
+
+    def test_product_list(self):
+        def grow(n):
+            for product in self.products(n)[::2]:
+                Favourite.objects.get_or_create(user=self.user, product=product)
+
+        self.assertQueryBudget(
+            lambda: self.client.get(reverse('product-list-create'), {'category': 'sneaker'}), budget=2, grow=grow,
+            # No index on category; the catalogue is small enough to filter in a scan.
+            allow_scans={'product_product'},
+        )
+
+    def test_product_list_by_score_reads_the_score_index(self):
+        def grow(n):
+            for product in self.products(n):
+                Product.objects.filter(id=product.id).update(popular_score=product.id % 7, trending_score=product.id % 5)
+
+        for ordering in ('popular', 'trending'):
+            self.assertQueryBudget(
+                lambda: self.client.get(reverse('product-list-create'), {'ordering': ordering, 'limit': 20}),
+                budget=2, grow=grow,
+            )
+
+    def test_cart_list_and_summary(self):
+        def grow(n):
+            for product in self.products(n):
+                CartItem.objects.get_or_create(user=self.user, product=product, color='black', size='42', defaults={'quantity': 1})
+
+        self.assertQueryBudget(lambda: self.client.get(reverse('cart-list-create')), budget=1, grow=grow)
+        self.assertQueryBudget(lambda: self.client.get(reverse('cart-summary')), budget=2, grow=grow)
+
+    def test_favourite_list(self):
+        def grow(n):
+            for product in self.products(n):
+                Favourite.objects.get_or_create(user=self.user, product=product)
+
+        self.assertQueryBudget(lambda: self.client.get(reverse('list-favourites')), budget=2, grow=grow)
+
+    def test_order_create(self):
+        def grow(n):
+            CartItem.objects.filter(user=self.user).delete()
+            CartItem.objects.bulk_create([
+                CartItem(user=self.user, product=product, quantity=1, color='black', size='42') for product in self.products(n)
+            ])
+
+        order = {'shipping_address': '1 Mall Road', 'city': 'Lahore', 'postal_code': '54000', 'country': 'PK', 'phone': '923001234567'}
+        self.assertQueryBudget(lambda: self.client.post(reverse('order-create'), order, format='json'), budget=10, grow=grow)
+
+    def test_order_history(self):
+        def grow(n):
+            products = self.products(3)
+            for _ in range(Order.objects.filter(user=self.user).count(), n):
+                order = Order.objects.create(user=self.user, shipping_address='1 Mall Road', city='Lahore', postal_code='54000', country='PK')
+                OrderItem.objects.bulk_create([OrderItem(order=order, product=product, quantity=1, price=product.price) for product in products])
+
+        self.assertQueryBudget(lambda: self.client.get(reverse('order-history')), budget=2, grow=grow)
+
+    def test_predict(self):
+        image = io.BytesIO()
+        Image.new('RGB', (32, 32), (200, 200, 200)).save(image, 'JPEG')
+
+        def predict():
+            upload = SimpleUploadedFile('shoe.jpg', image.getvalue(), content_type='image/jpeg')
+            return self.client.post(reverse('predict'), {'image': upload}, format='multipart')
+
+        def grow(n):
+            for category in ('BALLETFLAT', 'BOAT', 'BROGUE', 'CLOG', 'SNEAKER'):
+                self.products(n, category)
+
+        with mock.patch('modelapi.views.tf.keras.models.load_model', return_value=StubModel()):
+            self.assertQueryBudget(predict, budget=2, grow=grow, allow_scans={'product_product'})
+
+    def test_unindexed_filter_is_reported_as_full_scan(self):
+        self.products(100)
+        _, sqls = capture(lambda: list(Product.objects.filter(name='SNEAKER 7')))
+        with self.assertRaisesRegex(AssertionError, r'Full table scans:\n  product_product: SCAN product_product'):
+            self.assertNoFullScans(sqls)
+        _, sqls = capture(lambda: list(Product.objects.filter(id=7)))
+        self.assertNoFullScans(sqls)
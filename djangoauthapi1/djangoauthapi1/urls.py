@@ -1,8 +1,11 @@
+import re
+
 from django.contrib import admin
-from django.urls import path, include
+from django.urls import path, include, re_path
 from django.conf import settings
-from django.conf.urls.static import static
 from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
+from .media import serve_media
+from .middleware import RouteMetricsView
 
 urlpatterns = [
     path('api/token/', TokenObtainPairView.as_view(), name='token_obtain_pair'),
@@ -12,10 +15,12 @@ urlpatterns = [
     path('api/products/', include('product.urls')),
     path('api/cart/', include('cart.urls')),
     path('api/orders/', include('order.urls')),
+    path('api/reservations/', include('reservation.urls')),
     path('api/favourite/', include('favourite.urls')),  # Added favourite app URLs
+    path('api/recommendations/', include('recommendation.urls')),
+    path('api/analytics/', include('analytics.urls')),
+    path('api/metrics/routes/', RouteMetricsView.as_view(), name='route-metrics'),
     path('api/', include('modelapi.urls')),
     path('api/', include('voicesearch.urls')),
-]
-
-if settings.DEBUG:
-    urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
\ No newline at end of file
+    re_path(r'^%s(?P<path>.+)$' % re.escape(settings.MEDIA_URL.lstrip('/')), serve_media, name='media'),
+]
\ No newline at end of file
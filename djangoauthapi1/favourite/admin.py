@@ -1,10 +1,23 @@
 from django.contrib import admin
-
-# Register your models here.
-from django.contrib import admin
 from .models import Favourite
+from .utils import invalidate_favourites
 
 @admin.register(Favourite)
 class FavouriteAdmin(admin.ModelAdmin):
 
     search_fields = ('user__username', 'product__name')
+
+    # Edits made here bypass the toggle's write-through
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        invalidate_favourites(obj.user_id)
+
+    def delete_model(self, request, obj):
+        super().delete_model(request, obj)
+        invalidate_favourites(obj.user_id)
+
+    def delete_queryset(self, request, queryset):
+        user_ids = set(queryset.values_list('user_id', flat=True))
+        super().delete_queryset(request, queryset)
+        for user_id in user_ids:
+            invalidate_favourites(user_id)
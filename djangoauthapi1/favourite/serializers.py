@@ -1,8 +1,9 @@
 from rest_framework import serializers
 from product.models import Product
-from favourite.models import Favourite
+from favourite.utils import favourite_ids
+from djangoauthapi1.middleware import TimedSerializerMixin
 
-class ProductSerializer(serializers.ModelSerializer):
+class ProductSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     is_favourite = serializers.SerializerMethodField()
 
     class Meta:
@@ -10,7 +11,11 @@ class ProductSerializer(serializers.ModelSerializer):
         fields = ['id', 'name', 'price', 'description', 'is_favourite']
 
     def get_is_favourite(self, obj):
-        user = self.context['request'].user
-        if user.is_authenticated:
-            return Favourite.objects.filter(user=user, product=obj).exists()
-        return False
+        # Loaded once per serialization and shared by every product in a list, as in
+        # product.serializers.ProductSerializer.
+        ids = self.context.get('favourite_ids')
+        if ids is None:
+            user = self.context['request'].user
+            ids = favourite_ids(user.id) if user.is_authenticated else frozenset()
+            self.context['favourite_ids'] = ids
+        return obj.id in ids
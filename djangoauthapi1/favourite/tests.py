@@ -1,3 +1,80 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from account.models import User
+from product.models import Product
+from .models import Favourite
+from .serializers import ProductSerializer
+from .utils import favourite_ids, favourites_key, toggle_favourite
+
+
+class FavouriteTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(email='a@example.com', name='A', tc=True, password='pw')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.products = [Product.objects.create(name=f'Shoe {i}', price=10, stock=5) for i in range(5)]
+
+    def toggle(self, product_id):
+        return self.client.post(reverse('toggle-favourite', args=[product_id]))
+
+    def statements(self, queries):
+        # Savepoints only appear because TestCase wraps each test in a transaction
+        return [query['sql'] for query in queries if 'SAVEPOINT' not in query['sql']]
+
+    def test_toggle_is_one_statement_and_invalidates_after_commit(self):
+        product = self.products[0]
+        favourite_ids(self.user.id)  # warm the cache
+        with self.captureOnCommitCallbacks(execute=True), CaptureQueriesContext(connection) as queries:
+            self.assertTrue(toggle_favourite(self.user.id, product.id))
+            # Until the toggle commits, other requests keep reading the old set.
+            self.assertIsNotNone(cache.get(favourites_key(self.user.id)))
+        # The INSERT and the favourite_count bump
+        self.assertEqual(len(self.statements(queries)), 2)
+        self.assertIsNone(cache.get(favourites_key(self.user.id)))
+        self.assertEqual(favourite_ids(self.user.id), {product.id})
+        self.assertEqual(Product.objects.get(id=product.id).favourite_count, 1)
+        with self.captureOnCommitCallbacks(execute=True), CaptureQueriesContext(connection) as queries:
+            self.assertFalse(toggle_favourite(self.user.id, product.id))
+        self.assertEqual(len(self.statements(queries)), 2)
+        self.assertEqual(Product.objects.get(id=product.id).favourite_count, 0)
+        self.assertEqual(favourite_ids(self.user.id), set())
+        self.assertFalse(Favourite.objects.exists())
+
+    def test_stale_cache_still_toggles_correctly(self):
+        product = self.products[0]
+        cache.set(favourites_key(self.user.id), b'')  # says "not a favourite"
+        Favourite.objects.create(user=self.user, product=product)
+        self.assertFalse(toggle_favourite(self.user.id, product.id))
+        self.assertFalse(Favourite.objects.exists())
+
+    def test_unknown_product_is_404_and_writes_nothing(self):
+        self.assertEqual(self.toggle(999999).status_code, 404)
+        self.assertFalse(Favourite.objects.exists())
+
+    def test_product_list_reads_flags_from_the_set(self):
+        for product in self.products[:2]:
+            with self.captureOnCommitCallbacks(execute=True):
+                self.assertEqual(self.toggle(product.id).status_code, 201)
+        response = self.client.get(reverse('list-favourites'))
+        self.assertEqual([product['is_favourite'] for product in response.json()], [True, True])
+        # Listing every product: one query for the products, none per row.
+        with self.assertNumQueries(1):
+            products = self.client.get('/api/products/').json()
+        flags = {product['id']: product['is_favourite'] for product in products}
+        self.assertEqual(flags, {product.id: index < 2 for index, product in enumerate(self.products)})
 
-# Create your tests here.
+    def test_serializing_a_list_loads_the_favourite_set_once(self):
+        toggle_favourite(self.user.id, self.products[1].id)
+        cache.clear()
+        request = mock.Mock(user=self.user)
+        with self.assertNumQueries(1):
+            data = ProductSerializer(self.products, many=True, context={'request': request}).data
+        self.assertEqual([item['is_favourite'] for item in data], [False, True, False, False, False])
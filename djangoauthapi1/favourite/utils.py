@@ -0,0 +1,103 @@
+"""Each user's favourite product ids, cached as a packed sorted integer array.
+
+Product listings flag favourites from it without querying ``Favourite`` per row (or
+at all, on a cache hit). Toggles drop the cached copy once they commit rather than
+editing it: a read-modify-write of the set would let two concurrent toggles from the
+same user lose one of them until the entry expires.
+"""
+from array import array
+
+from django.core.cache import cache
+from django.db import IntegrityError, connection, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from product.models import Product
+from .models import Favourite
+
+FAVOURITES_TIMEOUT = 3600
+
+
+class ProductNotFound(Exception):
+    pass
+
+
+def favourites_key(user_id):
+    return f"favourites:{user_id}"
+
+
+def _pack(product_ids):
+    return array('q', sorted(product_ids)).tobytes()
+
+
+def _unpack(packed):
+    ids = array('q')
+    ids.frombytes(packed)
+    return frozenset(ids)
+
+
+def favourite_ids(user_id):
+    """The user's favourite product ids, from the cache when present."""
+    packed = cache.get(favourites_key(user_id))
+    if packed is None:
+        ids = frozenset(Favourite.objects.filter(user_id=user_id).values_list('product_id', flat=True))
+        cache.set(favourites_key(user_id), _pack(ids), FAVOURITES_TIMEOUT)
+        return ids
+    return _unpack(packed)
+
+
+def invalidate_favourites(user_id):
+    cache.delete(favourites_key(user_id))
+
+
+def _insert(user_id, product_id):
+    """Insert the favourite only if the product exists, in one statement; returns the row count."""
+    quote = connection.ops.quote_name
+    sql = (
+        f"INSERT INTO {quote(Favourite._meta.db_table)} (user_id, product_id) "
+        f"SELECT %s, id FROM {quote(Product._meta.db_table)} WHERE id = %s"
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [user_id, product_id])
+        return cursor.rowcount
+
+
+def _delete(user_id, product_id):
+    """Delete the favourite and decrement the product's counter; returns whether a row went."""
+    with transaction.atomic():
+        deleted = Favourite.objects.filter(user_id=user_id, product_id=product_id).delete()[0]
+        if deleted:
+            Product.objects.filter(id=product_id, favourite_count__gt=0).update(
+                favourite_count=F('favourite_count') - 1, counters_changed_at=timezone.now(),
+            )
+    return bool(deleted)
+
+
+def toggle_favourite(user_id, product_id):
+    """Flip a favourite with a single DELETE or INSERT (plus the ``favourite_count``
+    update); returns True if it is now a favourite.
+
+    The cached set picks which statement to try first, so the usual tap costs no
+    product fetch. Raises ``ProductNotFound`` for unknown products.
+    """
+    currently = product_id in favourite_ids(user_id)
+    if currently and _delete(user_id, product_id):
+        added = False
+    else:
+        try:
+            with transaction.atomic():
+                inserted = _insert(user_id, product_id)
+                if inserted:
+                    Product.objects.filter(id=product_id).update(
+                        favourite_count=F('favourite_count') + 1, counters_changed_at=timezone.now(),
+                    )
+        except IntegrityError:
+            # Already a favourite (a stale cached set, or a concurrent tap got there first)
+            _delete(user_id, product_id)
+            added = False
+        else:
+            if not inserted:
+                raise ProductNotFound()
+            added = True
+    transaction.on_commit(lambda: invalidate_favourites(user_id))
+    return added
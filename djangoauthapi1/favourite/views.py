@@ -4,27 +4,31 @@ from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.generics import ListAPIView
-from django.shortcuts import get_object_or_404
+from djangoauthapi1.routers import ReplicaReadMixin
 from product.models import Product
-from favourite.models import Favourite
 from product.serializers import ProductSerializer
+from recommendation.utils import record_favourite
+from .utils import ProductNotFound, favourite_ids, toggle_favourite
 
 class ToggleFavouriteView(APIView):
     permission_classes = [IsAuthenticated]
 
     def post(self, request, product_id):
-        product = get_object_or_404(Product, id=product_id)
-        fav, created = Favourite.objects.get_or_create(user=request.user, product=product)
+        try:
+            added = toggle_favourite(request.user.id, product_id)
+        except ProductNotFound:
+            return Response({'detail': 'Not found.'}, status=status.HTTP_404_NOT_FOUND)
 
-        if not created:
-            fav.delete()
+        others = favourite_ids(request.user.id) - {product_id}
+        record_favourite(request.user.id, product_id, added=added, others=others)
+        if not added:
             return Response({'status': 'removed from favourites', 'is_favourite': False}, status=status.HTTP_200_OK)
         else:
             return Response({'status': 'added to favourites', 'is_favourite': True}, status=status.HTTP_201_CREATED)
 
-class FavouriteListView(ListAPIView):
+class FavouriteListView(ReplicaReadMixin, ListAPIView):
     permission_classes = [IsAuthenticated]
     serializer_class = ProductSerializer
 
     def get_queryset(self):
-        return Product.objects.filter(favourite__user=self.request.user)
\ No newline at end of file
+        return Product.objects.filter(favourite__user=self.request.user)
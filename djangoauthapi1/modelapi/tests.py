@@ -1,3 +1,50 @@
+import io
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
 from django.test import TestCase
+from django.urls import reverse
+from PIL import Image
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from account.models import User
+from benchmarks.stubs import StubModel
+from favourite.models import Favourite
+from product.models import Product
+from . import views
+
+
+def jpeg_upload(shade):
+    buffer = io.BytesIO()
+    Image.new('RGB', (32, 32), (shade, shade, shade)).save(buffer, 'JPEG')
+    return SimpleUploadedFile('shoe.jpg', buffer.getvalue(), content_type='image/jpeg')
+
+
+class AsyncPredictionTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        patcher = mock.patch.object(views, '_model', StubModel())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.products = [
+            Product.objects.create(name=f'{category} shoe', price=10, stock=1, category=category)
+            for category in ('BALLETFLAT', 'BOAT', 'BROGUE', 'CLOG', 'SNEAKER')
+        ]
+        self.user = User.objects.create_user(email='a@example.com', name='A', tc=True, password='pw')
+        for product in self.products:
+            Favourite.objects.create(user=self.user, product=product)
+
+    async def test_matches_the_sync_view(self):
+        token = str(RefreshToken.for_user(self.user).access_token)
+        with mock.patch('modelapi.views.tf.keras.models.load_model', return_value=StubModel()):
+            expected = await self.async_client.post(reverse('predict'), {'image': jpeg_upload(200)}, headers={'Authorization': f'Bearer {token}'})
+        response = await self.async_client.post(reverse('predict-async'), {'image': jpeg_upload(200)}, headers={'Authorization': f'Bearer {token}'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), expected.json())
+        self.assertEqual([product['is_favourite'] for product in response.json()['products']], [True])
 
-# Create your tests here.
+    async def test_rejects_missing_image_and_bad_token(self):
+        self.assertEqual((await self.async_client.post(reverse('predict-async'))).status_code, 400)
+        response = await self.async_client.post(reverse('predict-async'), {'image': jpeg_upload(10)}, headers={'Authorization': 'Bearer nope'})
+        self.assertEqual(response.status_code, 401)
@@ -1,6 +1,7 @@
 from django.urls import path
-from .views import H5ModelPredictionView
+from .views import AsyncH5ModelPredictionView, H5ModelPredictionView
 
 urlpatterns = [
     path('predict/', H5ModelPredictionView.as_view(), name='predict'),
+    path('predict/async/', AsyncH5ModelPredictionView.as_view(), name='predict-async'),
 ]
@@ -1,16 +1,23 @@
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.parsers import MultiPartParser
+from rest_framework.exceptions import AuthenticationFailed
 import tensorflow as tf
 from PIL import Image
 import numpy as np
 import os
+import threading
+from asgiref.sync import sync_to_async
 from django.conf import settings
+from django.http import JsonResponse
 import logging
 
 # Imports for product querying
 from product.models import Product
 from product.serializers import ProductSerializer
+from account.authentication import StatelessJWTAuthentication
+from favourite.utils import favourite_ids
+from djangoauthapi1.asyncviews import AsyncAPIView, Overloaded, cpu_pool, io_pool
 
 logger = logging.getLogger(__name__)
 
@@ -84,9 +91,11 @@ class H5ModelPredictionView(APIView):
 
             # Fetch matching products
             try:
-                products = Product.objects.filter(category=predicted_category_enum)
-                logger.info(f"Found {products.count()} products for category: {predicted_category_enum}")
-                if products.count() == 0:
+                # One query: the serializer works from the evaluated list rather than
+                # re-querying, and its length replaces separate COUNT(*)s.
+                products = list(Product.objects.filter(category=predicted_category_enum))
+                logger.info(f"Found {len(products)} products for category: {predicted_category_enum}")
+                if not products:
                     logger.info(f"No products found for category: {predicted_category_enum}")
                     return Response({
                         'error': f'No products found for category {predicted_class}',
@@ -108,4 +117,81 @@ class H5ModelPredictionView(APIView):
 
         except Exception as e:
             logger.error(f"Prediction error: {e}")
-            return Response({'error': f'Prediction failed: {str(e)}'}, status=500)
\ No newline at end of file
+            return Response({'error': f'Prediction failed: {str(e)}'}, status=500)
+
+
+_model = None
+_model_lock = threading.Lock()
+
+
+def shared_model():
+    """The classifier, loaded once per process (the sync view loads it per request)."""
+    global _model
+    with _model_lock:
+        if _model is None:
+            try:
+                _model = tf.keras.models.load_model(os.path.join(settings.BASE_DIR, 'modelapi', 'model', 'thezaack.h5'), compile=False)
+            except Exception as e:
+                logger.error(f"Failed to load model: {e}")
+        return _model
+
+
+def classify(model, image_file):
+    """Blocking: decode, resize and run the image through the model."""
+    image = Image.open(image_file).convert('RGB').resize((224, 224))
+    image_array = np.expand_dims(np.array(image) / 255.0, axis=0)
+    predictions = model.predict(image_array)
+    return int(np.argmax(predictions[0])), float(np.max(predictions[0]))
+
+
+class AsyncH5ModelPredictionView(AsyncAPIView):
+    """ASGI variant of H5ModelPredictionView. The upload is parsed on the I/O pool,
+    decoding and inference run on the CPU pool, and the products come from the async ORM."""
+    async def post(self, request, *args, **kwargs):
+        try:
+            auth = StatelessJWTAuthentication().authenticate(request)
+        except AuthenticationFailed as e:
+            return JsonResponse({'detail': str(e.detail)}, status=401)
+        files = await io_pool.run(lambda: request.FILES)
+        image_file = files.get('image')
+        if not image_file:
+            return JsonResponse({'error': 'No image provided'}, status=400)
+        model = _model or await cpu_pool.run(shared_model)
+        if model is None:
+            return JsonResponse({'error': 'Model not loaded'}, status=500)
+
+        try:
+            predicted_index, max_confidence = await cpu_pool.run(classify, model, image_file)
+        except Exception as e:
+            if isinstance(e, Overloaded):
+                raise
+            logger.error(f"Prediction error: {e}")
+            return JsonResponse({'error': f'Prediction failed: {str(e)}'}, status=500)
+
+        if max_confidence < CONFIDENCE_THRESHOLD:
+            return JsonResponse({
+                'error': 'No products found: Image does not match any known category',
+                'class_name': None,
+                'confidence': max_confidence,
+                'products': []
+            }, status=200)
+        if predicted_index < 0 or predicted_index >= len(CLASS_NAMES):
+            return JsonResponse({'error': 'Prediction index out of range'}, status=500)
+
+        predicted_class = CLASS_NAMES[predicted_index]
+        products = [product async for product in Product.objects.filter(category=predicted_class.upper().replace(' ', '_'))]
+        if not products:
+            return JsonResponse({
+                'error': f'No products found for category {predicted_class}',
+                'class_name': predicted_class,
+                'confidence': max_confidence,
+                'products': []
+            }, status=200)
+
+        favourites = await sync_to_async(favourite_ids)(auth[0].id) if auth else frozenset()
+        serialized_products = ProductSerializer(products, many=True, context={'request': request, 'favourite_ids': favourites}).data
+        return JsonResponse({
+            'class_name': predicted_class,
+            'confidence': max_confidence,
+            'products': serialized_products
+        })
@@ -0,0 +1,20 @@
+from django.contrib import admin
+from django.utils import timezone
+from .models import Notification
+
+
+@admin.register(Notification)
+class NotificationAdmin(admin.ModelAdmin):
+    list_display = ('id', 'channel', 'recipient', 'reference', 'status', 'attempts', 'next_attempt_at', 'sent_at')
+    list_filter = ('status', 'channel')
+    search_fields = ('recipient', 'reference')
+    readonly_fields = ('created_at', 'sent_at', 'provider_id', 'last_error')
+    actions = ['retry_now']
+
+    def retry_now(self, request, queryset):
+        """Move selected (e.g. dead-lettered) notifications back to the queue."""
+        updated = queryset.exclude(status=Notification.STATUS_SENT).update(
+            status=Notification.STATUS_PENDING, attempts=0, next_attempt_at=timezone.now(),
+        )
+        self.message_user(request, f"Re-queued {updated} notification(s).")
+    retry_now.short_description = "Retry now"
@@ -0,0 +1,43 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from notification.transports import get_transport
+from notification.utils import drain
+
+
+class Command(BaseCommand):
+    help = "Outbox worker: deliver queued notifications with retries and dead-lettering."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--channel', action='append', dest='channels', help="Channel(s) to serve; defaults to all configured.")
+        parser.add_argument('--once', action='store_true', help="Drain what is due and exit instead of polling.")
+        parser.add_argument('--interval', type=float, default=1.0, help="Seconds to sleep when the outbox is empty.")
+        parser.add_argument('--batch-size', type=int, default=50)
+        parser.add_argument('--concurrency', type=int, default=8)
+
+    def handle(self, *args, **options):
+        channels = options['channels'] or list(settings.NOTIFICATION_TRANSPORTS)
+        transports = {channel: get_transport(channel) for channel in channels}
+        for transport in transports.values():
+            transport.open()
+        try:
+            while True:
+                busy = False
+                for channel, transport in transports.items():
+                    sent, failed = drain(channel, transport, options['batch_size'], options['concurrency'])
+                    if sent or failed:
+                        busy = True
+                        self.stdout.write(f"{channel}: sent {sent}, failed {failed}")
+                if options['once']:
+                    return
+                close_old_connections()
+                if not busy:
+                    time.sleep(options['interval'])
+        except KeyboardInterrupt:
+            pass
+        finally:
+            for transport in transports.values():
+                transport.close()
@@ -0,0 +1,23 @@
+# Generated by Django 4.2.20 on 2026-10-19 06:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notification', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='notification',
+            name='subject',
+            field=models.CharField(blank=True, max_length=255),
+        ),
+        migrations.AlterField(
+            model_name='notification',
+            name='channel',
+            field=models.CharField(choices=[('whatsapp', 'WhatsApp'), ('email', 'Email')], max_length=20),
+        ),
+    ]
@@ -0,0 +1,102 @@
+import smtplib
+import time
+from datetime import timedelta
+from unittest import mock
+
+from django.core import mail
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from .models import Notification
+from .transports import EmailTransport, LocMemTransport, PermanentError
+from .utils import MAX_ATTEMPTS, claim, drain, enqueue
+
+
+class RejectingTransport(LocMemTransport):
+    def send(self, notification):
+        raise PermanentError("Invalid recipient")
+
+
+@override_settings(NOTIFICATION_TRANSPORTS={'whatsapp': 'notification.transports.LocMemTransport'})
+class OutboxTests(TestCase):
+    def setUp(self):
+        LocMemTransport.outbox = []
+        LocMemTransport.failures = 0
+
+    def test_worker_delivers_queued_notifications(self):
+        for i in range(3):
+            enqueue('whatsapp', f'+9230000000{i}', 'Hello', reference=f'order:{i}')
+        call_command('send_notifications', '--once', stdout=open('/dev/null', 'w'))
+        self.assertEqual(len(LocMemTransport.outbox), 3)
+        self.assertEqual(Notification.objects.filter(status=Notification.STATUS_SENT, attempts=1).count(), 3)
+        self.assertFalse(Notification.objects.exclude(provider_id__startswith='locmem-').exists())
+
+    def test_failure_is_retried_with_backoff(self):
+        notification = enqueue('whatsapp', '+923000000000', 'Hello')
+        LocMemTransport.failures = 1
+        self.assertEqual(drain('whatsapp', LocMemTransport()), (0, 1))
+        notification.refresh_from_db()
+        self.assertEqual((notification.status, notification.attempts), (Notification.STATUS_PENDING, 1))
+        self.assertGreater(notification.next_attempt_at, timezone.now() + timedelta(seconds=20))
+        self.assertIn('Simulated provider failure', notification.last_error)
+
+        # Not due yet, so a second pass leaves it alone; once due it goes out.
+        self.assertEqual(drain('whatsapp', LocMemTransport()), (0, 0))
+        Notification.objects.update(next_attempt_at=timezone.now())
+        self.assertEqual(drain('whatsapp', LocMemTransport()), (1, 0))
+        notification.refresh_from_db()
+        self.assertEqual((notification.status, notification.attempts), (Notification.STATUS_SENT, 2))
+
+    def test_dead_letters_after_max_attempts(self):
+        notification = enqueue('whatsapp', '+923000000000', 'Hello')
+        LocMemTransport.failures = MAX_ATTEMPTS
+        for _ in range(MAX_ATTEMPTS):
+            Notification.objects.update(next_attempt_at=timezone.now())
+            drain('whatsapp', LocMemTransport())
+        notification.refresh_from_db()
+        self.assertEqual((notification.status, notification.attempts), (Notification.STATUS_DEAD, MAX_ATTEMPTS))
+        self.assertEqual(LocMemTransport.outbox, [])
+
+    def test_permanent_error_dead_letters_immediately(self):
+        notification = enqueue('whatsapp', 'not-a-number', 'Hello')
+        drain('whatsapp', RejectingTransport())
+        notification.refresh_from_db()
+        self.assertEqual((notification.status, notification.attempts), (Notification.STATUS_DEAD, 1))
+
+    def test_claim_leases_rows(self):
+        enqueue('whatsapp', '+923000000000', 'Hello')
+        self.assertEqual(len(claim('whatsapp', 10)), 1)
+        self.assertEqual(claim('whatsapp', 10), [])
+
+
+class EmailTransportTests(TestCase):
+    def setUp(self):
+        self.transport = EmailTransport()
+
+    @override_settings(EMAIL_SEND_RATE=20)
+    def test_sends_over_one_connection_at_the_configured_rate(self):
+        for i in range(4):
+            enqueue('email', f'user{i}@example.com', 'Body', subject='Hi')
+        with mock.patch('notification.transports.get_connection', wraps=mail.get_connection) as get_connection:
+            self.transport.open()
+            started = time.monotonic()
+            self.assertEqual(drain('email', self.transport, concurrency=8), (4, 0))
+            elapsed = time.monotonic() - started
+            self.transport.close()
+        get_connection.assert_called_once()
+        self.assertEqual(sorted(message.to[0] for message in mail.outbox), [f'user{i}@example.com' for i in range(4)])
+        self.assertGreaterEqual(elapsed, 3 / 20)
+
+    @override_settings(EMAIL_SEND_RATE=1000)
+    def test_refused_recipient_is_dead_lettered_and_disconnect_retried(self):
+        refused = enqueue('email', 'nobody@example.com', 'Body')
+        dropped = enqueue('email', 'a@example.com', 'Body')
+        self.transport.open()
+        errors = [smtplib.SMTPRecipientsRefused({'nobody@example.com': (550, b'No such user')}), smtplib.SMTPServerDisconnected()]
+        with mock.patch.object(self.transport.connection, 'send_messages', side_effect=errors):
+            self.assertEqual(drain('email', self.transport), (0, 2))
+        refused.refresh_from_db()
+        dropped.refresh_from_db()
+        self.assertEqual(refused.status, Notification.STATUS_DEAD)
+        self.assertEqual((dropped.status, dropped.attempts), (Notification.STATUS_PENDING, 1))
@@ -0,0 +1,115 @@
+import os
+import smtplib
+import threading
+import time
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.core.mail.message import make_msgid
+from django.core.mail.utils import DNS_NAME
+from django.utils.module_loading import import_string
+
+
+class PermanentError(Exception):
+    """The provider rejected the message; retrying will not help."""
+
+
+class BaseTransport:
+    """Delivers notifications for one channel. One instance is opened per worker and
+    shared by its threads, so clients and connections are reused across messages."""
+    # Upper bound on worker threads for transports whose client is not thread-safe.
+    max_concurrency = None
+
+    def open(self):
+        pass
+
+    def close(self):
+        pass
+
+    def send(self, notification):
+        """Deliver ``notification`` and return the provider's message id."""
+        raise NotImplementedError
+
+
+class TwilioWhatsAppTransport(BaseTransport):
+    def open(self):
+        from twilio.rest import Client
+        self.client = Client(settings.TWILIO_ACCOUNT_SID, settings.TWILIO_AUTH_TOKEN)
+        self.from_number = f'whatsapp:{settings.TWILIO_WHATSAPP_NUMBER}'
+
+    def send(self, notification):
+        from twilio.base.exceptions import TwilioRestException
+        try:
+            message = self.client.messages.create(
+                body=notification.body,
+                from_=self.from_number,
+                to=f'whatsapp:{notification.recipient}',
+            )
+        except TwilioRestException as e:
+            if 400 <= e.status < 500 and e.status != 429:
+                raise PermanentError(str(e))
+            raise
+        return message.sid
+
+
+class EmailTransport(BaseTransport):
+    """Sends through Django's configured ``EMAIL_BACKEND`` over one connection that stays
+    open for the life of the worker, paced to ``EMAIL_SEND_RATE`` messages per second."""
+    # An SMTP session carries one conversation at a time.
+    max_concurrency = 1
+
+    def open(self):
+        self.connection = get_connection()
+        self.connection.open()
+        self.from_email = os.environ.get("EMAIL_FROM")
+        self.interval = 1 / getattr(settings, 'EMAIL_SEND_RATE', 5)
+        self.next_send = 0
+        self.lock = threading.Lock()
+
+    def close(self):
+        self.connection.close()
+
+    def send(self, notification):
+        message = EmailMessage(
+            subject=notification.subject,
+            body=notification.body,
+            from_email=self.from_email,
+            to=[notification.recipient],
+            headers={'Message-ID': make_msgid(domain=DNS_NAME)},
+            connection=self.connection,
+        )
+        with self.lock:
+            if getattr(self.connection, 'connection', False) is None:
+                # The previous session dropped; log in again and keep the new one open.
+                self.connection.open()
+            delay = self.next_send - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            self.next_send = time.monotonic() + self.interval
+            try:
+                # send_messages reuses the open session instead of logging in per message
+                self.connection.send_messages([message])
+            except smtplib.SMTPRecipientsRefused as e:
+                raise PermanentError(str(e))
+            except (smtplib.SMTPServerDisconnected, OSError):
+                self.connection.close()
+                raise
+        return message.extra_headers['Message-ID']
+
+
+class LocMemTransport(BaseTransport):
+    """Test transport: keeps sent notifications in ``outbox``; ``failures`` makes the
+    next N sends raise."""
+    outbox = []
+    failures = 0
+
+    def send(self, notification):
+        if LocMemTransport.failures:
+            LocMemTransport.failures -= 1
+            raise ConnectionError("Simulated provider failure")
+        LocMemTransport.outbox.append(notification)
+        return f"locmem-{len(LocMemTransport.outbox)}"
+
+
+def get_transport(channel):
+    return import_string(settings.NOTIFICATION_TRANSPORTS[channel])()
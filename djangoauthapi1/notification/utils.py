@@ -0,0 +1,97 @@
+import logging
+import random
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Notification
+from .transports import PermanentError
+
+logger = logging.getLogger(__name__)
+
+MAX_ATTEMPTS = 6
+BACKOFF_BASE = timedelta(seconds=30)
+BACKOFF_MAX = timedelta(hours=1)
+# How long a claimed row stays invisible to other workers; a crashed worker's
+# rows become due again after this.
+LEASE = timedelta(minutes=5)
+
+
+def enqueue(channel, recipient, body, reference='', subject=''):
+    """Queue a message. Call it inside the transaction of the change it announces."""
+    return Notification.objects.create(channel=channel, recipient=recipient, subject=subject, body=body, reference=reference)
+
+
+async def aenqueue(channel, recipient, body, reference='', subject=''):
+    """``enqueue`` for async views, through the async ORM."""
+    return await Notification.objects.acreate(channel=channel, recipient=recipient, subject=subject, body=body, reference=reference)
+
+
+def backoff(attempts):
+    delay = min(BACKOFF_BASE * 2 ** (attempts - 1), BACKOFF_MAX)
+    return delay * random.uniform(0.8, 1.2)
+
+
+def claim(channel, limit, now=None):
+    """Lease up to ``limit`` due notifications; concurrent workers skip each other's rows."""
+    now = now or timezone.now()
+    with transaction.atomic():
+        batch = list(
+            Notification.objects.select_for_update(skip_locked=True)
+            .filter(channel=channel, status=Notification.STATUS_PENDING, next_attempt_at__lte=now)
+            .order_by('next_attempt_at')[:limit]
+        )
+        if batch:
+            Notification.objects.filter(id__in=[n.id for n in batch]).update(next_attempt_at=now + LEASE)
+    return batch
+
+
+def _send(transport, notification):
+    try:
+        return notification, transport.send(notification), None
+    except Exception as e:
+        return notification, None, e
+
+
+def deliver(transport, notifications, executor):
+    """Send a claimed batch through ``executor`` and record each outcome."""
+    now = timezone.now()
+    sent = failed = 0
+    for notification, provider_id, error in executor.map(lambda n: _send(transport, n), notifications):
+        notification.attempts += 1
+        if error is None:
+            notification.status = Notification.STATUS_SENT
+            notification.provider_id = provider_id or ''
+            notification.sent_at = now
+            notification.last_error = ''
+            sent += 1
+        else:
+            failed += 1
+            notification.last_error = f"{type(error).__name__}: {error}"
+            if isinstance(error, PermanentError) or notification.attempts >= MAX_ATTEMPTS:
+                notification.status = Notification.STATUS_DEAD
+                logger.error(f"Notification {notification.id} dead-lettered: {notification.last_error}")
+            else:
+                notification.next_attempt_at = now + backoff(notification.attempts)
+                logger.warning(f"Notification {notification.id} attempt {notification.attempts} failed: {notification.last_error}")
+    Notification.objects.bulk_update(
+        notifications, ['status', 'attempts', 'next_attempt_at', 'last_error', 'provider_id', 'sent_at'],
+    )
+    return sent, failed
+
+
+def drain(channel, transport, batch_size=50, concurrency=8):
+    """Deliver everything currently due on ``channel``; returns ``(sent, failed)``."""
+    totals = [0, 0]
+    if transport.max_concurrency:
+        concurrency = min(concurrency, transport.max_concurrency)
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        while True:
+            batch = claim(channel, batch_size)
+            if not batch:
+                return tuple(totals)
+            sent, failed = deliver(transport, batch, executor)
+            totals[0] += sent
+            totals[1] += failed
@@ -1,5 +1,6 @@
 from django.contrib import admin
-from .models import Order, OrderItem
+from .export import streaming_export
+from .models import IdempotencyKey, Order, OrderItem
 
 @admin.register(Order)
 class OrderAdmin(admin.ModelAdmin):
@@ -9,6 +10,7 @@ class OrderAdmin(admin.ModelAdmin):
     date_hierarchy = 'created_at'
     ordering = ('-created_at',)
     readonly_fields = ('created_at', 'updated_at')
+    actions = ['export_csv', 'export_jsonl']
 
     def user_email(self, obj):
         return obj.user.email
@@ -17,6 +19,16 @@ class OrderAdmin(admin.ModelAdmin):
     def get_queryset(self, request):
         return super().get_queryset(request).select_related('user')
 
+    # Select all matching a date / country filter to export a whole day; the lines are
+    # streamed, so the size of the selection does not matter.
+    def export_csv(self, request, queryset):
+        return streaming_export(OrderItem.objects.filter(order__in=queryset.values('id')), 'csv')
+    export_csv.short_description = "Export order lines (CSV)"
+
+    def export_jsonl(self, request, queryset):
+        return streaming_export(OrderItem.objects.filter(order__in=queryset.values('id')), 'jsonl')
+    export_jsonl.short_description = "Export order lines (JSON lines)"
+
 @admin.register(OrderItem)
 class OrderItemAdmin(admin.ModelAdmin):
     list_display = ('order', 'product', 'quantity', 'color', 'size', 'price')
@@ -25,4 +37,12 @@ class OrderItemAdmin(admin.ModelAdmin):
     ordering = ('order',)
 
     def get_queryset(self, request):
-        return super().get_queryset(request).select_related('order', 'product')
\ No newline at end of file
+        return super().get_queryset(request).select_related('order', 'product')
+
+@admin.register(IdempotencyKey)
+class IdempotencyKeyAdmin(admin.ModelAdmin):
+    list_display = ('key', 'user', 'order', 'status_code', 'created_at', 'expires_at')
+    list_filter = ('status_code',)
+    search_fields = ('key', 'user__email')
+    readonly_fields = ('fingerprint', 'response', 'created_at')
+    raw_id_fields = ('user', 'order')
@@ -0,0 +1,106 @@
+"""``Idempotency-Key`` support for order submission.
+
+The first request with a key inserts an in-flight row and runs; its response is
+stored on the row. A retry with the same key is answered from that row with one
+lookup on the (user, key) unique index. A retry that arrives while the first is
+still running polls the row for up to ``WAIT_TIMEOUT`` and then gets a 409.
+"""
+import hashlib
+import json
+import time
+from datetime import timedelta
+
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from .models import IdempotencyKey
+
+KEY_TTL = timedelta(hours=24)
+MAX_KEY_LENGTH = 255
+WAIT_TIMEOUT = 5  # seconds
+POLL_INTERVAL = 0.1
+# An in-flight row older than this belongs to a worker that died mid-request.
+STALE_AFTER = timedelta(minutes=2)
+
+
+class KeyMismatch(Exception):
+    """The key was already used for a different request body."""
+
+
+class KeyInFlight(Exception):
+    """The original request is still running."""
+
+
+def fingerprint(request):
+    body = json.dumps(request.data, sort_keys=True, default=str)
+    return hashlib.sha256(f"{request.method} {request.path}\n{body}".encode()).hexdigest()
+
+
+def _lookup(user, key):
+    return IdempotencyKey.objects.filter(user=user, key=key).first()
+
+
+def claim(user, key, request_fingerprint, now=None):
+    """Return ``(record, replay)``.
+
+    ``replay`` is True when ``record`` holds a finished response to send back as is;
+    otherwise the caller owns ``record`` and must ``complete`` or ``release`` it.
+    """
+    deadline = time.monotonic() + WAIT_TIMEOUT
+    while True:
+        now = timezone.now()
+        record = _lookup(user, key)
+        if record is not None and record.expires_at <= now:
+            record.delete()
+            record = None
+        if record is None:
+            try:
+                with transaction.atomic():
+                    return IdempotencyKey.objects.create(
+                        user=user, key=key, fingerprint=request_fingerprint, expires_at=now + KEY_TTL,
+                    ), False
+            except IntegrityError:
+                continue  # lost the race to a concurrent request with the same key
+
+        if record.fingerprint != request_fingerprint:
+            raise KeyMismatch()
+        if record.status_code is not None:
+            return record, True
+        if record.created_at <= now - STALE_AFTER:
+            if record.order_id is not None:
+                return record, True
+            # Nothing was committed; take the row over and run again.
+            taken = IdempotencyKey.objects.filter(pk=record.pk, status_code=None, order=None, created_at=record.created_at).update(created_at=now)
+            if taken:
+                record.created_at = now
+                return record, False
+            continue
+        if time.monotonic() >= deadline:
+            raise KeyInFlight()
+        time.sleep(POLL_INTERVAL)
+
+
+def complete(record, response):
+    """Store a finished response for replay. Server errors are not stored so the
+    client can retry them."""
+    if response.status_code >= 500:
+        release(record)
+        return
+    record.status_code = response.status_code
+    record.response = response.data
+    record.save(update_fields=['status_code', 'response'])
+
+
+def release(record):
+    """Forget an unfinished request so that a retry runs again."""
+    IdempotencyKey.objects.filter(pk=record.pk, order=None).delete()
+
+
+def purge_expired(now=None, batch_size=1000):
+    now = now or timezone.now()
+    purged = 0
+    while True:
+        ids = list(IdempotencyKey.objects.filter(expires_at__lte=now).order_by('expires_at').values_list('id', flat=True)[:batch_size])
+        if not ids:
+            return purged
+        purged += IdempotencyKey.objects.filter(id__in=ids).delete()[0]
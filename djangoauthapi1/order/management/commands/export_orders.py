@@ -0,0 +1,29 @@
+from datetime import date
+from functools import partial
+
+from django.core.management.base import BaseCommand
+
+from order.export import FORMATS, filter_lines, iter_rows
+
+
+class Command(BaseCommand):
+    help = "Stream order lines (joined with customer and product) as CSV or JSON lines."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--start', type=date.fromisoformat, help="First order date, YYYY-MM-DD.")
+        parser.add_argument('--end', type=date.fromisoformat, help="Last order date (inclusive), YYYY-MM-DD.")
+        parser.add_argument('--country')
+        parser.add_argument('--format', choices=sorted(FORMATS), default='csv')
+        parser.add_argument('--output', help="File to write; defaults to stdout.")
+        parser.add_argument('--chunk-size', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        lines = filter_lines(start=options['start'], end=options['end'], country=options['country'])
+        out = open(options['output'], 'w', newline='') if options['output'] else None
+        write = out.write if out else partial(self.stdout.write, ending='')
+        try:
+            for line in FORMATS[options['format']](iter_rows(lines, options['chunk_size'])):
+                write(line)
+        finally:
+            if out:
+                out.close()
@@ -0,0 +1,65 @@
+"""Order placement as one transaction: lock the cart, decrement stock, write the order
+and its items in bulk, clear the cart. The number of queries does not depend on the
+number of cart lines."""
+import logging
+
+from django.db import transaction
+
+from cart.models import CartItem
+from cart.utils import invalidate_cart_summary
+from recommendation.utils import record_order
+from reservation.utils import consume_holds
+from .models import IdempotencyKey, OrderItem
+from .utils import queue_order_confirmation_whatsapp
+
+logger = logging.getLogger(__name__)
+
+
+class EmptyCart(Exception):
+    pass
+
+
+def _record_recommendations(order_id, product_ids):
+    try:
+        record_order(product_ids)
+    except Exception as e:
+        logger.error(f"Failed to update recommendations for order {order_id}: {e}")
+
+
+def place_order(user, serializer, phone_number=None, idempotency_key=None):
+    """Create the order described by the validated ``serializer`` from the user's cart,
+    queueing the WhatsApp confirmation to ``phone_number`` in the same transaction.
+    An ``IdempotencyKey`` passed in is linked to the order before it commits.
+
+    Returns ``(order, whatsapp_status)``. Raises ``EmptyCart`` or ``InsufficientStock``;
+    in both cases nothing is written.
+    """
+    with transaction.atomic():
+        lines = list(
+            CartItem.objects.select_for_update(of=('self',)).select_related('product').filter(user=user)
+        )
+        if not lines:
+            raise EmptyCart()
+
+        consume_holds(user, [(line.product_id, line.quantity) for line in lines])
+        order = serializer.save(user=user)
+        OrderItem.objects.bulk_create([
+            OrderItem(
+                order=order,
+                product=line.product,
+                quantity=line.quantity,
+                color=line.color,
+                size=line.size,
+                price=line.product.price,
+            )
+            for line in lines
+        ])
+        CartItem.objects.filter(id__in=[line.id for line in lines]).delete()
+        if idempotency_key is not None:
+            IdempotencyKey.objects.filter(pk=idempotency_key.pk).update(order=order)
+        whatsapp_status = queue_order_confirmation_whatsapp(phone_number, order.id) if phone_number else None
+
+        product_ids = [line.product_id for line in lines]
+        transaction.on_commit(lambda: _record_recommendations(order.id, product_ids))
+    invalidate_cart_summary(user.id)
+    return order, whatsapp_status
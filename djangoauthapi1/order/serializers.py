@@ -1,18 +1,43 @@
 from rest_framework import serializers
 from .models import Order, OrderItem
 from product.serializers import ProductSerializer
+from djangoauthapi1.middleware import TimedSerializerMixin
 
-class OrderItemSerializer(serializers.ModelSerializer):
+class OrderItemSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     product = ProductSerializer(read_only=True)
 
     class Meta:
         model = OrderItem
         fields = ['product', 'quantity', 'color', 'size', 'price']
 
-class OrderSerializer(serializers.ModelSerializer):
+class OrderSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     items = OrderItemSerializer(many=True, read_only=True)
 
     class Meta:
         model = Order
         fields = ['id', 'user', 'shipping_address', 'city', 'postal_code', 'country', 'created_at', 'items']
-        read_only_fields = ['id', 'user', 'created_at']
\ No newline at end of file
+        read_only_fields = ['id', 'user', 'created_at']
+
+class OrderLineSerializer(TimedSerializerMixin, serializers.ModelSerializer):
+    """Compact order line for history listings: the product as it was bought, with
+    no per-row lookups."""
+    product_id = serializers.IntegerField(read_only=True)
+    name = serializers.CharField(source='product.name', read_only=True)
+    thumbnail = serializers.ImageField(source='product.image', read_only=True)
+
+    class Meta:
+        model = OrderItem
+        fields = ['product_id', 'name', 'thumbnail', 'quantity', 'color', 'size', 'price']
+
+class OrderHistorySerializer(TimedSerializerMixin, serializers.ModelSerializer):
+    items = OrderLineSerializer(many=True, read_only=True)
+    total = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Order
+        fields = ['id', 'shipping_address', 'city', 'postal_code', 'country', 'created_at', 'total', 'items']
+
+    def get_total(self, obj):
+        # Summed over the prefetched lines rather than with a query per order
+        total = sum((item.price or 0) * item.quantity for item in obj.items.all())
+        return f"{total:.2f}"
@@ -1,3 +1,215 @@
+import csv
+import json
+from datetime import datetime, timedelta
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from account.models import User
+from cart.models import CartItem
+from notification.models import Notification
+from product.models import Product
+from .models import IdempotencyKey, Order, OrderItem
+
+ORDER = {'shipping_address': '1 Mall Road', 'city': 'Lahore', 'postal_code': '54000', 'country': 'PK', 'phone': '923001234567'}
+
+
+class OrderPlacementTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(email='a@example.com', name='A', tc=True, password='pw')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def fill_cart(self, lines, stock=10):
+        products = [Product.objects.create(name=f'Shoe {i}', price=10 + i, stock=stock) for i in range(lines)]
+        for product in products:
+            CartItem.objects.create(user=self.user, product=product, quantity=2, color='black', size='42')
+        return products
+
+    def place(self, data=ORDER):
+        return self.client.post(reverse('order-create'), data, format='json')
+
+    def test_places_order_and_decrements_stock(self):
+        products = self.fill_cart(3)
+        response = self.place()
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(len(response.json()['items']), 3)
+        self.assertFalse(CartItem.objects.exists())
+        self.assertEqual(list(Product.objects.values_list('stock', flat=True)), [8, 8, 8])
+        self.assertEqual(list(Product.objects.values_list('units_sold', flat=True)), [2, 2, 2])
+        self.assertEqual(
+            sorted(OrderItem.objects.values_list('product_id', 'price')),
+            [(product.id, product.price) for product in products],
+        )
+        self.assertEqual(response.json()['whatsapp_status']['status'], 'queued')
+        notification = Notification.objects.get()
+        self.assertEqual((notification.recipient, notification.reference), ('+923001234567', f"order:{response.json()['id']}"))
+
+    def test_insufficient_stock_leaves_nothing_behind(self):
+        products = self.fill_cart(2)
+        Product.objects.filter(id=products[1].id).update(stock=1)
+        response = self.place()
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()['products'], [products[1].id])
+        self.assertEqual(CartItem.objects.count(), 2)
+        self.assertFalse(Order.objects.exists())
+        self.assertFalse(Notification.objects.exists())
+        self.assertEqual(Product.objects.get(id=products[0].id).stock, 10)
+
+    def test_missing_phone_keeps_cart(self):
+        self.fill_cart(1)
+        data = dict(ORDER)
+        del data['phone']
+        self.assertEqual(self.place(data).status_code, 400)
+        self.assertEqual(CartItem.objects.count(), 1)
+
+    def test_query_count_is_constant_in_cart_size(self):
+        counts = []
+        for lines in (1, 10):
+            CartItem.objects.all().delete()
+            self.fill_cart(lines)
+            with CaptureQueriesContext(connection) as queries:
+                self.assertEqual(self.place().status_code, 201)
+            counts.append(len(queries))
+        self.assertEqual(counts[0], counts[1], f"queries grew with cart size: {counts}")
+
+
+class IdempotentOrderTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(email='a@example.com', name='A', tc=True, password='pw')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        product = Product.objects.create(name='Shoe', price=10, stock=10)
+        CartItem.objects.create(user=self.user, product=product, quantity=2, color='black', size='42')
+
+    def place(self, key='k-1', data=ORDER):
+        return self.client.post(reverse('order-create'), data, format='json', HTTP_IDEMPOTENCY_KEY=key)
+
+    def test_retry_replays_stored_response_with_one_query(self):
+        first = self.place()
+        self.assertEqual(first.status_code, 201)
+        with self.assertNumQueries(1):
+            retry = self.place()
+        self.assertEqual(retry.status_code, 201)
+        self.assertEqual(retry['Idempotent-Replayed'], 'true')
+        self.assertEqual(retry.json(), first.json())
+        self.assertEqual(Order.objects.count(), 1)
+        self.assertEqual(Notification.objects.count(), 1)
+        self.assertEqual(IdempotencyKey.objects.get().order_id, first.json()['id'])
+
+    def test_key_reused_with_different_body_is_rejected(self):
+        self.place()
+        self.assertEqual(self.place(data={**ORDER, 'city': 'Karachi'}).status_code, 422)
+
+    @mock.patch('order.idempotency.WAIT_TIMEOUT', 0)
+    def test_retry_while_in_flight_gets_conflict(self):
+        self.place()
+        IdempotencyKey.objects.update(status_code=None, response=None)
+        self.assertEqual(self.place().status_code, 409)
+
+    def test_failed_request_can_be_retried(self):
+        CartItem.objects.update(quantity=50)
+        response = self.place()
+        self.assertEqual(response.status_code, 400)
+        CartItem.objects.update(quantity=1)
+        # Client errors are replayed as-is; a new key starts over.
+        self.assertEqual(self.place().status_code, 400)
+        self.assertEqual(self.place(key='k-2').status_code, 201)
+
+    def test_purge_removes_expired_keys(self):
+        self.place()
+        self.place(key='k-2')
+        IdempotencyKey.objects.filter(key='k-1').update(expires_at=timezone.now() - timedelta(seconds=1))
+        call_command('purge_idempotency_keys', stdout=open('/dev/null', 'w'))
+        self.assertEqual(list(IdempotencyKey.objects.values_list('key', flat=True)), ['k-2'])
+
+
+class OrderHistoryTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(email='a@example.com', name='A', tc=True, password='pw')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.product = Product.objects.create(name='Shoe', price=10, stock=100)
+
+    def make_orders(self, count, lines=3):
+        for _ in range(count):
+            order = Order.objects.create(user=self.user, shipping_address='1 Mall Road', city='Lahore', postal_code='54000', country='PK')
+            OrderItem.objects.bulk_create([
+                OrderItem(order=order, product=self.product, quantity=2, price='7.50') for _ in range(lines)
+            ])
+
+    def test_lists_own_orders_newest_first_with_price_at_purchase(self):
+        self.make_orders(2)
+        other = User.objects.create_user(email='b@example.com', name='B', tc=True, password='pw')
+        Order.objects.create(user=other, shipping_address='x', city='x', postal_code='x', country='x')
+        response = self.client.get(reverse('order-history'))
+        self.assertEqual(response.status_code, 200)
+        results = response.json()['results']
+        self.assertEqual([order['id'] for order in results], sorted(Order.objects.filter(user=self.user).values_list('id', flat=True), reverse=True))
+        self.assertEqual(results[0]['total'], '45.00')
+        self.assertEqual(results[0]['items'][0], {
+            'product_id': self.product.id, 'name': 'Shoe', 'thumbnail': None,
+            'quantity': 2, 'color': None, 'size': None, 'price': '7.50',
+        })
+
+    def test_cursor_pages_through_everything(self):
+        self.make_orders(5, lines=1)
+        seen, url = [], reverse('order-history') + '?page_size=2'
+        while url:
+            page = self.client.get(url).json()
+            seen += [order['id'] for order in page['results']]
+            url = page['next']
+        self.assertEqual(seen, sorted(Order.objects.values_list('id', flat=True), reverse=True))
+
+    def test_page_query_count_is_fixed(self):
+        self.make_orders(20, lines=5)
+        with self.assertNumQueries(2):
+            self.assertEqual(len(self.client.get(reverse('order-history')).json()['results']), 20)
+
+
+class OrderExportTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(email='a@example.com', name='A', tc=True, password='pw')
+        self.product = Product.objects.create(name='Boot, "tall"', price=50, stock=10, category='BOAT')
+        for day, country in [(1, 'PK'), (2, 'PK'), (2, 'AE'), (3, 'PK')]:
+            order = Order.objects.create(user=self.user, shipping_address='1 Mall Road', city='Lahore', postal_code='54000', country=country)
+            Order.objects.filter(id=order.id).update(created_at=timezone.make_aware(datetime(2024, 3, day, 12)))
+            OrderItem.objects.bulk_create([
+                OrderItem(order=order, product=self.product, quantity=quantity, price='50.00') for quantity in (1, 2)
+            ])
+
+    def test_command_filters_by_date_and_country(self):
+        out = StringIO()
+        call_command('export_orders', '--start', '2024-03-02', '--end', '2024-03-03', '--country', 'pk', stdout=out)
+        rows = list(csv.DictReader(StringIO(out.getvalue())))
+        self.assertEqual(len(rows), 4)
+        self.assertEqual({row['country'] for row in rows}, {'PK'})
+        self.assertEqual(rows[0]['product_name'], 'Boot, "tall"')
+        self.assertEqual(rows[0]['customer_email'], 'a@example.com')
+
+    def test_jsonl_reads_in_bounded_chunks(self):
+        out = StringIO()
+        with CaptureQueriesContext(connection) as queries:
+            call_command('export_orders', '--format', 'jsonl', '--chunk-size', '3', stdout=out)
+        rows = [json.loads(line) for line in out.getvalue().splitlines()]
+        self.assertEqual(len(rows), 8)
+        self.assertEqual(rows[-1]['quantity'], 2)
+        self.assertEqual(len(queries), 3)  # 3 + 3 + 2 lines
 
-# Create your tests here.
+    def test_admin_action_streams_selected_orders(self):
+        admin_user = User.objects.create_superuser(email='admin@example.com', name='Admin', tc=True, password='pw')
+        self.client.force_login(admin_user)
+        selected = list(Order.objects.filter(country='AE').values_list('id', flat=True))
+        response = self.client.post(reverse('admin:order_order_changelist'), {
+            'action': 'export_csv', '_selected_action': selected,
+        })
+        self.assertTrue(response.streaming)
+        rows = list(csv.DictReader(StringIO(b''.join(response.streaming_content).decode())))
+        self.assertEqual([int(row['order_id']) for row in rows], selected * 2)
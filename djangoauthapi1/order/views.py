@@ -1,10 +1,13 @@
 from rest_framework import generics, permissions, status
+from rest_framework.pagination import CursorPagination
 from rest_framework.response import Response
+from django.db.models import Prefetch
+from djangoauthapi1.routers import ReplicaReadMixin
 from .models import Order, OrderItem
-from .serializers import OrderSerializer
-from cart.models import CartItem
-from .utils import send_order_confirmation_whatsapp
-from datetime import datetime
+from .serializers import OrderHistorySerializer, OrderSerializer
+from . import idempotency
+from .placement import EmptyCart, place_order
+from reservation.utils import InsufficientStock
 
 class OrderCreateView(generics.CreateAPIView):
     queryset = Order.objects.all()
@@ -12,33 +15,39 @@ class OrderCreateView(generics.CreateAPIView):
     permission_classes = [permissions.IsAuthenticated]
 
     def create(self, request, *args, **kwargs):
-        user = request.user
-        cart_items = CartItem.objects.filter(user=user)
-
-        if not cart_items.exists():
-            return Response({"error": "Cart is empty"}, status=status.HTTP_400_BAD_REQUEST)
+        key = request.headers.get('Idempotency-Key')
+        if not key:
+            return self.place(request)
+        if len(key) > idempotency.MAX_KEY_LENGTH:
+            return Response({"error": "Idempotency-Key is too long"}, status=status.HTTP_400_BAD_REQUEST)
 
-        serializer = self.get_serializer(data=request.data)
-        serializer.is_valid(raise_exception=True)
+        try:
+            record, replay = idempotency.claim(request.user, key, idempotency.fingerprint(request))
+        except idempotency.KeyMismatch:
+            return Response({"error": "Idempotency-Key was already used for a different request"}, status=status.HTTP_422_UNPROCESSABLE_ENTITY)
+        except idempotency.KeyInFlight:
+            return Response({"error": "A request with this Idempotency-Key is still being processed"}, status=status.HTTP_409_CONFLICT, headers={'Retry-After': '1'})
+        if replay:
+            if record.status_code is None:
+                # The order committed but its response was never stored.
+                response = self.order_response(Order.objects.get(pk=record.order_id), None)
+            else:
+                response = Response(record.response, status=record.status_code)
+            response['Idempotent-Replayed'] = 'true'
+            return response
 
-        # Save the order
-        order = serializer.save(user=user)
+        try:
+            response = self.place(request, idempotency_key=record)
+        except Exception:
+            idempotency.release(record)
+            raise
+        idempotency.complete(record, response)
+        return response
 
-        # Save each cart item into the order
-        for item in cart_items:
-            OrderItem.objects.create(
-                order=order,
-                product=item.product,
-                quantity=item.quantity,
-                color=item.color,
-                size=item.size,
-                price=item.product.price
-            )
-
-        # Clear the cart
-        cart_items.delete()
+    def place(self, request, idempotency_key=None):
+        user = request.user
 
-        # Trigger WhatsApp message using phone number from request
+        # Validate everything before touching the cart
         phone_number = request.data.get("phone")
         if not phone_number:
             return Response({"error": "Phone number is required for confirmation message"}, status=400)
@@ -47,11 +56,46 @@ class OrderCreateView(generics.CreateAPIView):
         if not phone_number.startswith('+'):
             phone_number = f"+{phone_number}"
 
-        whatsapp_result = send_order_confirmation_whatsapp(phone_number, order.id)
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        try:
+            order, whatsapp_result = place_order(user, serializer, phone_number, idempotency_key=idempotency_key)
+        except EmptyCart:
+            return Response({"error": "Cart is empty"}, status=status.HTTP_400_BAD_REQUEST)
+        except InsufficientStock as e:
+            return Response({"error": "Insufficient stock", "products": sorted(e.product_ids)}, status=status.HTTP_400_BAD_REQUEST)
+
+        return self.order_response(order, whatsapp_result)
 
-        # Response
-        response_data = serializer.data
+    def order_response(self, order, whatsapp_result):
+        order = Order.objects.prefetch_related(
+            Prefetch('items', queryset=OrderItem.objects.select_related('product'))
+        ).get(pk=order.pk)
+        response_data = OrderSerializer(order, context=self.get_serializer_context()).data
         response_data["whatsapp_status"] = whatsapp_result
-        print(f"Sending WhatsApp confirmation to: {phone_number} at {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+        return Response(response_data, status=status.HTTP_201_CREATED)
+
+
+
+class OrderHistoryPagination(CursorPagination):
+    # Keyset pagination on the primary key: every page is an indexed range scan,
+    # however deep the client scrolls.
+    ordering = '-id'
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+
+
+class OrderHistoryView(ReplicaReadMixin, generics.ListAPIView):
+    """The user's past orders, newest first. Each page costs two queries: the orders
+    and their lines joined to products."""
+    serializer_class = OrderHistorySerializer
+    permission_classes = [permissions.IsAuthenticated]
+    pagination_class = OrderHistoryPagination
 
-        return Response(response_data, status=status.HTTP_201_CREATED)
\ No newline at end of file
+    def get_queryset(self):
+        lines = OrderItem.objects.select_related('product').only(
+            'order_id', 'product_id', 'quantity', 'color', 'size', 'price', 'product__name', 'product__image',
+        )
+        return Order.objects.filter(user=self.request.user).prefetch_related(Prefetch('items', queryset=lines))
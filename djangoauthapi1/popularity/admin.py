@@ -0,0 +1,15 @@
+from django.contrib import admin
+from .models import ProductPopularity, PopularityWatermark
+
+
+@admin.register(ProductPopularity)
+class ProductPopularityAdmin(admin.ModelAdmin):
+    list_display = ('product', 'popular_score', 'trending_score', 'updated_at')
+    search_fields = ('product__name',)
+    list_select_related = ('product',)
+    ordering = ('-popular_score',)
+
+
+@admin.register(PopularityWatermark)
+class PopularityWatermarkAdmin(admin.ModelAdmin):
+    list_display = ('source', 'value', 'updated_at')
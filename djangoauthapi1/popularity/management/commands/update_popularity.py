@@ -0,0 +1,17 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+
+from popularity.utils import update_scores
+
+
+class Command(BaseCommand):
+    help = "Fold new orders, favourites and cart adds into the popularity/trending scores. Run it periodically (e.g. every 5 minutes from cron)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--lag-seconds', type=int, default=60, help="Ignore order lines newer than this (and re-check counters changed this long before the last run), so in-flight transactions are not skipped.")
+        parser.add_argument('--batch-size', type=int, default=5000)
+
+    def handle(self, *args, **options):
+        updated = update_scores(lag=timedelta(seconds=options['lag_seconds']), batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"Updated popularity for {updated} product(s)."))
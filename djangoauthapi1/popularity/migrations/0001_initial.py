@@ -0,0 +1,37 @@
+# Generated by Django 4.2.20 on 2026-10-19 06:04
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('product', '0005_alter_product_category'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PopularityWatermark',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source', models.CharField(max_length=50, unique=True)),
+                ('value', models.BigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ProductPopularity',
+            fields=[
+                ('product', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='popularity', serialize=False, to='product.product')),
+                ('popular_score', models.FloatField(default=0)),
+                ('trending_score', models.FloatField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['-popular_score'], name='popularity_popular_idx'), models.Index(fields=['-trending_score'], name='popularity_trending_idx')],
+            },
+        ),
+    ]
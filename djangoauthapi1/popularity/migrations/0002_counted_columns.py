@@ -0,0 +1,46 @@
+# Generated by Django 4.2.20 on 2026-10-19 06:55
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def switch_to_counters(apps, schema_editor):
+    """Favourites and cart adds used to be read from their rows past a watermark.
+    Record the favourites those runs already scored so they are not added twice,
+    drop the old watermarks, and copy the existing scores onto Product."""
+    ProductPopularity = apps.get_model('popularity', 'ProductPopularity')
+    PopularityWatermark = apps.get_model('popularity', 'PopularityWatermark')
+    Favourite = apps.get_model('favourite', 'Favourite')
+    Product = apps.get_model('product', 'Product')
+
+    mark = PopularityWatermark.objects.filter(source='favourite').first()
+    if mark:
+        scored = Favourite.objects.filter(id__lte=mark.value).values('product').annotate(total=Count('id'))
+        for row in scored.iterator():
+            ProductPopularity.objects.filter(product_id=row['product']).update(favourites_counted=row['total'])
+    PopularityWatermark.objects.filter(source__in=['favourite', 'cartitem']).delete()
+    for row in ProductPopularity.objects.iterator():
+        Product.objects.filter(id=row.product_id).update(popular_score=row.popular_score, trending_score=row.trending_score)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('popularity', '0001_initial'),
+        ('product', '0009_product_cart_adds_scores'),
+        ('favourite', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='productpopularity',
+            name='cart_adds_counted',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='productpopularity',
+            name='favourites_counted',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(switch_to_counters, migrations.RunPython.noop),
+    ]
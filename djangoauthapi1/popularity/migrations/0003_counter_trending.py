@@ -0,0 +1,37 @@
+# Generated by Django 4.2.20 on 2026-10-19 07:13
+
+from django.db import migrations, models
+from django.db.models import F, Q
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+
+def stamp_unscored_counters(apps, schema_editor):
+    """update_scores now only reads products with a recent counters_changed_at. Stamp
+    the ones whose counters moved since the last run so the next run still scores them.
+    Their counter_trending starts at zero, so removals of favourites scored before
+    this migration are not subtracted from trending_score."""
+    Product = apps.get_model('product', 'Product')
+    Product.objects.annotate(
+        favourites_scored=Coalesce('popularity__favourites_counted', 0),
+        cart_adds_scored=Coalesce('popularity__cart_adds_counted', 0),
+    ).filter(
+        ~Q(favourite_count=F('favourites_scored')) | ~Q(cart_adds=F('cart_adds_scored'))
+    ).update(counters_changed_at=timezone.now())
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('popularity', '0002_counted_columns'),
+        ('product', '0010_product_counters_changed_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='productpopularity',
+            name='counter_trending',
+            field=models.FloatField(default=0),
+        ),
+        migrations.RunPython(stamp_unscored_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,40 @@
+from django.db import models
+from product.models import Product
+
+
+class ProductPopularity(models.Model):
+    """Ranking scores built incrementally from orders, favourites and cart adds.
+    ``update_scores`` copies the two scores onto ``Product``, whose indexes serve the
+    catalogue sorts.
+
+    ``trending_score`` uses forward decay: each event adds ``weight * 2 ** (age_since_epoch / half_life)``,
+    which orders products exactly like an exponentially decayed score without ever rewriting old rows.
+    """
+    product = models.OneToOneField(Product, on_delete=models.CASCADE, primary_key=True, related_name='popularity')
+    popular_score = models.FloatField(default=0)
+    trending_score = models.FloatField(default=0)
+    # The Product counters as of the last update_scores run; the next run scores the change.
+    favourites_counted = models.PositiveIntegerField(default=0)
+    cart_adds_counted = models.PositiveIntegerField(default=0)
+    # The part of trending_score that came from counter changes, kept to clamp it at zero.
+    counter_trending = models.FloatField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['-popular_score'], name='popularity_popular_idx'),
+            models.Index(fields=['-trending_score'], name='popularity_trending_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.product_id}: popular={self.popular_score:.1f}"
+
+
+class PopularityWatermark(models.Model):
+    """Last processed primary key per event source (plus the forward-decay epoch)."""
+    source = models.CharField(max_length=50, unique=True)
+    value = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.source} @ {self.value}"
@@ -0,0 +1,93 @@
+from datetime import timedelta
+
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from account.models import User
+from cart.utils import add_to_cart
+from favourite.utils import toggle_favourite
+from order.models import Order, OrderItem
+from product.models import Product
+from .models import ProductPopularity
+from .utils import update_scores
+
+
+class PopularityTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(email='a@example.com', name='A', tc=True, password='pw')
+        self.old, self.new, self.quiet = (
+            Product.objects.create(name=name, price=10, stock=5) for name in ['Old', 'New', 'Quiet']
+        )
+
+    def order(self, product, quantity, when):
+        order = Order.objects.create(user=self.user, shipping_address='x', city='x', postal_code='1', country='PK')
+        Order.objects.filter(id=order.id).update(created_at=when)
+        OrderItem.objects.create(order=order, product=product, quantity=quantity, price=product.price)
+
+    def test_scores_are_incremental_and_decayed(self):
+        now = timezone.now()
+        self.order(self.old, 4, now - timedelta(days=30))
+        self.order(self.new, 1, now - timedelta(hours=2))
+        update_scores(now=now)
+        toggle_favourite(self.user.id, self.new.id)
+        update_scores(now=now)
+        update_scores(now=now)
+
+        old, new = ProductPopularity.objects.get(product=self.old), ProductPopularity.objects.get(product=self.new)
+        self.assertEqual(old.popular_score, 12)
+        self.assertEqual(new.popular_score, 5)
+        self.assertGreater(new.trending_score, old.trending_score)
+
+        url = reverse('product-list-create')
+        ids = lambda ordering: [p['id'] for p in self.client.get(url, {'ordering': ordering}).json()]
+        self.assertEqual(ids('popular'), [self.old.id, self.new.id, self.quiet.id])
+        self.assertEqual(ids('trending'), [self.new.id, self.old.id, self.quiet.id])
+
+    def test_recent_events_wait_for_the_lag(self):
+        now = timezone.now()
+        self.order(self.old, 1, now)
+        self.assertEqual(update_scores(now=now), 0)
+        self.assertEqual(update_scores(now=now + timedelta(minutes=2)), 1)
+
+    def scores(self, product):
+        return Product.objects.values_list('popular_score', flat=True).get(id=product.id)
+
+    def test_favourites_count_once_per_user_and_removals_subtract(self):
+        toggle_favourite(self.user.id, self.new.id)
+        update_scores()
+        for _ in range(3):
+            toggle_favourite(self.user.id, self.new.id)
+            update_scores()
+            toggle_favourite(self.user.id, self.new.id)
+            update_scores()
+        self.assertEqual(self.scores(self.new), 2)
+        toggle_favourite(self.user.id, self.new.id)
+        update_scores()
+        self.assertEqual(self.scores(self.new), 0)
+        self.assertEqual(ProductPopularity.objects.get(product=self.new).popular_score, 0)
+
+    def test_repeat_cart_adds_are_counted(self):
+        add_to_cart(self.user, self.quiet, 1, 'black', '42')
+        update_scores()
+        add_to_cart(self.user, self.quiet, 2, 'black', '42')
+        self.assertEqual(update_scores(), 1)
+        self.assertEqual(self.scores(self.quiet), 3)
+        self.assertEqual(update_scores(), 0)
+
+    def test_removed_favourites_never_push_trending_below_zero(self):
+        now = timezone.now()
+        toggle_favourite(self.user.id, self.new.id)
+        update_scores(now=now)
+        toggle_favourite(self.user.id, self.new.id)
+        update_scores(now=now + timedelta(days=10))
+        popularity = ProductPopularity.objects.get(product=self.new)
+        self.assertEqual((popularity.popular_score, popularity.trending_score, popularity.counter_trending), (0, 0, 0))
+
+    def test_only_products_whose_counters_changed_since_the_last_run_are_read(self):
+        update_scores()
+        # Moved counters stamped long before the previous run were already scored then.
+        Product.objects.filter(id=self.quiet.id).update(favourite_count=1, counters_changed_at=timezone.now() - timedelta(days=1))
+        toggle_favourite(self.user.id, self.new.id)
+        self.assertEqual(update_scores(), 1)
+        self.assertEqual(self.scores(self.quiet), 0)
@@ -0,0 +1,148 @@
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone as dt_timezone
+from functools import reduce
+from operator import or_
+
+from django.db import transaction
+from django.db.models import F, Q
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from order.models import OrderItem
+from product.models import Product
+from .models import PopularityWatermark, ProductPopularity
+
+ORDER_WEIGHT = 3  # per unit ordered
+FAVOURITE_WEIGHT = 2  # per current favourite
+CART_WEIGHT = 1  # per unit added to a cart
+TRENDING_HALF_LIFE = timedelta(days=3)
+
+# Forward-decayed scores grow by 2x per half-life since the epoch; move the epoch
+# forward long before they get anywhere near float overflow.
+MAX_HALF_LIVES = 500
+
+EPOCH = 'epoch'
+ORDERS = 'orderitem'
+COUNTERS_MARK = 'counters'
+
+# Favourites and cart adds are scored from counters on Product rather than from their
+# rows: a favourite removed and added again is a new Favourite row, and a repeat add
+# grows an existing CartItem, so reading rows past a watermark would count the same
+# favourite again (never subtracting the removal) and miss repeat adds. Each run scores
+# the change in each counter since the previous run. Product counter -> (column on
+# ProductPopularity holding the value last scored, weight).
+#
+# A counter does not say when the favourite it loses was added, so a removal is
+# subtracted from trending_score at the current weight, larger than the one it was
+# added with. The counters' share of trending_score (counter_trending) is clamped at
+# zero so that products whose favourites come and go are not pushed below products
+# that never had any; it can still undercount a product that keeps older favourites
+# while losing newer ones.
+COUNTERS = {
+    'favourite_count': ('favourites_counted', FAVOURITE_WEIGHT),
+    'cart_adds': ('cart_adds_counted', CART_WEIGHT),
+}
+
+
+def _order_events(after, cutoff):
+    return (
+        OrderItem.objects
+        .filter(id__gt=after, order__created_at__lt=cutoff)
+        .order_by('id')
+        .values_list('id', 'product_id', 'quantity', 'order__created_at')
+    )
+
+
+def _counter_changes(since):
+    """``(product_id, *current counters, *counters last scored)`` for each product whose
+    counters moved since the last run. Only products stamped with ``counters_changed_at``
+    from ``since`` on are read; counters only ever hold committed values, so an
+    increment still in flight is picked up by a later run."""
+    scored = {column: Coalesce(f'popularity__{column}', 0) for column, _ in COUNTERS.values()}
+    moved = reduce(or_, [~Q(**{counter: F(column)}) for counter, (column, _) in COUNTERS.items()])
+    return (
+        Product.objects.filter(counters_changed_at__gte=since)
+        .annotate(**scored).filter(moved)
+        .values_list('id', *COUNTERS, *scored)
+    )
+
+
+def _half_lives(when, epoch):
+    return (when - epoch) / TRENDING_HALF_LIFE
+
+
+def update_scores(lag=timedelta(minutes=1), batch_size=5000, now=None):
+    """Fold new order lines and counter changes into ProductPopularity and copy the
+    scores onto Product.
+
+    Only order lines older than ``lag`` are read, so rows from transactions that were
+    still open at the previous run are not skipped past; for the same reason counter
+    changes are looked for from ``lag`` before the previous run. Returns the number of
+    products whose scores changed.
+    """
+    now = now or timezone.now()
+    cutoff = now - lag
+    for source in [EPOCH, ORDERS, COUNTERS_MARK]:
+        PopularityWatermark.objects.get_or_create(source=source, defaults={'value': int(now.timestamp()) if source == EPOCH else 0})
+
+    with transaction.atomic():
+        marks = {mark.source: mark for mark in PopularityWatermark.objects.select_for_update()}
+        epoch = datetime.fromtimestamp(marks[EPOCH].value, tz=dt_timezone.utc)
+        if _half_lives(now, epoch) > MAX_HALF_LIVES:
+            rescale = 2 ** -_half_lives(now, epoch)
+            ProductPopularity.objects.update(
+                trending_score=F('trending_score') * rescale, counter_trending=F('counter_trending') * rescale,
+            )
+            Product.objects.update(trending_score=F('trending_score') * rescale)
+            epoch = now.replace(microsecond=0)
+            marks[EPOCH].value = int(epoch.timestamp())
+
+        popular = defaultdict(float)
+        trending = defaultdict(float)
+        for row_id, product_id, quantity, when in _order_events(marks[ORDERS].value, cutoff).iterator(chunk_size=batch_size):
+            popular[product_id] += ORDER_WEIGHT * quantity
+            trending[product_id] += ORDER_WEIGHT * quantity * 2 ** _half_lives(when, epoch)
+            marks[ORDERS].value = max(marks[ORDERS].value, row_id)
+
+        counters = {}
+        counter_trending = {}
+        decay = 2 ** _half_lives(now, epoch)
+        since = datetime.fromtimestamp(marks[COUNTERS_MARK].value, tz=dt_timezone.utc) - lag
+        for product_id, *values in _counter_changes(since).iterator(chunk_size=batch_size):
+            current, scored = values[:len(COUNTERS)], values[len(COUNTERS):]
+            change = sum(weight * (value - last) for value, last, (_, weight) in zip(current, scored, COUNTERS.values()))
+            popular[product_id] += change
+            counter_trending[product_id] = change * decay
+            counters[product_id] = current
+        marks[COUNTERS_MARK].value = int(now.timestamp())
+
+        product_ids = list(popular)
+        ProductPopularity.objects.bulk_create(
+            [ProductPopularity(product_id=product_id) for product_id in product_ids],
+            ignore_conflicts=True,
+            batch_size=batch_size,
+        )
+        columns = [column for column, _ in COUNTERS.values()]
+        for start in range(0, len(product_ids), batch_size):
+            chunk = ProductPopularity.objects.select_for_update().filter(product_id__in=product_ids[start:start + batch_size])
+            rows = []
+            for row in chunk:
+                share = max(row.counter_trending + counter_trending.get(row.product_id, 0), 0)
+                row.popular_score += popular[row.product_id]
+                row.trending_score += trending[row.product_id] + share - row.counter_trending
+                row.counter_trending = share
+                row.updated_at = now
+                for column, value in zip(columns, counters.get(row.product_id, ())):
+                    setattr(row, column, value)
+                rows.append(row)
+            ProductPopularity.objects.bulk_update(
+                rows, ['popular_score', 'trending_score', 'counter_trending', 'updated_at', *columns],
+            )
+            Product.objects.bulk_update(
+                [Product(id=row.product_id, popular_score=row.popular_score, trending_score=row.trending_score) for row in rows],
+                ['popular_score', 'trending_score'],
+            )
+
+        for mark in marks.values():
+            mark.save(update_fields=['value', 'updated_at'])
+    return len(product_ids)
@@ -9,7 +9,7 @@ class ProductAdmin(admin.ModelAdmin):
     search_fields = ('name', 'description', 'category')
     list_editable = ('stock', 'price', 'category')
     list_per_page = 20
-    readonly_fields = ('created_at', 'image_preview')
+    readonly_fields = ('created_at', 'image_preview', 'reserved', 'favourite_count', 'units_sold', 'cart_adds', 'counters_changed_at', 'popular_score', 'trending_score')
     actions = ['set_stock_to_10', 'set_stock_to_50', 'clear_stock']
 
     fieldsets = (
@@ -17,7 +17,10 @@ class ProductAdmin(admin.ModelAdmin):
             'fields': ('name', 'description', 'image', 'image_preview', 'category')
         }),
         ('Pricing & Stock', {
-            'fields': ('price', 'stock')
+            'fields': ('price', 'stock', 'reserved')
+        }),
+        ('Counters', {
+            'fields': ('favourite_count', 'units_sold', 'cart_adds', 'counters_changed_at', 'popular_score', 'trending_score'),
         }),
         ('Timestamps', {
             'fields': ('created_at',),
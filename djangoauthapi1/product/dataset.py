@@ -0,0 +1,258 @@
+"""Deterministic synthetic data for scale testing; see ``manage.py generate_dataset``.
+
+Everything is derived from the seed and the row's position, never from the order in
+which chunks run, so the same arguments produce the same rows whether they are
+generated by one process or many. Popularity follows a Zipf distribution: the product
+of rank ``r`` is picked with weight ``1 / r ** s``, and customers' order counts are
+skewed the same way.
+"""
+import io
+import random
+import zlib
+from bisect import bisect
+from collections import defaultdict
+from contextlib import contextmanager
+from datetime import timedelta
+from decimal import Decimal
+from itertools import accumulate
+
+from django.core.files.base import ContentFile
+from django.db import transaction
+from PIL import Image, ImageDraw
+
+from account.models import User
+from cart.models import CartItem
+from cart.utils import count_cart_adds
+from favourite.models import Favourite
+from order.models import Order, OrderItem
+from .models import Product
+
+PASSWORD = 'dataset-password'
+ADJECTIVES = ['black', 'white', 'tan', 'brown', 'navy', 'classic', 'suede', 'leather', 'canvas', 'textured',
+              'high top', 'low top', 'slip on', 'chunky', 'vintage', 'premium', 'everyday', 'limited']
+NOUNS = ['sneakers', 'loafers', 'boots', 'brogues', 'clogs', 'ballet flats', 'boat shoes', 'trainers',
+         'runners', 'mules', 'oxfords', 'derbies']
+FIRST_NAMES = ['Ayesha', 'Bilal', 'Chen', 'Daniel', 'Elif', 'Fatima', 'Grace', 'Hamza', 'Ines', 'Jonas', 'Kiran', 'Lina']
+CITIES = [('Lahore', '54000'), ('Karachi', '74000'), ('Islamabad', '44000'), ('Faisalabad', '38000'), ('Multan', '60000')]
+COLORS = ['black', 'white', 'brown', 'navy', 'red']
+SIZES = ['38', '39', '40', '41', '42', '43', '44', '45']
+IMAGE_DIR = 'product_images/placeholders'
+IMAGE_SIZE = (96, 96)
+# Rows per chunk. Each chunk has its own random stream, so changing this changes the data.
+CHUNK_SIZE = 2000
+
+_MASK = (1 << 64) - 1
+
+
+def _mix(*values):
+    """splitmix64 over ``values``: a cheap, stable per-row hash (unlike ``hash()``)."""
+    state = 0x9E3779B97F4A7C15
+    for value in values:
+        state = (state ^ value) & _MASK
+        state = (state + 0x9E3779B97F4A7C15) & _MASK
+        state = ((state ^ (state >> 30)) * 0xBF58476D1CE4E5B9) & _MASK
+        state = ((state ^ (state >> 27)) * 0x94D049BB133111EB) & _MASK
+        state ^= state >> 31
+    return state
+
+
+def _rng(plan, kind, start):
+    return random.Random(_mix(plan.seed, zlib.crc32(kind.encode()), start))
+
+
+def price(plan, index):
+    """Price of the ``index``-th generated product; order lines reuse it without a lookup."""
+    return Decimal(2000 + _mix(plan.seed, index) % 28000) / 100
+
+
+class ZipfSampler:
+    """Draws from ``range(n)`` with the item at popularity rank ``r`` weighted
+    ``1 / r ** exponent``. Ranks are shuffled over the items by the seed, so the
+    best sellers are not simply the lowest ids."""
+
+    def __init__(self, n, exponent, seed):
+        self.items = list(range(n))
+        random.Random(seed).shuffle(self.items)
+        self.cumulative = list(accumulate(1 / rank ** exponent for rank in range(1, n + 1)))
+        self.total = self.cumulative[-1] if n else 0
+
+    def sample(self, rng):
+        return self.items[min(bisect(self.cumulative, rng.random() * self.total), len(self.items) - 1)]
+
+    def distinct(self, rng, k):
+        k = min(k, len(self.items))
+        picked = set()
+        while len(picked) < k:
+            picked.add(self.sample(rng))
+        return picked
+
+
+class Plan:
+    """What to generate. Ids continue after the highest existing ones, so a dataset
+    can be added to a database that already has rows."""
+
+    def __init__(self, products, users, orders, seed=42, zipf=1.1, days=365, images=20, password=None, now=None):
+        self.products = products
+        self.users = users
+        self.orders = orders
+        self.seed = seed
+        self.zipf = zipf
+        self.days = days
+        self.images = images
+        self.password = password
+        self.now = now
+        self.product_base = (Product.objects.order_by('-id').values_list('id', flat=True).first() or 0) + 1
+        self.user_base = (User.objects.order_by('-id').values_list('id', flat=True).first() or 0) + 1
+        self.order_base = (Order.objects.order_by('-id').values_list('id', flat=True).first() or 0) + 1
+
+    def __getstate__(self):
+        return {key: value for key, value in self.__dict__.items() if not key.startswith('_')}
+
+    @property
+    def product_sampler(self):
+        if '_product_sampler' not in self.__dict__:
+            self._product_sampler = ZipfSampler(self.products, self.zipf, _mix(self.seed, 1))
+        return self._product_sampler
+
+    @property
+    def user_sampler(self):
+        if '_user_sampler' not in self.__dict__:
+            self._user_sampler = ZipfSampler(self.users, self.zipf, _mix(self.seed, 2))
+        return self._user_sampler
+
+
+def placeholder_images(plan):
+    """Write ``plan.images`` small JPEGs per category through the product image storage
+    and return their names by category. The images depend only on the seed, so the
+    storage's content-hashed names make reruns reuse the existing files."""
+    storage = Product._meta.get_field('image').storage
+    names = {}
+    for c, (category, label) in enumerate(Product.CATEGORY_CHOICES):
+        names[category] = []
+        for i in range(plan.images):
+            colour = tuple(_mix(plan.seed, c, i, channel) % 200 + 40 for channel in range(3))
+            image = Image.new('RGB', IMAGE_SIZE, colour)
+            ImageDraw.Draw(image).text((8, IMAGE_SIZE[1] // 2 - 6), label, fill=(255, 255, 255))
+            buffer = io.BytesIO()
+            image.save(buffer, 'JPEG', quality=70)
+            names[category].append(storage.save(f'{IMAGE_DIR}/{category.lower()}-{i}.jpg', ContentFile(buffer.getvalue())))
+    return names
+
+
+@contextmanager
+def explicit_timestamps():
+    """Let bulk inserts keep the historic timestamps we generate instead of having
+    ``auto_now``/``auto_now_add`` overwrite them with the current time."""
+    fields = [
+        Order._meta.get_field('created_at'), Order._meta.get_field('updated_at'),
+        CartItem._meta.get_field('added_at'), User._meta.get_field('created_at'),
+        User._meta.get_field('updated_at'), Product._meta.get_field('created_at'),
+    ]
+    saved = [(field.auto_now, field.auto_now_add) for field in fields]
+    for field in fields:
+        field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, (auto_now, auto_now_add) in zip(fields, saved):
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+def _moment(plan, rng):
+    return plan.now - timedelta(seconds=rng.randrange(plan.days * 86400))
+
+
+def products(plan, start, count, images):
+    rng = _rng(plan, 'products', start)
+    categories = [value for value, _ in Product.CATEGORY_CHOICES]
+    rows = []
+    for index in range(start, start + count):
+        category = categories[_mix(plan.seed, index, 3) % len(categories)]
+        rows.append(Product(
+            id=plan.product_base + index,
+            name=f"{rng.choice(ADJECTIVES)} {rng.choice(ADJECTIVES)} {rng.choice(NOUNS)} {index}",
+            description=f"Synthetic product {index}.",
+            price=price(plan, index),
+            stock=rng.randint(0, 500),
+            category=category,
+            image=rng.choice(images[category]) if images else None,
+            created_at=_moment(plan, rng),
+        ))
+    return Product.objects.bulk_create(rows, batch_size=1000)
+
+
+def users(plan, start, count):
+    rng = _rng(plan, 'users', start)
+    rows = []
+    for index in range(start, start + count):
+        user_id = plan.user_base + index
+        joined = _moment(plan, rng)
+        rows.append(User(
+            id=user_id, email=f'user{user_id}@dataset.example', name=f'{rng.choice(FIRST_NAMES)} {index}',
+            tc=True, password=plan.password, created_at=joined, updated_at=joined,
+        ))
+    return User.objects.bulk_create(rows, batch_size=1000)
+
+
+def favourites_and_carts(plan, start, count):
+    """Favourites (heavy-tailed per user, Zipf over products) and open carts for a
+    slice of the users."""
+    rng = _rng(plan, 'favourites', start)
+    favourites, lines = [], []
+    for index in range(start, start + count):
+        user_id = plan.user_base + index
+        for product in plan.product_sampler.distinct(rng, min(int(rng.paretovariate(1.2)) - 1, 200)):
+            favourites.append(Favourite(user_id=user_id, product_id=plan.product_base + product))
+        if rng.random() < 0.3:
+            for product in plan.product_sampler.distinct(rng, rng.randint(1, 4)):
+                lines.append(CartItem(
+                    user_id=user_id, product_id=plan.product_base + product, quantity=rng.randint(1, 3),
+                    color=rng.choice(COLORS), size=rng.choice(SIZES), added_at=plan.now - timedelta(minutes=rng.randrange(60 * 24 * 14)),
+                ))
+    Favourite.objects.bulk_create(favourites, batch_size=2000)
+    CartItem.objects.bulk_create(lines, batch_size=2000)
+    added = defaultdict(int)
+    for line in lines:
+        added[line.product_id] += line.quantity
+    count_cart_adds(added)
+    return len(favourites) + len(lines)
+
+
+def orders(plan, start, count):
+    rng = _rng(plan, 'orders', start)
+    rows, items = [], []
+    for index in range(start, start + count):
+        order_id = plan.order_base + index
+        city, postal_code = rng.choice(CITIES)
+        placed = _moment(plan, rng)
+        rows.append(Order(
+            id=order_id, user_id=plan.user_base + plan.user_sampler.sample(rng),
+            shipping_address=f'{rng.randint(1, 999)} Main Road', city=city, postal_code=postal_code, country='PK',
+            created_at=placed, updated_at=placed,
+        ))
+        for product in plan.product_sampler.distinct(rng, rng.choice((1, 1, 1, 2, 2, 3, 4, 5))):
+            items.append(OrderItem(
+                order_id=order_id, product_id=plan.product_base + product, quantity=rng.choice((1, 1, 1, 2, 3)),
+                color=rng.choice(COLORS), size=rng.choice(SIZES), price=price(plan, product),
+            ))
+    Order.objects.bulk_create(rows, batch_size=1000)
+    OrderItem.objects.bulk_create(items, batch_size=2000)
+    return len(rows) + len(items)
+
+
+def run_chunk(plan, kind, start, count, images=None):
+    """Generate one chunk in its own transaction; returns the rows written."""
+    with explicit_timestamps(), transaction.atomic():
+        if kind == 'products':
+            return len(products(plan, start, count, images))
+        if kind == 'users':
+            return len(users(plan, start, count))
+        if kind == 'favourites':
+            return favourites_and_carts(plan, start, count)
+        if kind == 'orders':
+            return orders(plan, start, count)
+    raise ValueError(f"Unknown chunk kind {kind!r}")
+
+
+def chunks(kind, total):
+    return [(kind, start, min(CHUNK_SIZE, total - start)) for start in range(0, total, CHUNK_SIZE)]
@@ -0,0 +1,64 @@
+import random
+import statistics
+import time
+import tracemalloc
+
+from django.core.management.base import BaseCommand
+
+from product.models import Product
+from product.suggest import SuggestIndex
+
+ADJECTIVES = ['black', 'white', 'tan', 'brown', 'navy', 'classic', 'suede', 'leather', 'canvas', 'textured',
+              'high top', 'low top', 'slip on', 'chunky', 'vintage', 'premium', 'everyday', 'limited']
+NOUNS = ['sneakers', 'loafers', 'boots', 'brogues', 'clogs', 'ballet flats', 'boat shoes', 'trainers',
+         'runners', 'mules', 'oxfords', 'derbies']
+
+
+class Command(BaseCommand):
+    help = "Measure build time, memory and lookup latency of the suggest index on synthetic products."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--products', type=int, default=100_000)
+        parser.add_argument('--lookups', type=int, default=20_000)
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        categories = [value for value, _ in Product.CATEGORY_CHOICES]
+        rows = [
+            (
+                product_id,
+                f"{rng.choice(ADJECTIVES)} {rng.choice(ADJECTIVES)} {rng.choice(NOUNS)} {rng.randint(1, 999)}",
+                rng.choice(categories),
+                int(rng.paretovariate(1.2)),
+            )
+            for product_id in range(1, options['products'] + 1)
+        ]
+
+        index = SuggestIndex()
+        tracemalloc.start()
+        started = time.perf_counter()
+        index.build(rows)
+        build_seconds = time.perf_counter() - started
+        memory, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        words = ADJECTIVES + NOUNS
+        prefixes = []
+        for _ in range(options['lookups']):
+            word = rng.choice(words)
+            prefixes.append(word[:rng.randint(1, len(word))])
+
+        timings = []
+        for prefix in prefixes:
+            started = time.perf_counter()
+            index.lookup(prefix)
+            timings.append((time.perf_counter() - started) * 1_000_000)
+        timings.sort()
+
+        self.stdout.write(f"products:       {len(index)}")
+        self.stdout.write(f"build:          {build_seconds:.2f} s")
+        self.stdout.write(f"index memory:   {memory / 1024 / 1024:.1f} MiB")
+        self.stdout.write(f"lookup p50:     {statistics.median(timings):.1f} us")
+        self.stdout.write(f"lookup p99:     {timings[int(len(timings) * 0.99)]:.1f} us")
+        self.stdout.write(f"lookup max:     {timings[-1]:.1f} us")
@@ -0,0 +1,92 @@
+import multiprocessing
+import time
+from datetime import datetime, time as dt_time, timezone as dt_timezone
+
+from django.contrib.auth.hashers import make_password
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections
+
+from product import dataset
+
+_plan = _images = None
+
+
+def _init_worker(plan, images):
+    global _plan, _images
+    # Forked children must not share the parent's database connection.
+    connections.close_all()
+    _plan, _images = plan, images
+
+
+def _run(task):
+    kind, start, count = task
+    return kind, dataset.run_chunk(_plan, kind, start, count, _images)
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate a deterministic synthetic catalog with users, favourites, carts and orders, "
+        "with Zipf-skewed popularity, using bulk inserts across several processes."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--products', type=int, default=100_000)
+        parser.add_argument('--users', type=int, default=50_000)
+        parser.add_argument('--orders', type=int, default=200_000)
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--zipf', type=float, default=1.1, help="Popularity skew exponent; higher concentrates demand on fewer products.")
+        parser.add_argument('--days', type=int, default=365, help="Spread order and signup dates over this many days.")
+        parser.add_argument('--as-of', help="YYYY-MM-DD the generated history ends at (default: today). Fix it to reproduce timestamps too.")
+        parser.add_argument('--images', type=int, default=20, help="Placeholder images per category; 0 leaves products without images.")
+        parser.add_argument('--workers', type=int, default=multiprocessing.cpu_count())
+
+    def handle(self, *args, **options):
+        if min(options['products'], options['users']) < 1:
+            raise CommandError("--products and --users must be at least 1.")
+        day = datetime.strptime(options['as_of'], '%Y-%m-%d').date() if options['as_of'] else datetime.now(dt_timezone.utc).date()
+        plan = dataset.Plan(
+            options['products'], options['users'], options['orders'], seed=options['seed'], zipf=options['zipf'],
+            days=options['days'], images=options['images'], password=make_password(dataset.PASSWORD),
+            now=datetime.combine(day, dt_time.min, tzinfo=dt_timezone.utc),
+        )
+        workers = options['workers']
+        if connection.vendor == 'sqlite' and workers > 1:
+            # SQLite has a single writer; extra processes would only wait on its lock.
+            self.stdout.write("SQLite: generating in a single process.")
+            workers = 1
+
+        images = dataset.placeholder_images(plan) if plan.images else None
+        started = time.perf_counter()
+        # Products and users first: everything after references them by id.
+        stages = [
+            dataset.chunks('products', plan.products) + dataset.chunks('users', plan.users),
+            dataset.chunks('favourites', plan.users) + dataset.chunks('orders', plan.orders),
+        ]
+        if workers > 1:
+            connections.close_all()
+            context = multiprocessing.get_context('fork')
+            with context.Pool(workers, initializer=_init_worker, initargs=(plan, images)) as pool:
+                for tasks in stages:
+                    self.report(pool.imap_unordered(_run, tasks), len(tasks), started)
+        else:
+            global _plan, _images
+            _plan, _images = plan, images
+            for tasks in stages:
+                self.report(map(_run, tasks), len(tasks), started)
+
+        self.stdout.write("Reconciling product counters...")
+        call_command('reconcile_product_counters', stdout=self.stdout)
+        self.stdout.write(self.style.SUCCESS(
+            f"Generated {plan.products} products, {plan.users} users and {plan.orders} orders in "
+            f"{time.perf_counter() - started:.1f}s. Users sign in as user<id>@dataset.example / {dataset.PASSWORD}. "
+            "Run rebuild_recommendations, update_popularity and rollup_sales to build the derived tables."
+        ))
+
+    def report(self, results, total, started):
+        rows = {}
+        for done, (kind, written) in enumerate(results, 1):
+            rows[kind] = rows.get(kind, 0) + written
+            if done == total or done % 20 == 0:
+                summary = ', '.join(f"{kind} {count}" for kind, count in rows.items())
+                self.stdout.write(f"  [{time.perf_counter() - started:6.1f}s] {done}/{total} chunks: {summary} rows")
@@ -0,0 +1,41 @@
+from django.core.management.base import BaseCommand
+
+from djangoauthapi1.media import HASHED_NAME
+from product.models import Product
+
+
+class Command(BaseCommand):
+    help = (
+        "Re-store product images uploaded before content-hashed names under hashed names, "
+        "so they are served as immutable. The old files are kept for clients that still hold their URLs."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument('--dry-run', action='store_true', help="Report the images that would be renamed.")
+
+    def handle(self, *args, **options):
+        field = Product._meta.get_field('image')
+        storage = field.storage
+        last_id = renamed = missing = 0
+        while True:
+            batch = list(
+                Product.objects.filter(id__gt=last_id).exclude(image='').exclude(image__isnull=True)
+                .order_by('id').values_list('id', 'image')[:options['batch_size']]
+            )
+            if not batch:
+                break
+            for product_id, name in batch:
+                if HASHED_NAME.search(name):
+                    continue
+                if not storage.exists(name):
+                    missing += 1
+                    continue
+                if not options['dry_run']:
+                    with storage.open(name) as content:
+                        hashed = storage.save(name, content, max_length=field.max_length)
+                    Product.objects.filter(id=product_id, image=name).update(image=hashed)
+                renamed += 1
+            last_id = batch[-1][0]
+        verb = "Would rename" if options['dry_run'] else "Renamed"
+        self.stdout.write(self.style.SUCCESS(f"{verb} {renamed} image(s). {missing} missing from storage."))
@@ -0,0 +1,57 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Count, F, IntegerField, OuterRef, Q, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from favourite.models import Favourite
+from order.models import OrderItem
+from product.models import Product
+
+
+def true_counts():
+    """Correlated subqueries computing each product's counters from the source tables."""
+    favourites = (
+        Favourite.objects.filter(product=OuterRef('pk')).order_by().values('product')
+        .annotate(total=Count('*')).values('total')
+    )
+    sold = (
+        OrderItem.objects.filter(product=OuterRef('pk')).order_by().values('product')
+        .annotate(total=Sum('quantity')).values('total')
+    )
+    return {
+        'favourite_count': Coalesce(Subquery(favourites, output_field=IntegerField()), Value(0)),
+        'units_sold': Coalesce(Subquery(sold, output_field=IntegerField()), Value(0)),
+    }
+
+
+class Command(BaseCommand):
+    help = "Recompute Product.favourite_count and units_sold from Favourite/OrderItem and fix any drift, in batches."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--dry-run', action='store_true', help="Report drifted products without fixing them.")
+
+    def handle(self, *args, **options):
+        counts = true_counts()
+        last_id = checked = fixed = 0
+        while True:
+            batch = list(
+                Product.objects.filter(id__gt=last_id).order_by('id')
+                .values_list('id', flat=True)[:options['batch_size']]
+            )
+            if not batch:
+                break
+            drifted = list(
+                Product.objects.filter(id__in=batch)
+                .annotate(true_favourites=counts['favourite_count'], true_sold=counts['units_sold'])
+                .filter(~Q(favourite_count=F('true_favourites')) | ~Q(units_sold=F('true_sold')))
+                .values_list('id', flat=True)
+            )
+            if drifted and not options['dry_run']:
+                # Recomputed inside the UPDATE itself so concurrent increments are not lost
+                Product.objects.filter(id__in=drifted).update(**counts, counters_changed_at=timezone.now())
+            checked += len(batch)
+            fixed += len(drifted)
+            last_id = batch[-1]
+        verb = "Found" if options['dry_run'] else "Fixed"
+        self.stdout.write(self.style.SUCCESS(f"Checked {checked} product(s). {verb} drift on {fixed}."))
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.20 on 2026-10-19 06:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('product', '0004_product_category'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='product',
+            name='category',
+            field=models.CharField(blank=True, choices=[('balletflat', 'balletflat'), ('BOAT', 'Boat'), ('BROGUE', 'Brogue'), ('CLOG', 'Clog'), ('SNEAKER', 'Sneaker')], max_length=50, null=True),
+        ),
+    ]
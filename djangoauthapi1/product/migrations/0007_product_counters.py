@@ -0,0 +1,31 @@
+# Generated by Django 4.2.20 on 2026-10-19 06:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('product', '0006_product_reserved'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='favourite_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='units_sold',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['-favourite_count'], name='product_favourite_count_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['-units_sold'], name='product_units_sold_idx'),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 4.2.20 on 2026-10-19 06:43
+
+from django.db import migrations, models
+import djangoauthapi1.media
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('product', '0007_product_counters'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='product',
+            name='image',
+            field=models.ImageField(blank=True, null=True, storage=djangoauthapi1.media.HashedMediaStorage(), upload_to='product_images/'),
+        ),
+    ]
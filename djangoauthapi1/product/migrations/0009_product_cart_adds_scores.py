@@ -0,0 +1,36 @@
+# Generated by Django 4.2.20 on 2026-10-19 06:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('product', '0008_product_image_storage'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='cart_adds',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='popular_score',
+            field=models.FloatField(default=0),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='trending_score',
+            field=models.FloatField(default=0),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['-popular_score', 'id'], name='product_popular_score_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['-trending_score', 'id'], name='product_trending_score_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.20 on 2026-10-19 07:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('product', '0009_product_cart_adds_scores'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='counters_changed_at',
+            field=models.DateTimeField(blank=True, db_index=True, null=True),
+        ),
+    ]
@@ -1,5 +1,7 @@
 from django.db import models
 
+from djangoauthapi1.media import product_image_storage
+
 class Product(models.Model):
     # Category choices
     CATEGORY_CHOICES = [
@@ -15,9 +17,51 @@ class Product(models.Model):
     description = models.TextField(blank=True)
     price = models.DecimalField(max_digits=10, decimal_places=2)
     stock = models.IntegerField(null=True, blank=True)
-    image = models.ImageField(upload_to='product_images/', null=True, blank=True)
+    # Units held by unexpired checkout reservations (see reservation.utils).
+    reserved = models.PositiveIntegerField(default=0)
+    # Maintained with F() updates by favourite toggles and order placement; see the
+    # reconcile_product_counters command for repairing drift.
+    favourite_count = models.PositiveIntegerField(default=0)
+    units_sold = models.PositiveIntegerField(default=0)
+    # Units ever added to carts (repeat adds included), maintained the same way; read
+    # by popularity.utils.update_scores.
+    cart_adds = models.PositiveIntegerField(default=0)
+    # Set with every favourite_count/cart_adds update, so update_scores only reads the
+    # products whose counters moved since its last run.
+    counters_changed_at = models.DateTimeField(null=True, blank=True, db_index=True)
+    # Copied from popularity.ProductPopularity by update_scores, so the catalogue can be
+    # sorted by them straight from an index on this table.
+    popular_score = models.FloatField(default=0)
+    trending_score = models.FloatField(default=0)
+    # Stored under content-hashed names so their URLs can be cached as immutable.
+    image = models.ImageField(upload_to='product_images/', storage=product_image_storage, null=True, blank=True)
     category = models.CharField(max_length=50, choices=CATEGORY_CHOICES, null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['-favourite_count'], name='product_favourite_count_idx'),
+            models.Index(fields=['-units_sold'], name='product_units_sold_idx'),
+            models.Index(fields=['-popular_score', 'id'], name='product_popular_score_idx'),
+            models.Index(fields=['-trending_score', 'id'], name='product_trending_score_idx'),
+        ]
+
+    # Columns only ever changed by F() updates or the popularity job. save() on an
+    # instance loaded earlier (API edits, the admin) leaves them out, so it cannot
+    # overwrite a concurrent update with the stale value it read; name them in
+    # update_fields to write them anyway.
+    MAINTAINED_FIELDS = frozenset({
+        'reserved', 'favourite_count', 'units_sold', 'cart_adds', 'counters_changed_at',
+        'popular_score', 'trending_score',
+    })
+
+    def save(self, force_insert=False, force_update=False, using=None, update_fields=None):
+        if update_fields is None and not force_insert and not self._state.adding:
+            update_fields = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in self.MAINTAINED_FIELDS
+            ]
+        super().save(force_insert=force_insert, force_update=force_update, using=using, update_fields=update_fields)
+
     def __str__(self):
         return self.name
\ No newline at end of file
@@ -1,16 +1,23 @@
 from rest_framework import serializers
 from product.models import Product
-from favourite.models import Favourite
+from favourite.utils import favourite_ids
+from djangoauthapi1.middleware import TimedSerializerMixin
 
-class ProductSerializer(serializers.ModelSerializer):
+class ProductSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     is_favourite = serializers.SerializerMethodField()
 
     class Meta:
         model = Product
-        fields = ['id', 'name', 'price', 'description', 'is_favourite', 'image', 'stock', 'category']
+        fields = ['id', 'name', 'price', 'description', 'is_favourite', 'image', 'stock', 'category', 'favourite_count', 'units_sold']
+        read_only_fields = ['favourite_count', 'units_sold']
 
     def get_is_favourite(self, obj):
-        user = self.context['request'].user
-        if user.is_authenticated:
-            return Favourite.objects.filter(user=user, product=obj).exists()
-        return False
\ No newline at end of file
+        # The user's cached favourite set, loaded once per serialization and shared by
+        # every product in a list; views may also pass 'favourite_ids' up front.
+        ids = self.context.get('favourite_ids')
+        if ids is None:
+            request = self.context.get('request')
+            user = request.user if request else None
+            ids = favourite_ids(user.id) if user and user.is_authenticated else frozenset()
+            self.context['favourite_ids'] = ids
+        return obj.id in ids
\ No newline at end of file
@@ -0,0 +1,17 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import Product
+from .suggest import suggest_index
+
+
+@receiver(post_save, sender=Product)
+def update_suggest_index(sender, instance, **kwargs):
+    if suggest_index.is_built:
+        suggest_index.upsert(instance.id, instance.name, instance.category)
+
+
+@receiver(post_delete, sender=Product)
+def remove_from_suggest_index(sender, instance, **kwargs):
+    if suggest_index.is_built:
+        suggest_index.remove(instance.id)
@@ -0,0 +1,223 @@
+"""In-memory prefix index behind ``/api/products/suggest/``.
+
+Every word position of a product name is stored as a key in one sorted list
+(``"black leather sneaker"`` -> ``"black leather sneaker"``, ``"leather
+sneaker"``, ``"sneaker"``), with the product id in a parallel list. A prefix
+lookup is two ``bisect`` calls plus a top-N pick by popularity, so the search
+bar never touches MySQL while the user types.
+"""
+import bisect
+import heapq
+import logging
+import threading
+import time
+
+from django.apps import apps
+from django.conf import settings
+from django.db.models import Count, Sum
+
+logger = logging.getLogger(__name__)
+
+# Keys are truncated to this many characters to keep the index compact;
+# longer prefixes are checked against the full name after the range scan.
+KEY_LENGTH = 24
+
+# Upper bound on suggestions per lookup.
+MAX_SUGGESTIONS = 20
+
+# Ranges wider than this are ranked once and kept until the index changes.
+CACHE_RANGE_THRESHOLD = 256
+MAX_CACHED_PREFIXES = 4096
+
+
+def normalize(text):
+    return ' '.join((text or '').lower().split())
+
+
+def keys_for(name):
+    words = normalize(name).split(' ')
+    return tuple(sorted({' '.join(words[i:])[:KEY_LENGTH] for i in range(len(words)) if words[i]}))
+
+
+class SuggestIndex:
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._keys = []
+        self._ids = []
+        self._products = {}      # product id -> (name, category, popularity)
+        self._categories = {}    # category value -> (label, popularity)
+        self._cache = {}
+        self._rebuilding = False
+        self.built_at = None
+
+    @property
+    def is_built(self):
+        return self.built_at is not None
+
+    def __len__(self):
+        return len(self._products)
+
+    def build(self, rows):
+        """Replace the index with ``rows`` of ``(id, name, category, popularity)``."""
+        entries = []
+        products = {}
+        for product_id, name, category, popularity in rows:
+            products[product_id] = (name, category, popularity)
+            entries.extend((key, product_id) for key in keys_for(name))
+        entries.sort()
+
+        labels = dict(apps.get_model('product', 'Product').CATEGORY_CHOICES)
+        categories = {value: (label, 0) for value, label in labels.items()}
+        for name, category, popularity in products.values():
+            if category in categories:
+                label, total = categories[category]
+                categories[category] = (label, total + popularity)
+
+        with self._lock:
+            self._keys = [key for key, _ in entries]
+            self._ids = [product_id for _, product_id in entries]
+            self._products = products
+            self._categories = categories
+            self._cache = {}
+            self.built_at = time.monotonic()
+
+    def upsert(self, product_id, name, category, popularity=None):
+        with self._lock:
+            if popularity is None:
+                popularity = self._products.get(product_id, (None, None, 0))[2]
+            self._remove_keys(product_id)
+            self._products[product_id] = (name, category, popularity)
+            for key in keys_for(name):
+                position = bisect.bisect_right(self._keys, key)
+                self._keys.insert(position, key)
+                self._ids.insert(position, product_id)
+            self._cache = {}
+
+    def remove(self, product_id):
+        with self._lock:
+            self._remove_keys(product_id)
+            self._products.pop(product_id, None)
+            self._cache = {}
+
+    def _remove_keys(self, product_id):
+        current = self._products.get(product_id)
+        if current is None:
+            return
+        for key in keys_for(current[0]):
+            position = bisect.bisect_left(self._keys, key)
+            while position < len(self._keys) and self._keys[position] == key:
+                if self._ids[position] == product_id:
+                    del self._keys[position]
+                    del self._ids[position]
+                    break
+                position += 1
+
+    def lookup(self, prefix, limit=10):
+        prefix = normalize(prefix)
+        if not prefix:
+            return [], []
+        with self._lock:
+            ranked = self._cache.get(prefix)
+            if ranked is None:
+                ranked = self._rank(prefix, limit)
+            products = [
+                {'id': product_id, 'name': self._products[product_id][0]}
+                for product_id in ranked[:limit]
+            ]
+            categories = sorted(
+                (
+                    (popularity, value, label)
+                    for value, (label, popularity) in self._categories.items()
+                    if label.lower().startswith(prefix) or value.lower().startswith(prefix)
+                ),
+                reverse=True,
+            )
+        return products, [{'value': value, 'label': label} for _, value, label in categories[:limit]]
+
+    def _rank(self, prefix, limit):
+        key = prefix[:KEY_LENGTH]
+        lo = bisect.bisect_left(self._keys, key)
+        hi = bisect.bisect_left(self._keys, key + '\uffff', lo)
+        candidates = set(self._ids[lo:hi])
+        if len(prefix) > KEY_LENGTH:
+            candidates = {
+                product_id for product_id in candidates
+                if any(
+                    ' '.join(words).startswith(prefix)
+                    for words in _suffixes(normalize(self._products[product_id][0]))
+                )
+            }
+        wide = hi - lo > CACHE_RANGE_THRESHOLD
+        ranked = heapq.nlargest(
+            MAX_SUGGESTIONS if wide else limit,
+            candidates,
+            key=lambda product_id: (self._products[product_id][2], -product_id),
+        )
+        if wide:
+            if len(self._cache) >= MAX_CACHED_PREFIXES:
+                self._cache.clear()
+            self._cache[prefix] = ranked
+        return ranked
+
+    def ensure_fresh(self):
+        """Build on first use; rebuild in the background once the index is stale.
+
+        Signals only reach the worker that saved the product, so other workers
+        pick up changes at most ``SUGGEST_INDEX_MAX_AGE`` seconds later.
+        """
+        if not self.is_built:
+            with self._lock:
+                if not self.is_built:
+                    self.build(load_rows())
+            return
+        max_age = getattr(settings, 'SUGGEST_INDEX_MAX_AGE', 300)
+        if time.monotonic() - self.built_at < max_age or self._rebuilding:
+            return
+        self._rebuilding = True
+        threading.Thread(target=self._rebuild, daemon=True).start()
+
+    def _rebuild(self):
+        from django.db import connection
+        try:
+            self.build(load_rows())
+        except Exception as e:
+            logger.error(f"Suggest index rebuild failed: {e}")
+        finally:
+            self._rebuilding = False
+            connection.close()
+
+
+def _suffixes(normalized):
+    words = normalized.split(' ')
+    return (words[i:] for i in range(len(words)))
+
+
+def product_popularity():
+    """Units ordered plus favourites, per product id."""
+    OrderItem = apps.get_model('order', 'OrderItem')
+    Favourite = apps.get_model('favourite', 'Favourite')
+    popularity = {}
+    for row in OrderItem.objects.values('product').annotate(total=Sum('quantity')):
+        popularity[row['product']] = row['total'] or 0
+    for row in Favourite.objects.values('product').annotate(total=Count('id')):
+        popularity[row['product']] = popularity.get(row['product'], 0) + row['total']
+    return popularity
+
+
+def load_rows():
+    Product = apps.get_model('product', 'Product')
+    popularity = product_popularity()
+    for product_id, name, category in Product.objects.values_list('id', 'name', 'category').iterator(chunk_size=2000):
+        yield product_id, name, category, popularity.get(product_id, 0)
+
+
+suggest_index = SuggestIndex()
+
+
+def warm_up():
+    """Build the index when a worker starts so the first keystroke is fast."""
+    try:
+        suggest_index.ensure_fresh()
+        logger.info(f"Suggest index built with {len(suggest_index)} products.")
+    except Exception as e:
+        logger.error(f"Suggest index warm-up failed, will build on first lookup: {e}")
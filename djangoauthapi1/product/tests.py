@@ -1,3 +1,147 @@
-from django.test import TestCase
+import os
+import random
+import tempfile
+from collections import Counter
+from io import StringIO
 
-# Create your tests here.
+from django.core.management import call_command
+from django.db.models import F, Sum
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from account.models import User
+from favourite.models import Favourite
+from order.models import Order, OrderItem
+
+from . import dataset
+from .models import Product
+from .suggest import SuggestIndex, suggest_index
+
+
+class SuggestIndexTests(TestCase):
+    def setUp(self):
+        self.index = SuggestIndex()
+        self.index.build([
+            (1, 'Black Leather Sneakers', 'SNEAKER', 5),
+            (2, 'Brown Suede Boots', 'BOAT', 9),
+            (3, 'Leather Loafers', 'BROGUE', 1),
+        ])
+
+    def test_matches_any_word_ranked_by_popularity(self):
+        products, _ = self.index.lookup('le')
+        self.assertEqual([p['id'] for p in products], [1, 3])
+        products, _ = self.index.lookup('b')
+        self.assertEqual([p['id'] for p in products], [2, 1])
+
+    def test_category_labels(self):
+        _, categories = self.index.lookup('sne')
+        self.assertEqual(categories, [{'value': 'SNEAKER', 'label': 'Sneaker'}])
+
+    def test_incremental_upsert_and_remove(self):
+        self.index.upsert(3, 'Canvas Loafers', 'BROGUE')
+        self.assertEqual([p['id'] for p in self.index.lookup('le')[0]], [1])
+        self.assertEqual([p['id'] for p in self.index.lookup('can')[0]], [3])
+        self.index.remove(1)
+        self.assertEqual(self.index.lookup('black')[0], [])
+
+
+class ProductSuggestViewTests(TestCase):
+    def tearDown(self):
+        suggest_index.built_at = None
+
+    def test_saved_products_are_suggested(self):
+        self.client.get(reverse('product-suggest'), {'prefix': 'x'})
+        Product.objects.create(name='Airmux Green Runner', price=10, stock=3)
+        response = self.client.get(reverse('product-suggest'), {'prefix': 'green'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([p['name'] for p in response.json()['products']], ['Airmux Green Runner'])
+
+
+class ProductCounterTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(email='a@example.com', name='A', tc=True, password='pw')
+        self.products = [Product.objects.create(name=f'Shoe {i}', price=10, stock=5) for i in range(3)]
+
+    def test_reconcile_fixes_drift_in_batches(self):
+        first, second, third = self.products
+        Favourite.objects.create(user=self.user, product=first)
+        order = Order.objects.create(user=self.user, shipping_address='x', city='x', postal_code='1', country='PK')
+        OrderItem.objects.create(order=order, product=second, quantity=3, price=10)
+        Product.objects.filter(id=third.id).update(favourite_count=7, units_sold=2)
+
+        out = StringIO()
+        call_command('reconcile_product_counters', '--dry-run', stdout=out)
+        self.assertIn('Found drift on 3', out.getvalue())
+        call_command('reconcile_product_counters', '--batch-size', '2', stdout=out)
+        self.assertEqual(
+            list(Product.objects.order_by('id').values_list('favourite_count', 'units_sold')),
+            [(1, 0), (0, 3), (0, 0)],
+        )
+        call_command('reconcile_product_counters', stdout=out)
+        self.assertIn('Fixed drift on 0', out.getvalue())
+
+    def test_saving_a_stale_instance_keeps_concurrent_counter_updates(self):
+        stale = Product.objects.get(id=self.products[0].id)
+        Product.objects.filter(id=stale.id).update(favourite_count=F('favourite_count') + 1, units_sold=F('units_sold') + 4)
+        stale.name = 'Renamed'
+        stale.save()
+        self.assertEqual(
+            Product.objects.filter(id=stale.id).values_list('name', 'favourite_count', 'units_sold').get(),
+            ('Renamed', 1, 4),
+        )
+
+    def test_listing_sorts_by_counters(self):
+        Product.objects.filter(id=self.products[1].id).update(favourite_count=5)
+        Product.objects.filter(id=self.products[2].id).update(units_sold=9)
+        favourites = self.client.get(reverse('product-list-create'), {'ordering': 'favourites'}).json()
+        self.assertEqual(favourites[0]['id'], self.products[1].id)
+        self.assertEqual(favourites[0]['favourite_count'], 5)
+        best_selling = self.client.get(reverse('product-list-create'), {'ordering': 'best_selling'}).json()
+        self.assertEqual(best_selling[0]['id'], self.products[2].id)
+
+
+class GenerateDatasetTests(TestCase):
+    def test_zipf_sampler_is_skewed_and_seeded(self):
+        sampler = dataset.ZipfSampler(1000, 1.1, seed=7)
+        draws = Counter(sampler.sample(random.Random(1)) for _ in range(5000))
+        top = draws.most_common(1)[0]
+        self.assertEqual(top[0], sampler.items[0])
+        self.assertGreater(top[1], 5000 * 0.1)
+        self.assertEqual(sampler.items, dataset.ZipfSampler(1000, 1.1, seed=7).items)
+
+    def test_generates_linked_rows_with_placeholder_images(self):
+        with tempfile.TemporaryDirectory() as media, override_settings(MEDIA_ROOT=media):
+            call_command(
+                'generate_dataset', products=50, users=20, orders=100, images=1, workers=1, as_of='2026-01-31',
+                stdout=StringIO(),
+            )
+            product = Product.objects.exclude(image='').first()
+            self.assertTrue(product.image.storage.exists(product.image.name))
+            self.assertRegex(product.image.name, r'\.[0-9a-f]{12}\.jpg$')
+
+        self.assertEqual((Product.objects.count(), User.objects.count(), Order.objects.count()), (50, 20, 100))
+        self.assertTrue(OrderItem.objects.exists())
+        first, last = Order.objects.order_by('created_at').values_list('created_at', flat=True)[::99]
+        self.assertGreater((last - first).days, 30)
+        self.assertEqual(
+            Product.objects.aggregate(total=Sum('units_sold'))['total'],
+            OrderItem.objects.aggregate(total=Sum('quantity'))['total'],
+        )
+        for item in OrderItem.objects.select_related('product')[:20]:
+            self.assertEqual(item.price, item.product.price)
+
+
+class HashProductImagesTests(TestCase):
+    def test_renames_unhashed_images_and_keeps_the_old_files(self):
+        with tempfile.TemporaryDirectory() as media, override_settings(MEDIA_ROOT=media):
+            os.makedirs(os.path.join(media, 'product_images'))
+            with open(os.path.join(media, 'product_images', 'old.jpg'), 'wb') as f:
+                f.write(b'jpeg bytes')
+            product = Product.objects.create(name='Old', price=10, stock=1, image='product_images/old.jpg')
+
+            call_command('hash_product_images', stdout=StringIO())
+            product.refresh_from_db()
+            self.assertRegex(product.image.name, r'^product_images/old\.[0-9a-f]{12}\.jpg$')
+            self.assertEqual(product.image.read(), b'jpeg bytes')
+            product.image.close()
+            self.assertTrue(os.path.exists(os.path.join(media, 'product_images', 'old.jpg')))
@@ -1,7 +1,8 @@
 from django.urls import path
-from .views import ProductListCreateView, ProductRetrieveUpdateDestroyView
+from .views import ProductListCreateView, ProductRetrieveUpdateDestroyView, ProductSuggestView
 
 urlpatterns = [
     path('', ProductListCreateView.as_view(), name='product-list-create'),
+    path('suggest/', ProductSuggestView.as_view(), name='product-suggest'),
     path('<int:id>/', ProductRetrieveUpdateDestroyView.as_view(), name='product-detail'),
 ]
\ No newline at end of file
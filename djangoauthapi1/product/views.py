@@ -1,14 +1,46 @@
-from rest_framework import generics, permissions, parsers
+from rest_framework import generics, permissions, parsers, status
+from rest_framework.pagination import LimitOffsetPagination
+from rest_framework.response import Response
+from rest_framework.views import APIView
 from .models import Product
 from .serializers import ProductSerializer
+from .suggest import MAX_SUGGESTIONS, suggest_index
 from django.db.models import Q
+from djangoauthapi1.routers import ReplicaReadMixin
 
 class IsAdminUserOnly(permissions.BasePermission):
     def has_permission(self, request, view):
         return request.user and request.user.is_authenticated and request.user.is_admin
 
-class ProductListCreateView(generics.ListCreateAPIView):
+# Sorts served by indexes on Product's counter and score columns (the scores are copied
+# from the popularity table by popularity.utils.update_scores).
+ORDERINGS = {
+    'popular': '-popular_score',
+    'trending': '-trending_score',
+    'favourites': '-favourite_count',
+    'best_selling': '-units_sold',
+}
+
+class ProductListPagination(LimitOffsetPagination):
+    """Opt-in ``?limit=&offset=`` slicing, e.g. for a "top 20 trending" strip. Without
+    ``limit`` the whole list is returned as before, and either way the response is a
+    plain list, so no COUNT over the catalogue."""
+    max_limit = 100
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.limit = self.get_limit(request)
+        if self.limit is None:
+            return None
+        self.offset = self.get_offset(request)
+        return list(queryset[self.offset:self.offset + self.limit])
+
+    def get_paginated_response(self, data):
+        return Response(data)
+
+
+class ProductListCreateView(ReplicaReadMixin, generics.ListCreateAPIView):
     serializer_class = ProductSerializer
+    pagination_class = ProductListPagination
     parser_classes = [parsers.MultiPartParser, parsers.FormParser]
 
     def get_queryset(self):
@@ -17,6 +49,9 @@ class ProductListCreateView(generics.ListCreateAPIView):
         if category:
             # Case-insensitive category search
             queryset = queryset.filter(category__iexact=category.upper().replace(' ', '_'))
+        ordering = ORDERINGS.get(self.request.query_params.get('ordering'))
+        if ordering:
+            queryset = queryset.order_by(ordering, 'id')
         return queryset
 
     def get_permissions(self):
@@ -27,7 +62,7 @@ class ProductListCreateView(generics.ListCreateAPIView):
     def get_serializer_context(self):
         return {'request': self.request}
 
-class ProductRetrieveUpdateDestroyView(generics.RetrieveUpdateDestroyAPIView):
+class ProductRetrieveUpdateDestroyView(ReplicaReadMixin, generics.RetrieveUpdateDestroyAPIView):
     queryset = Product.objects.all()
     serializer_class = ProductSerializer
     lookup_field = 'id'
@@ -39,4 +74,20 @@ class ProductRetrieveUpdateDestroyView(generics.RetrieveUpdateDestroyAPIView):
         return [IsAdminUserOnly()]
 
     def get_serializer_context(self):
-        return {'request': self.request}
\ No newline at end of file
+        return {'request': self.request}
+
+class ProductSuggestView(APIView):
+    """Typeahead suggestions served from the in-memory prefix index."""
+    authentication_classes = []
+    permission_classes = [permissions.AllowAny]
+
+    def get(self, request, format=None):
+        prefix = request.query_params.get('prefix', '')
+        try:
+            limit = min(int(request.query_params.get('limit', 10)), MAX_SUGGESTIONS)
+        except ValueError:
+            return Response({'error': 'limit must be an integer'}, status=status.HTTP_400_BAD_REQUEST)
+
+        suggest_index.ensure_fresh()
+        products, categories = suggest_index.lookup(prefix, limit=max(limit, 1))
+        return Response({'prefix': prefix, 'products': products, 'categories': categories}, status=status.HTTP_200_OK)
@@ -0,0 +1,10 @@
+from django.contrib import admin
+from .models import ProductRecommendation
+
+
+@admin.register(ProductRecommendation)
+class ProductRecommendationAdmin(admin.ModelAdmin):
+    list_display = ('product', 'rank', 'recommended', 'score')
+    search_fields = ('product__name', 'recommended__name')
+    list_select_related = ('product', 'recommended')
+    ordering = ('product', 'rank')
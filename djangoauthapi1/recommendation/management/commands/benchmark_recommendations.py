@@ -0,0 +1,139 @@
+import random
+import time
+
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+
+from account.models import User
+from favourite.models import Favourite
+from order.models import Order, OrderItem
+from product.models import Product
+from recommendation.models import ProductPair, ProductRecommendation
+from recommendation.utils import rebuild, record_favourite, record_order
+
+ORDER_FIELDS = {'shipping_address': '1 Mall Road', 'city': 'Lahore', 'postal_code': '54000', 'country': 'PK'}
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed order and favourite history, then time record_order/record_favourite per event "
+        "against a full rebuild() and check that both leave the same recommendation rows."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--items', type=int, default=100_000, help="Order items in the seeded history.")
+        parser.add_argument('--products', type=int, default=5000)
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--orders', type=int, default=300, help="New orders applied incrementally.")
+        parser.add_argument('--favourites', type=int, default=300, help="Favourite toggles applied incrementally.")
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--seed', type=int, default=7)
+
+    def handle(self, *args, **options):
+        if not getattr(settings, 'BENCHMARK_SUITE', False):
+            raise CommandError("Run with DJANGO_SETTINGS_MODULE=benchmarks.settings; the database is flushed.")
+        call_command('migrate', verbosity=0)
+        call_command('flush', interactive=False, verbosity=0)
+
+        rng = random.Random(options['seed'])
+        batch_size = options['batch_size']
+        Product.objects.bulk_create(
+            (Product(name=f"Product {i}", price=10, stock=100) for i in range(options['products'])),
+            batch_size=batch_size,
+        )
+        User.objects.bulk_create(
+            (User(email=f"bench-{i}@example.invalid", name='bench', tc=True, password='!') for i in range(options['users'])),
+            batch_size=batch_size,
+        )
+        # MySQL does not return primary keys from bulk_create.
+        product_ids = list(Product.objects.order_by('id').values_list('id', flat=True))
+        user_ids = list(User.objects.order_by('id').values_list('id', flat=True))
+        # Zipf-like skew: a few products appear in most orders.
+        weights = [1 / rank for rank in range(1, len(product_ids) + 1)]
+
+        def random_order():
+            return set(rng.choices(product_ids, weights=weights, k=min(1 + int(rng.expovariate(0.5)), 12)))
+
+        history = []
+        items = 0
+        while items < options['items']:
+            history.append(random_order())
+            items += len(history[-1])
+        Order.objects.bulk_create(
+            (Order(user_id=rng.choice(user_ids), **ORDER_FIELDS) for _ in history), batch_size=batch_size,
+        )
+        order_ids = list(Order.objects.order_by('id').values_list('id', flat=True))
+        OrderItem.objects.bulk_create(
+            (
+                OrderItem(order_id=order_id, product_id=product_id, quantity=1, price=10)
+                for order_id, products in zip(order_ids, history)
+                for product_id in products
+            ),
+            batch_size=batch_size,
+        )
+        favourites = {user_id: set(rng.choices(product_ids, weights=weights, k=5)) for user_id in user_ids}
+        Favourite.objects.bulk_create(
+            (Favourite(user_id=user_id, product_id=product_id) for user_id, products in favourites.items() for product_id in products),
+            batch_size=batch_size,
+        )
+        self.stdout.write(
+            f"Seeded {len(history)} orders / {items} order items, "
+            f"{sum(map(len, favourites.values()))} favourites on {len(product_ids)} products."
+        )
+
+        started = time.perf_counter()
+        pairs = rebuild(batch_size=batch_size)
+        rebuild_seconds = time.perf_counter() - started
+        self.stdout.write(f"{'full rebuild:':<26}{rebuild_seconds * 1000:10.1f} ms ({pairs} pairs)")
+
+        # Writing the order or favourite is the view's cost; only the recommendation update is timed.
+        order_seconds = 0.0
+        for _ in range(options['orders']):
+            products = random_order()
+            order = Order.objects.create(user_id=rng.choice(user_ids), **ORDER_FIELDS)
+            OrderItem.objects.bulk_create(
+                [OrderItem(order=order, product_id=product_id, quantity=1, price=10) for product_id in products]
+            )
+            started = time.perf_counter()
+            record_order(products)
+            order_seconds += time.perf_counter() - started
+
+        favourite_seconds = 0.0
+        for _ in range(options['favourites']):
+            user_id = rng.choice(user_ids)
+            product_id = rng.choices(product_ids, weights=weights)[0]
+            owned = favourites[user_id]
+            added = product_id not in owned
+            if added:
+                Favourite.objects.create(user_id=user_id, product_id=product_id)
+                owned.add(product_id)
+            else:
+                Favourite.objects.filter(user_id=user_id, product_id=product_id).delete()
+                owned.discard(product_id)
+            started = time.perf_counter()
+            record_favourite(user_id, product_id, added=added, others=owned - {product_id})
+            favourite_seconds += time.perf_counter() - started
+
+        if options['orders']:
+            self.stdout.write(f"{'record_order / event:':<26}{order_seconds / options['orders'] * 1000:10.2f} ms")
+        if options['favourites']:
+            self.stdout.write(f"{'record_favourite / event:':<26}{favourite_seconds / options['favourites'] * 1000:10.2f} ms")
+        events = options['orders'] + options['favourites']
+        if events:
+            per_event = (order_seconds + favourite_seconds) / events
+            self.stdout.write(f"{'speed-up:':<26}{rebuild_seconds / per_event:10,.0f}x per event")
+
+        incremental_pairs = set(ProductPair.objects.values_list('product_id', 'other_id', 'orders', 'favourites', 'score'))
+        incremental = set(ProductRecommendation.objects.values_list('product_id', 'rank', 'recommended_id', 'score'))
+        rebuild(batch_size=batch_size)
+        rebuilt = set(ProductRecommendation.objects.values_list('product_id', 'rank', 'recommended_id', 'score'))
+        rebuilt_pairs = set(ProductPair.objects.values_list('product_id', 'other_id', 'orders', 'favourites', 'score'))
+        # Rebuild only stores pairs that still co-occur; incremental updates keep zeroed ones.
+        incremental_pairs = {pair for pair in incremental_pairs if pair[2] or pair[3]}
+        if incremental != rebuilt or incremental_pairs != rebuilt_pairs:
+            raise CommandError(
+                f"Incremental and rebuilt tables differ: {len(incremental ^ rebuilt)} recommendation rows, "
+                f"{len(incremental_pairs ^ rebuilt_pairs)} pairs."
+            )
+        self.stdout.write(self.style.SUCCESS(f"Incremental updates match the rebuild ({len(rebuilt)} recommendation rows)."))
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from recommendation.utils import rebuild
+
+
+class Command(BaseCommand):
+    help = "Recompute product co-occurrence and the top-k recommendation table from scratch."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=5000)
+
+    def handle(self, *args, **options):
+        pairs = rebuild(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {pairs} product pairs."))
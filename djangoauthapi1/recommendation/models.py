@@ -0,0 +1,34 @@
+from django.db import models
+from product.models import Product
+
+
+class ProductPair(models.Model):
+    """Sparse co-occurrence counts, stored in both directions so each product's
+    neighbours are one index range scan."""
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='+')
+    other = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='+')
+    orders = models.PositiveIntegerField(default=0)
+    favourites = models.IntegerField(default=0)
+    score = models.IntegerField(default=0)
+
+    class Meta:
+        unique_together = ('product', 'other')
+        indexes = [models.Index(fields=['product', '-score'], name='pair_product_score_idx')]
+
+    def __str__(self):
+        return f"{self.product_id} <-> {self.other_id} ({self.score})"
+
+
+class ProductRecommendation(models.Model):
+    """Top-k "frequently bought together" neighbours per product."""
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='recommendations')
+    recommended = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='+')
+    rank = models.PositiveSmallIntegerField()
+    score = models.IntegerField()
+
+    class Meta:
+        unique_together = ('product', 'rank')
+        ordering = ['product', 'rank']
+
+    def __str__(self):
+        return f"#{self.rank} for {self.product_id}: {self.recommended_id}"
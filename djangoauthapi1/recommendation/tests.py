@@ -0,0 +1,54 @@
+from django.test import TestCase
+from django.urls import reverse
+
+from account.models import User
+from favourite.models import Favourite
+from order.models import Order, OrderItem
+from product.models import Product
+from .models import ProductPair, ProductRecommendation
+from .utils import rebuild, record_favourite, record_order
+
+
+class RecommendationTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(email='a@example.com', name='A', tc=True, password='pw')
+        self.shoe, self.sock, self.lace, self.bag = (
+            Product.objects.create(name=name, price=10, stock=5) for name in ['Shoe', 'Sock', 'Lace', 'Bag']
+        )
+
+    def place(self, *products):
+        order = Order.objects.create(user=self.user, shipping_address='x', city='x', postal_code='1', country='PK')
+        for product in products:
+            OrderItem.objects.create(order=order, product=product, quantity=1, price=product.price)
+        record_order([product.id for product in products])
+
+    def neighbours(self, product):
+        return list(
+            ProductRecommendation.objects.filter(product=product).values_list('recommended_id', flat=True)
+        )
+
+    def test_incremental_updates_match_rebuild(self):
+        self.place(self.shoe, self.sock)
+        self.place(self.shoe, self.sock, self.lace)
+        Favourite.objects.create(user=self.user, product=self.shoe)
+        Favourite.objects.create(user=self.user, product=self.bag)
+        record_favourite(self.user.id, self.bag.id, added=True)
+
+        incremental = {
+            product.id: self.neighbours(product) for product in (self.shoe, self.sock, self.lace, self.bag)
+        }
+        self.assertEqual(incremental[self.shoe.id], [self.sock.id, self.lace.id, self.bag.id])
+        pairs = set(ProductPair.objects.values_list('product_id', 'other_id', 'orders', 'favourites', 'score'))
+
+        rebuild()
+        self.assertEqual(
+            {product.id: self.neighbours(product) for product in (self.shoe, self.sock, self.lace, self.bag)},
+            incremental,
+        )
+        self.assertEqual(set(ProductPair.objects.values_list('product_id', 'other_id', 'orders', 'favourites', 'score')), pairs)
+
+    def test_product_endpoint_serves_top_k(self):
+        self.place(self.shoe, self.lace)
+        response = self.client.get(reverse('product-recommendations', args=[self.shoe.id]))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([product['id'] for product in response.json()], [self.lace.id])
@@ -0,0 +1,7 @@
+from django.urls import path
+from .views import ProductRecommendationView, CartRecommendationView
+
+urlpatterns = [
+    path('products/<int:product_id>/', ProductRecommendationView.as_view(), name='product-recommendations'),
+    path('cart/', CartRecommendationView.as_view(), name='cart-recommendations'),
+]
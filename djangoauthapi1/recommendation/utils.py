@@ -0,0 +1,141 @@
+import heapq
+import itertools
+from collections import Counter, defaultdict
+
+from django.db import IntegrityError, transaction
+from django.db.models import F, Q, Window
+from django.db.models.functions import RowNumber
+
+from favourite.models import Favourite
+from order.models import OrderItem
+from .models import ProductPair, ProductRecommendation
+
+# A product bought in the same order counts double a shared favourite.
+ORDER_WEIGHT = 2
+FAVOURITE_WEIGHT = 1
+TOP_K = 10
+
+
+def count_pairs(groups, weight=1):
+    """Count every ordered pair of distinct products that appear in the same group."""
+    counts = Counter()
+    for product_ids in groups:
+        for pair in itertools.permutations(set(product_ids), 2):
+            counts[pair] += weight
+    return counts
+
+
+def top_k(counts, k=TOP_K):
+    neighbours = defaultdict(list)
+    for (product_id, other_id), score in counts.items():
+        if score > 0:
+            neighbours[product_id].append((score, -other_id))
+    return {
+        product_id: [(-negative_id, score) for score, negative_id in heapq.nlargest(k, scores)]
+        for product_id, scores in neighbours.items()
+    }
+
+
+def _bump_pairs(anchors, others, **deltas):
+    """Add ``deltas`` to every pair between ``anchors`` and ``others``, in both directions."""
+    pairs = {(a, b) for a in anchors for b in others if a != b}
+    pairs |= {(b, a) for a, b in pairs}
+    if not pairs:
+        return
+    ProductPair.objects.bulk_create(
+        [ProductPair(product_id=a, other_id=b) for a, b in pairs],
+        ignore_conflicts=True,
+    )
+    score = sum(delta * (ORDER_WEIGHT if field == 'orders' else FAVOURITE_WEIGHT) for field, delta in deltas.items())
+    ProductPair.objects.filter(
+        Q(product_id__in=anchors, other_id__in=others) | Q(product_id__in=others, other_id__in=anchors)
+    ).update(score=F('score') + score, **{field: F(field) + delta for field, delta in deltas.items()})
+
+
+def refresh_recommendations(product_ids):
+    """Recompute the top-k table rows for ``product_ids`` with one windowed query."""
+    product_ids = list(product_ids)
+    ranked = (
+        ProductPair.objects
+        .filter(product_id__in=product_ids, score__gt=0)
+        .annotate(rank=Window(RowNumber(), partition_by=F('product_id'), order_by=[F('score').desc(), F('other_id')]))
+        .filter(rank__lte=TOP_K)
+        .values_list('product_id', 'other_id', 'score', 'rank')
+    )
+    rows = [
+        ProductRecommendation(product_id=product_id, recommended_id=other_id, score=score, rank=rank)
+        for product_id, other_id, score, rank in ranked
+    ]
+    try:
+        with transaction.atomic():
+            ProductRecommendation.objects.filter(product_id__in=product_ids).delete()
+            ProductRecommendation.objects.bulk_create(rows)
+    except IntegrityError:
+        # A concurrent order refreshed the same products first; its rows are just as fresh.
+        pass
+
+
+def record_order(product_ids):
+    """Fold one new order into the co-occurrence counts; cost depends only on the order's size."""
+    product_ids = set(product_ids)
+    if len(product_ids) < 2:
+        return
+    with transaction.atomic():
+        _bump_pairs(product_ids, product_ids, orders=1)
+    refresh_recommendations(product_ids)
+
+
+def record_favourite(user_id, product_id, added, others=None):
+    """Bump the pairs between ``product_id`` and the user's ``others`` favourites
+    (loaded when not given)."""
+    if others is None:
+        others = set(
+            Favourite.objects.filter(user_id=user_id).exclude(product_id=product_id).values_list('product_id', flat=True)
+        )
+    others = set(others)
+    if not others:
+        return
+    with transaction.atomic():
+        _bump_pairs({product_id}, others, favourites=1 if added else -1)
+    refresh_recommendations(others | {product_id})
+
+
+def rebuild(batch_size=5000):
+    """Recompute every pair and the top-k table from OrderItem and Favourite history."""
+    def grouped(rows):
+        for _, group in itertools.groupby(rows, key=lambda row: row[0]):
+            yield [product_id for _, product_id in group]
+
+    order_rows = OrderItem.objects.order_by('order_id').values_list('order_id', 'product_id').iterator(chunk_size=batch_size)
+    favourite_rows = Favourite.objects.order_by('user_id').values_list('user_id', 'product_id').iterator(chunk_size=batch_size)
+    order_counts = count_pairs(grouped(order_rows))
+    favourite_counts = count_pairs(grouped(favourite_rows))
+
+    scores = Counter()
+    for pair, count in order_counts.items():
+        scores[pair] += count * ORDER_WEIGHT
+    for pair, count in favourite_counts.items():
+        scores[pair] += count * FAVOURITE_WEIGHT
+
+    with transaction.atomic():
+        ProductRecommendation.objects.all().delete()
+        ProductPair.objects.all().delete()
+        ProductPair.objects.bulk_create(
+            (
+                ProductPair(
+                    product_id=a, other_id=b, score=score,
+                    orders=order_counts.get((a, b), 0), favourites=favourite_counts.get((a, b), 0),
+                )
+                for (a, b), score in scores.items()
+            ),
+            batch_size=batch_size,
+        )
+        ProductRecommendation.objects.bulk_create(
+            (
+                ProductRecommendation(product_id=product_id, recommended_id=other_id, score=score, rank=rank)
+                for product_id, neighbours in top_k(scores).items()
+                for rank, (other_id, score) in enumerate(neighbours, start=1)
+            ),
+            batch_size=batch_size,
+        )
+    return len(scores)
@@ -0,0 +1,40 @@
+from collections import Counter
+
+from rest_framework import permissions
+from rest_framework.generics import ListAPIView
+
+from cart.models import CartItem
+from product.serializers import ProductSerializer
+from .models import ProductRecommendation
+from .utils import TOP_K
+
+
+class ProductRecommendationView(ListAPIView):
+    """Frequently bought together, for the product detail screen."""
+    serializer_class = ProductSerializer
+    permission_classes = [permissions.AllowAny]
+
+    def get_queryset(self):
+        rows = ProductRecommendation.objects.filter(product_id=self.kwargs['product_id']).select_related('recommended')
+        return [row.recommended for row in rows]
+
+
+class CartRecommendationView(ListAPIView):
+    """Neighbours of everything in the cart, merged by score, for the cart screen."""
+    serializer_class = ProductSerializer
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get_queryset(self):
+        in_cart = CartItem.objects.filter(user=self.request.user).values('product_id')
+        rows = (
+            ProductRecommendation.objects
+            .filter(product_id__in=in_cart)
+            .exclude(recommended_id__in=in_cart)
+            .select_related('recommended')
+        )
+        scores = Counter()
+        products = {}
+        for row in rows:
+            scores[row.recommended_id] += row.score
+            products[row.recommended_id] = row.recommended
+        return [products[product_id] for product_id, _ in scores.most_common(TOP_K)]
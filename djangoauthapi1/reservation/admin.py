@@ -0,0 +1,10 @@
+from django.contrib import admin
+from .models import StockReservation
+
+
+@admin.register(StockReservation)
+class StockReservationAdmin(admin.ModelAdmin):
+    list_display = ('user', 'product', 'color', 'size', 'quantity', 'expires_at')
+    search_fields = ('user__email', 'product__name')
+    list_select_related = ('user', 'product')
+    ordering = ('expires_at',)
@@ -0,0 +1,67 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from account.models import User
+from product.models import Product
+from reservation.utils import InsufficientStock, consume_holds, hold
+
+
+class Command(BaseCommand):
+    help = "Contention benchmark: many buyers reserve and buy one hot product concurrently."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--buyers', type=int, default=300)
+        parser.add_argument('--stock', type=int, default=100)
+        parser.add_argument('--threads', type=int, default=32)
+
+    def handle(self, *args, **options):
+        if not getattr(settings, 'BENCHMARK_SUITE', False):
+            raise CommandError("Run with DJANGO_SETTINGS_MODULE=benchmarks.settings; it writes products, users and holds.")
+        product = Product.objects.create(name='__reservation benchmark__', price=1, stock=options['stock'])
+        User.objects.bulk_create(
+            User(email=f"bench-{i}@example.invalid", name='bench', tc=True, password='!')
+            for i in range(options['buyers'])
+        )
+        # MySQL does not return primary keys from bulk_create.
+        users = list(User.objects.filter(email__endswith='@example.invalid', name='bench'))
+
+        def buy(user):
+            try:
+                hold(user, product.id, 1)
+            except InsufficientStock:
+                return 'sold out'
+            except Exception:
+                return 'error'
+            else:
+                try:
+                    with transaction.atomic():
+                        consume_holds(user, [(product.id, 1)])
+                    return 'bought'
+                except Exception:
+                    return 'error'
+            finally:
+                connection.close()
+
+        try:
+            started = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=options['threads']) as pool:
+                results = list(pool.map(buy, users))
+            elapsed = time.perf_counter() - started
+            product.refresh_from_db()
+
+            bought = results.count('bought')
+            self.stdout.write(f"buyers:      {len(users)} on {options['threads']} threads")
+            self.stdout.write(f"bought:      {bought}")
+            self.stdout.write(f"sold out:    {results.count('sold out')}")
+            self.stdout.write(f"errors:      {results.count('error')}")
+            self.stdout.write(f"throughput:  {len(users) / elapsed:.0f} attempts/s ({elapsed:.2f} s)")
+            self.stdout.write(f"final stock: {product.stock}, reserved: {product.reserved}")
+            if product.stock < 0 or bought > options['stock'] or bought + product.stock != options['stock']:
+                self.stdout.write(self.style.ERROR("Oversold!"))
+        finally:
+            product.delete()
+            User.objects.filter(email__endswith='@example.invalid', name='bench').delete()
@@ -0,0 +1,24 @@
+from django.db import models
+from django.conf import settings
+from product.models import Product
+
+
+class StockReservation(models.Model):
+    """A time-limited hold on stock for one cart line (user, product, variant).
+
+    The held units are also counted in ``Product.reserved``, so availability is
+    ``stock - reserved`` without summing holds at read time.
+    """
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='reservations')
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='reservations')
+    color = models.CharField(max_length=50, blank=True, null=True)
+    size = models.CharField(max_length=10, blank=True, null=True)
+    quantity = models.PositiveIntegerField()
+    expires_at = models.DateTimeField(db_index=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        unique_together = ('user', 'product', 'color', 'size')
+
+    def __str__(self):
+        return f"{self.quantity} x {self.product_id} for {self.user_id} until {self.expires_at:%H:%M:%S}"
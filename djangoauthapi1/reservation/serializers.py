@@ -0,0 +1,10 @@
+from rest_framework import serializers
+from .models import StockReservation
+from djangoauthapi1.middleware import TimedSerializerMixin
+
+
+class StockReservationSerializer(TimedSerializerMixin, serializers.ModelSerializer):
+    class Meta:
+        model = StockReservation
+        fields = ['id', 'product', 'color', 'size', 'quantity', 'expires_at']
+        read_only_fields = fields
@@ -0,0 +1,73 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from account.models import User
+from cart.models import CartItem
+from product.models import Product
+from product.views import ProductRetrieveUpdateDestroyView
+from .models import StockReservation
+from .utils import InsufficientStock, consume_holds, hold, release_expired
+
+
+class ReservationTests(TestCase):
+    def setUp(self):
+        self.alice = User.objects.create_user(email='a@example.com', name='A', tc=True, password='pw')
+        self.bob = User.objects.create_user(email='b@example.com', name='B', tc=True, password='pw')
+        self.product = Product.objects.create(name='Hot sneaker', price=10, stock=3)
+
+    def test_holds_block_other_buyers_until_expiry(self):
+        hold(self.alice, self.product.id, 2, color='black', size='42')
+        with self.assertRaises(InsufficientStock):
+            hold(self.bob, self.product.id, 2)
+        hold(self.alice, self.product.id, 1, color='black', size='42')
+        hold(self.bob, self.product.id, 2)
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.reserved, 3)
+
+        self.assertEqual(release_expired(now=timezone.now() + timedelta(hours=1)), 2)
+        self.product.refresh_from_db()
+        self.assertEqual((self.product.stock, self.product.reserved), (3, 0))
+
+    def test_product_edit_keeps_holds_placed_while_it_ran(self):
+        admin = User.objects.create_superuser(email='admin@example.com', name='Admin', tc=True, password='pw')
+        client = APIClient()
+        client.force_authenticate(admin)
+        get_object = ProductRetrieveUpdateDestroyView.get_object
+
+        def get_object_then_hold(view):
+            product = get_object(view)
+            hold(self.alice, self.product.id, 2)
+            return product
+
+        with mock.patch.object(ProductRetrieveUpdateDestroyView, 'get_object', get_object_then_hold):
+            response = client.patch(reverse('product-detail', args=[self.product.id]), {'price': '12.00'}, format='multipart')
+        self.assertEqual(response.status_code, 200)
+        self.product.refresh_from_db()
+        self.assertEqual((self.product.price, self.product.reserved), (12, 2))
+
+    def test_consume_converts_own_hold_into_decrement(self):
+        hold(self.alice, self.product.id, 2)
+        with self.assertRaises(InsufficientStock):
+            consume_holds(self.bob, [(self.product.id, 2)])
+        consume_holds(self.alice, [(self.product.id, 2)])
+        self.product.refresh_from_db()
+        self.assertEqual((self.product.stock, self.product.reserved), (1, 0))
+        self.assertFalse(StockReservation.objects.exists())
+
+    def test_reserve_cart_is_all_or_nothing(self):
+        other = Product.objects.create(name='Boot', price=10, stock=1)
+        CartItem.objects.create(user=self.alice, product=self.product, quantity=2, color='black', size='42')
+        CartItem.objects.create(user=self.alice, product=other, quantity=2, color='tan', size='41')
+        client = APIClient()
+        client.force_authenticate(self.alice)
+
+        response = client.post(reverse('cart-reservation'))
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.json()['products'], [other.id])
+        self.assertFalse(StockReservation.objects.exists())
+        self.assertEqual(Product.objects.get(id=self.product.id).reserved, 0)
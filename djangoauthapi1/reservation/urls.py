@@ -0,0 +1,6 @@
+from django.urls import path
+from .views import CartReservationView
+
+urlpatterns = [
+    path('', CartReservationView.as_view(), name='cart-reservation'),  # GET holds, POST reserve cart, DELETE release
+]
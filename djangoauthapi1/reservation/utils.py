@@ -0,0 +1,160 @@
+from collections import defaultdict
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Case, F, IntegerField, Value, When
+from django.utils import timezone
+
+from cart.models import CartItem
+from product.models import Product
+from .models import StockReservation
+
+RESERVATION_TTL = timedelta(minutes=10)
+
+
+class InsufficientStock(Exception):
+    def __init__(self, product_ids):
+        super().__init__(f"Insufficient stock for product(s) {sorted(product_ids)}")
+        self.product_ids = set(product_ids)
+
+
+def _by_product(pairs):
+    totals = defaultdict(int)
+    for product_id, quantity in pairs:
+        totals[product_id] += quantity
+    return totals
+
+
+def _adjust_reserved(deltas):
+    """Apply per-product ``reserved`` deltas in a single UPDATE."""
+    deltas = {product_id: delta for product_id, delta in deltas.items() if delta}
+    if deltas:
+        Product.objects.filter(id__in=deltas).update(reserved=F('reserved') + Case(
+            *[When(id=product_id, then=Value(delta)) for product_id, delta in deltas.items()],
+            output_field=IntegerField(),
+        ))
+
+
+def hold(user, product_id, quantity, color=None, size=None, now=None):
+    """Reserve ``quantity`` units of one variant for ``user``, replacing any previous hold on it.
+
+    Only the difference from the existing hold touches ``Product.reserved``, through a
+    conditional UPDATE, so the product row is locked for one statement only.
+    """
+    now = now or timezone.now()
+    with transaction.atomic():
+        current = (
+            StockReservation.objects.select_for_update()
+            .filter(user=user, product_id=product_id, color=color, size=size)
+            .first()
+        )
+        delta = quantity - (current.quantity if current else 0)
+        if delta > 0:
+            grabbed = Product.objects.filter(id=product_id, stock__gte=F('reserved') + delta).update(reserved=F('reserved') + delta)
+            if not grabbed:
+                raise InsufficientStock([product_id])
+        elif delta < 0:
+            _adjust_reserved({product_id: delta})
+
+        if current:
+            current.quantity = quantity
+            current.expires_at = now + RESERVATION_TTL
+            current.save(update_fields=['quantity', 'expires_at'])
+            return current
+        return StockReservation.objects.create(
+            user=user, product_id=product_id, color=color, size=size, quantity=quantity, expires_at=now + RESERVATION_TTL,
+        )
+
+
+def reserve_cart(user, now=None):
+    """Hold stock for every line in the user's cart, all or nothing, for ``RESERVATION_TTL``."""
+    now = now or timezone.now()
+    lines = list(CartItem.objects.filter(user=user).values_list('product_id', 'color', 'size', 'quantity'))
+    failed = set()
+    with transaction.atomic():
+        wanted = {(product_id, color, size) for product_id, color, size, _ in lines}
+        stale = [
+            reservation for reservation in StockReservation.objects.select_for_update().filter(user=user)
+            if (reservation.product_id, reservation.color, reservation.size) not in wanted
+        ]
+        release(stale)
+        holds = []
+        for product_id, color, size, quantity in lines:
+            try:
+                with transaction.atomic():
+                    holds.append(hold(user, product_id, quantity, color=color, size=size, now=now))
+            except InsufficientStock:
+                failed.add(product_id)
+        if failed:
+            transaction.set_rollback(True)
+            raise InsufficientStock(failed)
+    return holds
+
+
+def release(reservations):
+    """Give the held units back and delete the holds."""
+    reservations = list(reservations)
+    if not reservations:
+        return 0
+    with transaction.atomic():
+        _adjust_reserved({
+            product_id: -quantity
+            for product_id, quantity in _by_product((r.product_id, r.quantity) for r in reservations).items()
+        })
+        StockReservation.objects.filter(id__in=[r.id for r in reservations]).delete()
+    return len(reservations)
+
+
+def release_expired(now=None, batch_size=500):
+    """Sweep expired holds in ``expires_at`` index order; safe to run from several workers."""
+    now = now or timezone.now()
+    released = 0
+    while True:
+        with transaction.atomic():
+            batch = list(
+                StockReservation.objects.select_for_update(skip_locked=True)
+                .filter(expires_at__lte=now)
+                .order_by('expires_at')[:batch_size]
+            )
+            released += release(batch)
+        if len(batch) < batch_size:
+            return released
+
+
+def _per_product(values):
+    return Case(
+        *[When(id=product_id, then=Value(value)) for product_id, value in values.items()],
+        default=Value(0),
+        output_field=IntegerField(),
+    )
+
+
+def consume_holds(user, lines):
+    """Turn the user's holds into stock decrements for ``lines`` of ``(product_id, quantity)``.
+
+    All products are decremented (and their ``units_sold`` raised) by one conditional
+    UPDATE that counts the user's own hold as available; if any product falls short nothing is applied and
+    ``InsufficientStock`` names the products. Must run inside the order's transaction.
+    """
+    wanted = _by_product(lines)
+    holds = list(StockReservation.objects.select_for_update().filter(user=user, product_id__in=wanted))
+    held = _by_product((r.product_id, r.quantity) for r in holds)
+    try:
+        with transaction.atomic():
+            updated = Product.objects.filter(
+                id__in=wanted, stock__gte=F('reserved') - _per_product(held) + _per_product(wanted),
+            ).update(
+                stock=F('stock') - _per_product(wanted),
+                reserved=F('reserved') - _per_product(held),
+                units_sold=F('units_sold') + _per_product(wanted),
+            )
+            if updated != len(wanted):
+                raise InsufficientStock(wanted)
+    except InsufficientStock:
+        current = {
+            product_id: (stock or 0) - reserved + held.get(product_id, 0)
+            for product_id, stock, reserved in Product.objects.filter(id__in=wanted).values_list('id', 'stock', 'reserved')
+        }
+        raise InsufficientStock({product_id for product_id, quantity in wanted.items() if current.get(product_id, 0) < quantity})
+    if holds:
+        StockReservation.objects.filter(id__in=[r.id for r in holds]).delete()
@@ -0,0 +1,30 @@
+from rest_framework import permissions, status
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from .models import StockReservation
+from .serializers import StockReservationSerializer
+from .utils import InsufficientStock, release, reserve_cart
+
+
+class CartReservationView(APIView):
+    """Hold stock for the whole cart while the user is on the checkout screen."""
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request, format=None):
+        holds = StockReservation.objects.filter(user=request.user)
+        return Response(StockReservationSerializer(holds, many=True).data, status=status.HTTP_200_OK)
+
+    def post(self, request, format=None):
+        try:
+            holds = reserve_cart(request.user)
+        except InsufficientStock as e:
+            return Response(
+                {"error": "Insufficient stock", "products": sorted(e.product_ids)},
+                status=status.HTTP_409_CONFLICT,
+            )
+        return Response(StockReservationSerializer(holds, many=True).data, status=status.HTTP_201_CREATED)
+
+    def delete(self, request, format=None):
+        release(StockReservation.objects.filter(user=request.user))
+        return Response(status=status.HTTP_204_NO_CONTENT)
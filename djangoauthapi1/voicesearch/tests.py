@@ -1,3 +1,41 @@
+import io
+import wave
+from unittest import mock
+
+import speech_recognition as sr
+from django.core.files.uploadedfile import SimpleUploadedFile
 from django.test import TestCase
+from django.urls import reverse
+
+from djangoauthapi1.asyncviews import io_pool
+
+
+def wav_upload():
+    buffer = io.BytesIO()
+    with wave.open(buffer, 'wb') as audio:
+        audio.setnchannels(1)
+        audio.setsampwidth(2)
+        audio.setframerate(16000)
+        audio.writeframes(b'\0\0' * 1600)
+    return SimpleUploadedFile('query.wav', buffer.getvalue(), content_type='audio/wav')
+
+
+class AsyncVoiceSearchTests(TestCase):
+    async def test_transcribes_on_the_io_pool(self):
+        with mock.patch.object(sr.Recognizer, 'recognize_google', return_value='white sneakers'):
+            response = await self.async_client.post(reverse('voice-search-async'), {'audio': wav_upload()})
+        self.assertEqual(response.json(), {'transcribed_text': 'white sneakers'})
+
+    async def test_unintelligible_audio(self):
+        with mock.patch.object(sr.Recognizer, 'recognize_google', side_effect=sr.UnknownValueError):
+            response = await self.async_client.post(reverse('voice-search-async'), {'audio': wav_upload()})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual((await self.async_client.post(reverse('voice-search-async'))).status_code, 400)
 
-# Create your tests here.
+    async def test_full_pool_answers_503(self):
+        with mock.patch.object(io_pool, 'queue_timeout', 0.02), mock.patch.object(io_pool, 'slots') as slots:
+            slots.acquire.return_value = False
+            response = await self.async_client.post(reverse('voice-search-async'), {'audio': wav_upload()})
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response['Retry-After'], '1')
+        self.assertGreaterEqual(slots.acquire.call_count, 2)
@@ -1,6 +1,7 @@
 from django.urls import path
-from .views import VoiceSearchView
+from .views import AsyncVoiceSearchView, VoiceSearchView
 
 urlpatterns = [
     path('voice-search/', VoiceSearchView.as_view(), name='voice-search'),
+    path('voice-search/async/', AsyncVoiceSearchView.as_view(), name='voice-search-async'),
 ]
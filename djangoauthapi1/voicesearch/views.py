@@ -1,9 +1,12 @@
 import os
+from django.http import JsonResponse
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
 import speech_recognition as sr
 
+from djangoauthapi1.asyncviews import AsyncAPIView, Overloaded, io_pool
+
 class VoiceSearchView(APIView):
     def post(self, request):
         try:
@@ -42,3 +45,32 @@ class VoiceSearchView(APIView):
             if os.path.exists(temp_file_path):
                 os.remove(temp_file_path)
             return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+def transcribe(audio_file):
+    """Blocking: decode the upload in place and send it to Google's recognizer."""
+    recognizer = sr.Recognizer()
+    with sr.AudioFile(audio_file) as source:
+        audio_data = recognizer.record(source)
+    return recognizer.recognize_google(audio_data)
+
+
+class AsyncVoiceSearchView(AsyncAPIView):
+    """ASGI variant of VoiceSearchView: the recognizer's HTTP round trip waits on the
+    I/O pool instead of a request thread."""
+    async def post(self, request):
+        files = await io_pool.run(lambda: request.FILES)
+        audio_file = files.get('audio')
+        if not audio_file:
+            return JsonResponse({'error': 'No audio file provided'}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            text = await io_pool.run(transcribe, audio_file)
+        except Overloaded:
+            raise
+        except sr.UnknownValueError:
+            return JsonResponse({'error': 'Could not understand audio'}, status=status.HTTP_400_BAD_REQUEST)
+        except sr.RequestError as e:
+            return JsonResponse({'error': f'Speech recognition service error: {str(e)}'}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+        except Exception as e:
+            return JsonResponse({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+        return JsonResponse({'transcribed_text': text}, status=status.HTTP_200_OK)